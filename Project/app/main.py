@@ -1,17 +1,26 @@
 import sys
 import os
+import io
+from itertools import islice
 import streamlit as st
 import pandas as pd
 from datetime import date, timedelta
 
 import time
+import threading
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from core.pipeline import process_reading
 from core.transforms import load_seed, reading_stats
+from core.derived import DerivedData, dataset_version
+from core.render import PAGE_SIZE, page_bounds, page_count, series_points
+from core.schedule import WEEKDAYS
 from core.recursion import expand_schedule
-from core.report import soil_humidity_forecast
-from core.lazy import iter_readings, lazy_hysteresis_control
+from core.lazy import iter_readings
+from core.rules import RuleEngine
+from core.domain import Command
 from core.frp import *
+from core.eventlog import EventLog, LoggedEventBus
+from core.metrics import REGISTRY as METRICS, BOUNDS_NS
 from core.service import ControlService, AlertService, ReportService
 import asyncio
 from core.report import simulate_day, simulate_week, make_daily_readings, modes_from_profile
@@ -19,6 +28,7 @@ from core.service_support import select_snapshot
 from core.service_support import calc_regime
 from core.service_support import decide_actuation
 import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
 from core.service_support import rule_temp_high
 from core.service_support import raise_alert, clear_alert
 
@@ -29,7 +39,7 @@ from core.service_support import agg_out_of_range, agg_cmd_count, agg_alerts
 st.title("Управление теплицей 🌱")
 
 # --- выбор раздела ---
-section = st.sidebar.radio("Разделы", ["Главная", "Reports", "Online Control", "Functional Core"])
+section = st.sidebar.radio("Разделы", ["Главная", "Reports", "Online Control", "Functional Core", "Performance"])
 
 
 
@@ -37,18 +47,108 @@ section = st.sidebar.radio("Разделы", ["Главная", "Reports", "Onli
 if "data_loaded" not in st.session_state:
     st.session_state.data_loaded = False
 
+
+@st.cache_resource(max_entries=2)
+def derived_data(path, version):
+    """Датасет и производные структуры — один экземпляр на версию файла для всех перезапусков."""
+    return DerivedData.load(path, version)
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def line_chart_png(series, title, xlabel, ylabel, marker=None, figsize=(6, 3)):
+    """
+    PNG графика по уже прореженным рядам ((подпись, (x...), (y...)), ...).
+    Те же данные — та же картинка из кэша, matplotlib не вызывается.
+    """
+    fig = Figure(figsize=figsize)
+    ax = fig.subplots()
+    for label, xs, ys in series:
+        ax.plot(xs, ys, marker=marker, label=label)
+    ax.set_title(title)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel(ylabel)
+    if len(series) > 1:
+        ax.legend()
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png", bbox_inches="tight")
+    return buf.getvalue()
+
+
+@st.cache_resource
+def event_bus(directory):
+    """
+    Одна шина с журналом на процесс: все сессии пишут через неё (publish и flush
+    под замком шины), второй писатель в тот же каталог не открывается.
+    Журнал переживает перезапуск: витрины восстанавливаются из снимка и хвоста.
+    """
+    bus = LoggedEventBus(EventLog(directory), snapshot_every=1000)
+    bus.subscribe("READING", handle_reading)
+    bus.subscribe("MODE_TICK", handle_mode_tick)
+    bus.subscribe("ACTUATE", handle_actuate)
+    bus.subscribe("ALERT_RAISED", handle_alert_raised)
+    bus.subscribe("ALERT_CLEARED", handle_alert_cleared)
+    configure_views(bus.store)
+    bus.recover()
+    return bus
+
+
+@st.cache_resource
+def rollup_subscription(directory):
+    """Единственная на процесс подписка предагрегатов на шину каталога: версия датасета и отписка."""
+    return {"lock": threading.Lock(), "version": None, "cancel": None}
+
+
+def follow_rollup(directory, bus, derived):
+    """
+    Подписывает на шину предагрегаты актуальной версии датасета и снимает подписку
+    прежней: вытесненный из кэша derived_data датасет больше не обновляется.
+    """
+    sub = rollup_subscription(directory)
+    with sub["lock"]:
+        if sub["version"] == derived.version or derived.version != dataset_version(derived.version[0]):
+            return
+        if sub["cancel"] is not None:
+            sub["cancel"]()
+        sub["cancel"] = derived.rollup.follow(bus)
+        sub["version"] = derived.version
+
+
+def alert_row(alert):
+    """Строка таблицы из алерта process_reading(s): {status, alert_type, message, timestamp}."""
+    return {"Время": alert.get("timestamp"), "Уровень": alert.get("alert_type"), "Сообщение": alert.get("message")}
+
+
+def paged_table(key, total, rows, page_size=PAGE_SIZE, newest_first=True):
+    """Одна страница таблицы: rows(start, stop) строит только её строки."""
+    if not total:
+        st.info("Нет данных")
+        return
+    pages = page_count(total, page_size)
+    page = st.number_input(f"Страница (из {pages}, 1 — {'новые' if newest_first else 'начало'})",
+                           min_value=1, max_value=pages, value=1, step=1, key=key)
+    start, stop = page_bounds(total, int(page) - 1, page_size, newest_first)
+    st.dataframe(pd.DataFrame(rows(start, stop)), use_container_width=True, hide_index=True)
+    st.caption(f"Строки {start + 1}–{stop} из {total}")
+
+
 # --- раздел Главная ---
 if section == "Главная":
     st.subheader("Главная панель")
 
     if st.button("Загрузить данные"):
-        zones, profiles, sensors, actuators, readings,rules = load_seed("data/seed.json")
-        st.session_state.zones = zones
-        st.session_state.profiles = profiles
-        st.session_state.sensors = sensors
-        st.session_state.actuators = actuators
-        st.session_state.readings = readings
-        st.session_state.rules =rules
+        derived = derived_data("data/seed.json", dataset_version("data/seed.json"))
+        st.session_state.derived = derived
+        st.session_state.zones = derived.zones
+        st.session_state.profiles = derived.profiles
+        st.session_state.sensors = derived.sensors
+        st.session_state.actuators = derived.actuators
+        st.session_state.readings = derived.readings
+        st.session_state.rules = derived.rules
+        st.session_state.catalog = derived.catalog
+        st.session_state.time_index = derived.time_index
+        st.session_state.rollup = derived.rollup
+        st.session_state.zone_tree = derived.zone_tree
+        st.session_state.schedules = derived.schedules
         st.session_state.data_loaded = True
         st.success("✅ Данные успешно загружены!")
 
@@ -63,41 +163,35 @@ if section == "Главная":
         # --- агрегаты ---
         st.subheader("Агрегаты")
         col1, col2, col3, col4 = st.columns(4)
-        top_zones = [z for z in zones if z.parent_id is None]
-        beds = [z for z in zones if z.parent_id is not None]
-        col1.metric("Теплиц", len(top_zones))
-        col2.metric("Грядок", len(beds))
+        tree = st.session_state.zone_tree
+        col1.metric("Теплиц", len(tree.roots))
+        col2.metric("Грядок", len(zones) - len(tree.roots))
         col3.metric("Сенсоров", len(sensors))
         col4.metric("Актуаторов", len(actuators))
 
         # --- фильтры ---
         st.sidebar.header("Фильтры")
-        top_zone_choices = [z.id for z in zones if z.parent_id is None]
+        top_zone_choices = list(tree.roots)
         selected_top_zone = st.sidebar.selectbox("Выберите теплицу", ["Все"] + top_zone_choices)
-        sensor_kinds = sorted(set(s.kind for s in sensors))
-        selected_kind = st.sidebar.selectbox("Тип сенсора", ["Все"] + sensor_kinds)
+        derived = st.session_state.derived
+        selected_kind = st.sidebar.selectbox("Тип сенсора", ["Все", *derived.sensor_kinds])
         start_date = st.sidebar.date_input("Начало периода")
         end_date = st.sidebar.date_input("Конец периода")
 
         # --- статистика ---
         st.subheader("Статистика показаний")
         rows = []
+        # статистика собирается из предагрегатов, сырые показания не перебираются
+        rollup = st.session_state.rollup
+        zone_sensors = None
+        if selected_top_zone != "Все":
+            zone_sensors = derived.zone_sensor_ids(selected_top_zone)
+
         for kind in ["temp", "hum_air", "hum_soil", "light", "co2"]:
             if selected_kind != "Все" and kind != selected_kind:
                 continue
 
-            filtered_readings = readings
-            if selected_top_zone != "Все":
-                bed_ids = [z.id for z in zones if z.parent_id == selected_top_zone]
-                zone_sensors = {s.id for s in sensors if getattr(s, "zone_id", None) in bed_ids}
-                filtered_readings = [r for r in filtered_readings if r.sensor_id in zone_sensors]
-
-            filtered_readings = [
-                r for r in filtered_readings
-                if start_date <= pd.to_datetime(r.ts).date() <= end_date
-            ]
-
-            stats = reading_stats(filtered_readings, sensors, kind)
+            stats = rollup.stats_days(start_date, end_date, kind, sensor_ids=zone_sensors)
             if stats:
                 rows.append({
                     "Параметр": kind,
@@ -115,13 +209,13 @@ if section == "Главная":
 
         # --- расписания ---
         st.subheader("Вентиляционные окна (расписания)")
-        days_order = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
         for profile in profiles:
-            if hasattr(profile, "schedule"):
+            schedule = st.session_state.schedules.get(profile.id)
+            if schedule:
                 st.subheader(f"Профиль: {profile.name}")
                 data = {}
-                for day in days_order:
-                    intervals = profile.schedule.get(day, [])
+                for day in WEEKDAYS:
+                    intervals = schedule.intervals_for(day)
                     if intervals:
                         data[day.capitalize()] = [", ".join([f"{start}-{end}" for start, end in intervals])]
                     else:
@@ -137,28 +231,31 @@ elif section == "Reports":
     if not st.session_state.data_loaded:
         st.warning("Сначала загрузите данные на вкладке 'Главная'.")
     else:
+        soil_sensors = st.session_state.derived.sensors_of_kind("hum_soil")
+        soil_id = st.selectbox("Сенсор влажности почвы", [s.id for s in soil_sensors], key="forecast_sensor")
         if st.button("Показать прогноз влажности почвы"):
-            soil_sensors = [s for s in st.session_state.sensors if s.kind == "hum_soil"]
             if not soil_sensors:
                 st.warning("Нет сенсоров влажности почвы.")
             else:
-                readings_sorted = sorted(st.session_state.readings, key=lambda r: pd.to_datetime(r.ts))
-                last_readings = [r for r in readings_sorted if r.sensor_id in {s.id for s in soil_sensors}][-24:]
-                today = date.today().strftime("%Y-%m-%d")
-                key = f"z1|{today}|60|p1"
-                forecast = soil_humidity_forecast(key, tuple(last_readings), 24)
+                # состояние ряда хранится по сенсору, прогноз — O(1) и кэшируется до нового показания
+                forecaster = st.session_state.derived.soil_forecaster
+                forecast = forecaster.forecast(soil_id, 24)
 
                 if not forecast:
                     st.info("Недостаточно данных для прогноза.")
                 else:
                     st.success("Прогноз рассчитан успешно ✅")
-                    df_forecast = pd.DataFrame({"Шаг": list(range(len(forecast))), "Влажность (%)": forecast})
+                    info = forecaster.cache.info()
+                    st.caption(f"Кэш прогнозов: попаданий {info['hits']}, промахов {info['misses']}, "
+                               f"записей {info['size']}/{info['maxsize']}")
+                    xs, ys = series_points(forecast)
+                    df_forecast = pd.DataFrame({"Шаг": xs, "Влажность (%)": ys})
                     st.line_chart(df_forecast.set_index("Шаг"))
        
         st.subheader("🧪 Проверка показаний датчика")
 
         
-        sensor_ids = [s.id for s in st.session_state.sensors]
+        sensor_ids = st.session_state.derived.sensor_ids
         selected_sensor = st.selectbox("Выберите сенсор", sensor_ids)
         value = st.number_input("Введите значение", min_value=0.0, max_value=1000.0, step=0.5)
 
@@ -174,7 +271,7 @@ elif section == "Reports":
             snapshot = {"temp": 22, "hum_air": 60, "hum_soil": 70}
             profile = st.session_state.profiles[0]
 
-            result = process_reading(reading, st.session_state.sensors, rules, snapshot, profile)
+            result = process_reading(reading, st.session_state.catalog, rules, snapshot, profile)
 
             st.subheader("Результат обработки")
 
@@ -208,64 +305,57 @@ elif section == "Reports":
                 st.write("Результат:", result)
     st.header("📊 Отчёты и прогнозы")
     date_str = st.date_input("Дата отчёта").strftime("%Y-%m-%d")
-    daily_readings = make_daily_readings(date_str, st.session_state.readings)
+    daily_readings = make_daily_readings(date_str, st.session_state.time_index)
     modes = modes_from_profile(st.session_state.profiles[0])
     if st.button("📅 Отчёт за день"):
-        report = asyncio.run(simulate_day(
+        # отчёт хранится в сессии: листание страниц и перезапуски не пересчитывают его
+        st.session_state.day_report = asyncio.run(simulate_day(
         date_str,                           # "2025-09-18"
         daily_readings,                     # readings for this day
         st.session_state.zones,             # zones
-        st.session_state.sensors,           # sensors
+        st.session_state.catalog,           # sensors (индексированный справочник)
         st.session_state.profiles,          # profiles
         st.session_state.rules              # rules
     ))
-        def show_day_report(report):
-            """Функция для красивого отображения результата simulate_day"""
-            
-            st.subheader(f"📅 Отчёт за {report['date']}")
-            
-            for zone_id, data in report["zones"].items():
-                st.markdown(f"### Зона {zone_id} — Профиль: {data['profile']}")
-                
-                # 1. Статистика
-                st.markdown("**Статистика параметров**")
-                stats_df = pd.DataFrame(data["stats"]).T  # транспонируем
-                st.table(stats_df)
-                
-                # 2. Алерты
-                st.markdown("**Алерты**")
-                if data["alerts"]:
-                    for alert in data["alerts"]:
-                        sev = alert.get("severity", "INFO").upper()
-                        msg = f"{alert['ts']} — {alert['code']} — {alert.get('message','')}"
-                        if sev == "CRITICAL":
-                            st.error(msg)
-                        elif sev == "WARNING":
-                            st.warning(msg)
-                        else:
-                            st.info(msg)
-                else:
-                    st.success("Нет алертов")
-                
-                # 3. Прогноз влажности почвы
-                if data["forecast"]:
-                    st.markdown("**Прогноз влажности почвы**")
-                    plt.figure(figsize=(6,3))
-                    plt.plot(data["forecast"], marker='o')
-                    plt.title(f"Прогноз влажности — зона {zone_id}")
-                    plt.xlabel("Час")
-                    plt.ylabel("Влажность %")
-                    st.pyplot(plt.gcf())
-                    plt.close()
-
-
-            # Итоговый summary
-            st.markdown("### 📊 Сводка за день")
-            summary = report["summary"]
-            st.metric("Общее число алертов", summary.get("total_alerts", 0))
-            st.metric("Зон без алертов", summary.get("zones_ok", 0))
-            st.metric("Зон с алертами", summary.get("zones_alert", 0))
-        show_day_report(report)
+
+    def show_day_report(report):
+        """Функция для красивого отображения результата simulate_day"""
+
+        st.subheader(f"📅 Отчёт за {report['date']}")
+
+        for zone_id, data in report["zones"].items():
+            st.markdown(f"### Зона {zone_id} — Профиль: {data['profile']}")
+
+            # 1. Статистика
+            st.markdown("**Статистика параметров**")
+            stats_df = pd.DataFrame(data["stats"]).T  # транспонируем
+            st.table(stats_df)
+
+            # 2. Алерты — постранично, без отдельного элемента на каждый
+            st.markdown("**Алерты**")
+            alerts = data["alerts"]
+            if alerts:
+                paged_table(f"day_alerts_{zone_id}", len(alerts),
+                            lambda start, stop: [alert_row(a) for a in alerts[start:stop]], newest_first=False)
+            else:
+                st.success("Нет алертов")
+
+            # 3. Прогноз влажности почвы
+            if data["forecast"]:
+                st.markdown("**Прогноз влажности почвы**")
+                series = (("", *series_points(data["forecast"])),)
+                st.image(line_chart_png(series, f"Прогноз влажности — зона {zone_id}", "Час", "Влажность %",
+                                        marker="o"))
+
+        # Итоговый summary
+        st.markdown("### 📊 Сводка за день")
+        summary = report["summary"]
+        st.metric("Общее число алертов", summary.get("total_alerts", 0))
+        st.metric("Зон без алертов", summary.get("zones_ok", 0))
+        st.metric("Зон с алертами", summary.get("zones_alert", 0))
+
+    if st.session_state.get("day_report"):
+        show_day_report(st.session_state.day_report)
 
     # --- Выбор периода ---
     from datetime import date, timedelta
@@ -286,53 +376,52 @@ elif section == "Reports":
 
 
     # Преобразуем даты в список строк "YYYY-MM-DD"
+    workers = st.number_input("Процессы для отчёта (0 — все ядра, 1 — последовательно)",
+                              min_value=0, value=1, step=1, key="report_workers")
     if st.button("📆 Недельный отчёт"):
-        report = asyncio.run(simulate_week(days, st.session_state.readings,
+        bar = st.progress(0.0, text="Расчёт отчёта…")
+        st.session_state.week_report = asyncio.run(simulate_week(days, st.session_state.readings,
                                        st.session_state.zones,
-                                       st.session_state.sensors,
+                                       st.session_state.catalog,
                                        st.session_state.profiles,
-                                       st.session_state.rules))
-    
+                                       st.session_state.rules,
+                                       workers=int(workers),
+                                       progress=lambda done, total: bar.progress(
+                                           done / total, text=f"Зоны-дни: {done}/{total}")))
+        bar.empty()
+
+    report = st.session_state.get("week_report")
+    if report:
         # --- ДЕТАЛЬНЫЙ ОТЧЁТ ПО ВСЕМ ДНЯМ И ЗОНАМ ---
-        st.subheader("📋 Детальный отчёт по дням и зонам")
+        # строки собираются один раз, на экран попадает одна страница таблицы
+        stats_rows, alert_rows, all_forecasts = [], [], []
         for day_data in report["per_day"]:
-            st.markdown(f"### 📅 {day_data['date']}")
             for zone_id, data in day_data["zones"].items():
-                st.markdown(f"**Зона:** {data['profile']} ({zone_id})")
-                
-                # Статистика параметров
-                st.markdown("**Статистика параметров:**")
                 for param, stats in data["stats"].items():
-                    st.write(f"{param}: {stats}")
-
-                # Алерты
-                st.markdown("**Алерты:**")
-                if data["alerts"]:
-                    for a in data["alerts"]:
-                        st.warning(f"{a['ts']} — {a['param']} = {a['value']}")
-                else:
-                    st.info("Алерты отсутствуют")
+                    stats_rows.append({"Дата": day_data["date"], "Зона": zone_id, "Профиль": data["profile"],
+                                       "Параметр": param, **(stats or {})})
+                for a in data["alerts"]:
+                    alert_rows.append({"Дата": day_data["date"], "Зона": zone_id, **alert_row(a)})
+                if data.get("forecast"):
+                    all_forecasts.append(data["forecast"])
 
-                
+        st.subheader("📋 Детальный отчёт по дням и зонам")
+        st.markdown("**Статистика параметров:**")
+        paged_table("week_stats", len(stats_rows), lambda start, stop: stats_rows[start:stop], newest_first=False)
+        st.markdown("**Алерты:**")
+        if alert_rows:
+            paged_table("week_alerts", len(alert_rows), lambda start, stop: alert_rows[start:stop],
+                        newest_first=False)
+        else:
+            st.info("Алерты отсутствуют")
 
         # --- ГРАФИК ПРОГНОЗА ВЛАЖНОСТИ ПОЧВЫ ---
         st.subheader("💧 Прогноз влажности почвы")
-        all_forecasts = []
-        for day_data in report["per_day"]:
-            for zone_id, data in day_data["zones"].items():
-                if data.get("forecast"):
-                    all_forecasts.append(data["forecast"])
-        
         if all_forecasts:
-            # Предположим, что forecast — это список чисел
-            plt.figure(figsize=(10,4))
-            for i, forecast in enumerate(all_forecasts):
-                plt.plot(range(len(forecast)), forecast, label=f"Zone {i+1}")
-            plt.xlabel("Часы")
-            plt.ylabel("Влажность почвы (%)")
-            plt.title("Прогноз влажности почвы на неделю")
-            plt.legend()
-            st.pyplot(plt)
+            # каждый ряд прорежен до ширины графика; картинка кэшируется по данным
+            series = tuple((f"Zone {i+1}", *series_points(forecast)) for i, forecast in enumerate(all_forecasts))
+            st.image(line_chart_png(series, "Прогноз влажности почвы на неделю", "Часы", "Влажность почвы (%)",
+                                    figsize=(10, 4)))
         else:
             st.info("Прогноз влажности почвы отсутствует")
 
@@ -342,16 +431,7 @@ elif section == "Reports":
         st.write(f"Зоны без алертов: {report['summary']['zones_ok']}")
         st.write(f"Зоны с алертами: {report['summary']['zones_alert']}")
 elif section == "Online Control":
-    if "event_bus" not in st.session_state:
-        bus = EventBus()
-        bus.subscribe("READING", handle_reading)
-        bus.subscribe("MODE_TICK", handle_mode_tick)
-        bus.subscribe("ACTUATE", handle_actuate)
-        bus.subscribe("ALERT_RAISED", handle_alert_raised)
-        bus.subscribe("ALERT_CLEARED", handle_alert_cleared)
-        st.session_state.event_bus = bus
-
-    bus = st.session_state.event_bus
+    bus = event_bus("data/eventlog")
     st.header("🔄 Онлайн управление актуаторами (пошагово)")
 
     # --- Проверка загрузки ---
@@ -368,25 +448,20 @@ elif section == "Online Control":
         st.warning("⚠️ Правила не загружены — вернитесь на вкладку 'Главная' и загрузите данные.")
         st.stop()
 
-    # --- Маппинг сенсоров ---
-    sensor_map = {s.id: s.kind for s in sensors}
-
-    # --- Формируем readings с kind ---
-    readings_objs = tuple(
-        type("R", (), {
-            "id": r.id,
-            "sensor_id": r.sensor_id,
-            "kind": sensor_map.get(r.sensor_id),
-            "value": r.value,
-            "ts": datetime.strptime(r.ts, "%Y-%m-%d %H:%M")
-        }) for r in readings
-    )
+    # показание с типом параметра собирается только для текущего шага
+    derived = st.session_state.derived
+    # показания, пришедшие в шину, сразу попадают в предагрегаты статистики
+    follow_rollup("data/eventlog", bus, derived)
 
     # --- Инициализация состояния ---
     if "stream_index" not in st.session_state:
         st.session_state.stream_index = 0
     if "commands_log" not in st.session_state:
         st.session_state.commands_log = []
+    if "rule_engine" not in st.session_state:
+        # пустое расписание профиля означает «без ограничений по времени»
+        schedule = st.session_state.schedules.get(profile.id) or None
+        st.session_state.rule_engine = RuleEngine(rules, st.session_state.catalog, schedule)
 
     # --- Кнопки управления ---
     col1, col2 = st.columns(2)
@@ -397,30 +472,37 @@ elif section == "Online Control":
     if reset_btn:
         st.session_state.stream_index = 0
         st.session_state.commands_log = []
+        del st.session_state["rule_engine"]
         st.toast("♻️ Поток сброшен")
 
     if next_btn:
         idx = st.session_state.stream_index
-        if idx < len(readings_objs):
-            # Берём одно показание
-            current_reading = readings_objs[idx]
-
-            # Генерируем команду для него
-            stream = [current_reading]
-            controller = lazy_hysteresis_control(stream, profile, rules)
-            commands = list(controller)
-
-            if commands:
-                for cmd in commands:
-                    msg = f"[{cmd.ts}] {cmd.actuator_id.upper()} → {cmd.action} ({cmd.payload.get('reason', '')})"
+        if idx < len(readings):
+            # Берём такт — подряд идущие показания с одной меткой времени,
+            # чтобы конфликт команд на один актуатор решался по приоритету
+            stop = idx + 1
+            while stop < len(readings) and readings[stop].ts == readings[idx].ts:
+                stop += 1
+            tick = [derived.control_reading(i) for i in range(idx, stop)]
+
+            # Движок правил хранит состояние между шагами (гистерезис, delta, stale)
+            results = st.session_state.rule_engine.feed_tick(tick)
+
+            if results:
+                for item in results:
+                    if isinstance(item, Command):
+                        msg = f"[{item.ts}] {item.actuator_id.upper()} → {item.action} ({item.payload.get('reason', '')})"
+                    else:
+                        msg = f"[{item.ts}] 🚨 {item.code}: {item.message}"
                     st.session_state.commands_log.append(msg)
             else:
+                kinds = ", ".join(sorted({str(r.kind) for r in tick}))
                 st.session_state.commands_log.append(
-                    f"[{current_reading.ts}] ⚠ Нет действий для {current_reading.kind}"
+                    f"[{tick[0].ts}] ⚠ Нет действий для {kinds}"
                 )
 
-            # Увеличиваем индекс
-            st.session_state.stream_index += 1
+            # Переходим к следующему такту
+            st.session_state.stream_index = stop
         else:
             st.warning("🚫 Поток завершён — больше показаний нет.")
     st.header("🛰 FRP — Шина событий")
@@ -455,15 +537,21 @@ elif section == "Online Control":
         bus.publish("ALERT_CLEARED", {"id": "A1"})
         st.toast("🧹 ALERT снят")
 
+    bus.flush()
     store = bus.store
 
     # -----------------------------
     # 📡 Последние показания
     st.subheader("📡 Последние показания")
-    readings = store.get("readings", [])
+    page_size = int(st.number_input("Строк на странице", min_value=5, max_value=500,
+                                    value=20, step=5, key="frp_page_size"))
+    readings = store.get("readings")
     if readings:
-        df_readings = pd.DataFrame(readings)
-        st.table(df_readings)
+        by_sensor = store["readings_by_sensor"]
+        view = st.selectbox("Витрина", ["Все сенсоры"] + sorted(by_sensor.keys()), key="frp_view")
+        buffer = readings if view == "Все сенсоры" else by_sensor.get(view)
+        paged_table(f"frp_readings_page_{view}", len(buffer), buffer.window_columns, page_size)
+        st.caption(f"В буфере {len(buffer)} из {buffer.capacity}, всего получено {buffer.total}")
     else:
         st.info("Нет данных")
 
@@ -472,18 +560,18 @@ elif section == "Online Control":
     st.subheader("🚨 Активные алерты")
     alerts = store.get("alerts", {})
     if alerts:
-        df_alerts = pd.DataFrame(list(alerts.items()), columns=["Alert", "Status"])
-        st.table(df_alerts)
+        paged_table("frp_alerts_page", len(alerts), lambda start, stop: [
+            {"Alert": aid, "Status": status} for aid, status in islice(alerts.items(), start, stop)
+        ], page_size, newest_first=False)
     else:
         st.success("Нет активных алертов")  # зеленый цвет, т.к. нет проблем
 
     # -----------------------------
     # 🟩 Последние команды
     st.subheader("🟩 Последние команды")
-    commands = store.get("commands", [])
+    commands = store.get("commands")
     if commands:
-        df_commands = pd.DataFrame(commands)
-        st.table(df_commands)
+        paged_table("frp_commands_page", len(commands), commands.window_columns, page_size)
     else:
         st.info("Команды отсутствуют")
 
@@ -502,8 +590,9 @@ elif section == "Online Control":
     st.subheader("📜 Журнал команд")
     commands_log = st.session_state.get("commands_log", [])
     if commands_log:
-        for i, cmd in enumerate(commands_log, 1):
-            st.markdown(f"{i}. {cmd}")
+        paged_table("commands_log_page", len(commands_log), lambda start, stop: [
+            {"№": i, "Запись": cmd} for i, cmd in enumerate(commands_log[start:stop], start + 1)
+        ], page_size)
     else:
         st.info("Журнал пуст")
 elif section == "Functional Core":
@@ -520,11 +609,14 @@ elif section == "Functional Core":
         deciders={"actuate": decide_actuation}
     )
 
-    alert = AlertService(
-        rules=(rule_temp_high,),
-        raiser=raise_alert,
-        clearer=clear_alert
-    )
+    # сервис алертов помнит поднятые алерты, поэтому живёт в сессии, а не пересоздаётся
+    if "alert_service" not in st.session_state:
+        st.session_state.alert_service = AlertService(
+            rules=(rule_temp_high,),
+            raiser=raise_alert,
+            clearer=clear_alert
+        )
+    alert = st.session_state.alert_service
 
     report = ReportService(
         aggregators={
@@ -550,7 +642,7 @@ elif section == "Functional Core":
         snapshot = select_snapshot(store, zone_id)
         alerts = alert.evaluate_alerts(snapshot)
         st.session_state.alerts.extend(alerts)
-        st.info(f"Алертов создано: {len(alerts)}")
+        st.info(f"Алертов создано: {len(alerts)} (активных: {len(alert.active)})")
 
     # Отчёт дня
     day = st.date_input("Дата отчёта", datetime.today()).strftime("%Y-%m-%d")
@@ -564,3 +656,60 @@ elif section == "Functional Core":
 
     st.subheader("🚨 Последние алерты")
     st.json([a.__dict__ for a in st.session_state.alerts[-5:]])
+elif section == "Performance":
+    st.header("⏱ Производительность стадий")
+
+    METRICS.enabled = st.checkbox("Собирать метрики", value=METRICS.enabled)
+    st.caption("Счётчики общие для процесса: включите сбор и поработайте в других разделах. "
+               "Стадии отчёта, посчитанные в пуле процессов, здесь не видны.")
+
+    def fmt_seconds(s):
+        if s is None:
+            return "—"
+        if s < 1e-3:
+            return f"{s * 1e6:.0f} мкс"
+        if s < 1:
+            return f"{s * 1e3:.1f} мс"
+        return f"{s:.2f} с"
+
+    col_reset, col_save, col_download = st.columns(3)
+    if col_reset.button("Сбросить"):
+        METRICS.reset()
+    if col_save.button("Сохранить data/metrics.prom"):
+        st.success(f"Записано: {METRICS.write_prometheus('data/metrics.prom')}")
+    col_download.download_button("Prometheus (.prom)", METRICS.to_prometheus(),
+                                 file_name="greenhouse.prom", mime="text/plain")
+
+    snap = METRICS.snapshot()
+    active = {name: s for name, s in snap.items() if s["count"]}
+    if not active:
+        st.info("Замеров пока нет.")
+    else:
+        st.dataframe(pd.DataFrame([{
+            "Стадия": name,
+            "Вызовов": s["count"],
+            "Ошибок": s["errors"],
+            "Элементов": s["items"],
+            "Всего": fmt_seconds(s["sum"]),
+            "Среднее": fmt_seconds(s["mean"]),
+            "p50": fmt_seconds(s["p50"]),
+            "p90": fmt_seconds(s["p90"]),
+            "p99": fmt_seconds(s["p99"]),
+            "Макс.": fmt_seconds(s["max"]),
+            "Элементов/с": round(s["items_per_s"] or 0),
+        } for name, s in active.items()]).set_index("Стадия"))
+
+        stage = st.selectbox("Гистограмма задержек", list(active))
+        cumulative = [n for _, n in active[stage]["buckets"]]
+        counts = [b - a for a, b in zip([0] + cumulative[:-1], cumulative)]
+        labels = [f"≤{fmt_seconds(b / 1e9)}" for b in BOUNDS_NS] + ["больше"]
+        plt.figure(figsize=(10, 3))
+        plt.bar(range(len(counts)), counts)
+        plt.xticks(range(len(counts)), labels, rotation=60, fontsize=7)
+        plt.ylabel("Вызовов")
+        plt.title(stage)
+        st.pyplot(plt.gcf())
+        plt.close()
+
+    with st.expander("Снимок метрик (dict)"):
+        st.json(snap)
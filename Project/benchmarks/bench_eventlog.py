@@ -0,0 +1,67 @@
+"""
+Запись и воспроизведение журнала событий (core.eventlog).
+
+    python benchmarks/bench_eventlog.py --events 1000000,5000000
+
+Для каждого размера во временном каталоге измеряются:
+  append  — публикация через LoggedEventBus с групповой фиксацией и fsync
+  replay  — чтение всех событий из сегментов (EventLog.replay)
+  recover — старт шины без снимка: воспроизведение через обработчики
+  snap    — старт шины со снимка в конце журнала
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core.eventlog import EventLog, LoggedEventBus
+from core.frp import handle_reading
+
+
+def make_bus(directory: str, fsync: bool, group: int) -> LoggedEventBus:
+    bus = LoggedEventBus(EventLog(directory, group_size=group, fsync=fsync), snapshot_every=0)
+    bus.subscribe("READING", handle_reading)
+    bus.recover()
+    return bus
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - t0, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", default="1000000")
+    parser.add_argument("--group", type=int, default=512, help="событий на одну фиксацию")
+    parser.add_argument("--no-fsync", action="store_true")
+    args = parser.parse_args()
+
+    print(f"{'events':>10} {'append, ev/s':>13} {'replay, ev/s':>13} {'recover, s':>11} {'snap, s':>8} {'MB':>7}")
+    for n in (int(x) for x in args.events.split(",")):
+        with tempfile.TemporaryDirectory() as tmp:
+            bus = make_bus(tmp, not args.no_fsync, args.group)
+
+            def publish():
+                for i in range(n):
+                    bus.publish("READING", {"sensor": f"s{i % 100}", "value": i % 1000 / 10})
+                bus.log.close()
+            t_append, _ = timed(publish)
+            size = sum(os.path.getsize(p) for _, p in bus.log.segments()) / 1e6
+
+            t_replay, count = timed(lambda: sum(1 for _ in EventLog(tmp, fsync=False).replay()))
+            assert count == n
+            t_recover, bus = timed(lambda: make_bus(tmp, False, args.group))
+            assert bus.seq == n
+            bus.snapshot()
+            bus.log.close()
+            t_snap, bus = timed(lambda: make_bus(tmp, False, args.group))
+            assert bus.seq == n
+            print(f"{n:>10} {n / t_append:>13,.0f} {n / t_replay:>13,.0f} {t_recover:>11.2f} {t_snap:>8.3f} {size:>7.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Пропускная способность контроллера с гистерезисом: генератор против пакетного режима.
+
+    python benchmarks/bench_hysteresis.py --sizes 100000,1000000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core.domain import Rule
+from core.lazy import KindReading, hysteresis_control_batch, lazy_hysteresis_control
+from core.store import from_epoch, to_epoch
+
+KINDS = np.array(["temp", "hum_air", "hum_soil", "light", "co2"], dtype=object)
+RULES = (
+    Rule("r1", "range", {"param": "temp", "min": 18, "max": 25}),
+    Rule("r2", "range", {"param": "hum_air", "min": 50, "max": 70}),
+    Rule("r3", "range", {"param": "hum_soil", "min": 60, "max": 80}),
+    Rule("r4", "range", {"param": "co2", "min": 400, "max": 1000}),
+    Rule("r5", "range", {"param": "light", "min": 1500, "max": 3000}),
+)
+CENTER = {"temp": 21.5, "hum_air": 60, "hum_soil": 70, "light": 2250, "co2": 700}
+SPREAD = {"temp": 5, "hum_air": 14, "hum_soil": 14, "light": 1000, "co2": 400}
+
+
+def make_columns(n: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    kinds = KINDS[rng.integers(0, len(KINDS), n)]
+    center = np.array([CENTER[k] for k in kinds])
+    spread = np.array([SPREAD[k] for k in kinds])
+    values = np.round(center + spread * rng.standard_normal(n), 1)
+    ts = to_epoch("2025-09-01 00:00") + 60 * np.arange(n, dtype=np.int64)
+    return ts, kinds, values
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="100000,1000000")
+    args = parser.parse_args()
+
+    print(f"{'readings':>10} {'generator, r/s':>15} {'batch, r/s':>12} {'speedup':>8} {'commands':>9}")
+    for n in (int(x) for x in args.sizes.split(",")):
+        ts, kinds, values = make_columns(n)
+        stream = [KindReading(str(i), "s", k, float(v), from_epoch(t))
+                  for i, (t, k, v) in enumerate(zip(ts.tolist(), kinds, values))]
+
+        t0 = time.perf_counter()
+        expected = tuple(lazy_hysteresis_control(stream, None, RULES))
+        t_gen = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        got = hysteresis_control_batch(ts, kinds, values, RULES)
+        t_batch = time.perf_counter() - t0
+
+        assert got == expected, "batch result differs from the generator"
+        print(f"{n:>10} {n / t_gen:>15,.0f} {n / t_batch:>12,.0f} {t_gen / t_batch:>7.1f}x {len(got):>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Пропускная способность и задержка сетевого приёма (core.ingest).
+
+    python benchmarks/bench_ingest.py --readings 200000 --batch 50,200,1000
+
+Сервер, асинхронная шина с витринами core.frp и генератор нагрузки работают
+в одном процессе и одном цикле событий — то есть на одном ядре. Сенсоры,
+профиль и правила — из data/seed.json.
+"""
+import argparse
+import asyncio
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core.asyncbus import AsyncEventBus
+from core.frp import configure_views, handle_reading
+from core.ingest import IngestServer, Ingestor, load_tcp, load_udp, make_batches
+from core.transforms import load_seed
+
+SEED = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "seed.json")
+
+
+async def run(protocol: str, readings: int, batch: int, window: int, seed) -> tuple:
+    _, profiles, sensors, _, _, rules = seed
+    bus = AsyncEventBus(maxsize=8192, batch_size=256)
+    configure_views(bus.store)
+    bus.subscribe_each("READING", handle_reading)
+    ingestor = Ingestor(bus, sensors, profiles[0], rules)
+    batches = make_batches([s.id for s in sensors], readings, batch)
+    async with bus, IngestServer(ingestor, udp_port=0) as server:
+        if protocol == "tcp":
+            report = await load_tcp(server.host, server.port, batches, readings, window)
+        else:
+            report = await load_udp(server.host, server.udp_port, batches, readings, window)
+    assert bus.metrics()["READING"]["delivered"] == report.accepted
+    return report, ingestor
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--readings", type=int, default=200000)
+    parser.add_argument("--batch", default="50,200,1000")
+    parser.add_argument("--window", type=int, default=8)
+    parser.add_argument("--protocols", default="tcp,udp")
+    args = parser.parse_args()
+
+    seed = load_seed(SEED)
+    print(f"{'proto':>5} {'batch':>6} {'readings/s':>11} {'p50, ms':>8} {'p90, ms':>8} {'p99, ms':>8} {'lost':>5}")
+    for protocol in args.protocols.split(","):
+        for batch in (int(x) for x in args.batch.split(",")):
+            if protocol == "udp" and batch > 500:
+                continue  # пакет не помещается в датаграмму
+            report, _ = asyncio.run(run(protocol, args.readings, batch, args.window, seed))
+            p = report.percentiles()
+            print(f"{protocol:>5} {batch:>6} {report.rate:>11,.0f} {p[50]:>8.2f} {p[90]:>8.2f} {p[99]:>8.2f} "
+                  f"{report.batches - report.acked:>5}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Масштабирование simulate_week по числу процессов.
+
+    python benchmarks/bench_parallel_report.py --readings 200000 --zones 16 --workers 1,2,4,8
+
+Показания синтетические (зоны z1..zN, по 5 сенсоров на зону), профиль и правила — из data/seed.json.
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core.catalog import Catalog
+from core.domain import Reading, Sensor, Zone
+from core.report import simulate_week
+from core.transforms import load_seed
+
+KINDS = ("temp", "hum_air", "hum_soil", "light", "co2")
+SEED = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "seed.json")
+
+
+def make_dataset(n: int, zones: int):
+    _, profiles, _, _, _, rules = load_seed(SEED)
+    zone_list = tuple(Zone(f"z{i + 1}", f"Зона {i + 1}") for i in range(zones))
+    sensors = tuple(Sensor(f"s{k + 1}_{z.id}", f"d_{z.id}", kind, "", z.id)
+                    for z in zone_list for k, kind in enumerate(KINDS))
+    rnd = random.Random(42)
+    start = datetime(2025, 9, 1)
+    readings = tuple(
+        Reading(f"r{i + 1}", sensors[i % len(sensors)].id,
+                (start + timedelta(minutes=10 * (i // len(sensors)))).strftime("%Y-%m-%d %H:%M"),
+                round(rnd.uniform(0, 100), 1))
+        for i in range(n)
+    )
+    return readings, zone_list, Catalog(zone_list, profiles, sensors, (), rules), profiles, rules
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--readings", type=int, default=200000)
+    parser.add_argument("--zones", type=int, default=16)
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--workers", default="1,2,4")
+    args = parser.parse_args()
+
+    readings, zones, catalog, profiles, rules = make_dataset(args.readings, args.zones)
+    days = [f"2025-09-{d + 1:02d}" for d in range(args.days)]
+    print(f"{'workers':>8} {'time, s':>9} {'speedup':>8}")
+    baseline = reference = None
+    for workers in (int(x) for x in args.workers.split(",")):
+        t0 = time.perf_counter()
+        report = asyncio.run(simulate_week(days, readings, zones, catalog, profiles, rules, workers=workers))
+        elapsed = time.perf_counter() - t0
+        if reference is None:
+            baseline, reference = elapsed, repr(report)
+        assert repr(report) == reference, "parallel report differs from the first run"
+        print(f"{workers:>8} {elapsed:>9.2f} {baseline / elapsed:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
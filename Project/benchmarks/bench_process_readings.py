@@ -0,0 +1,54 @@
+"""
+Проверка показаний: process_reading по одному против пакетного process_readings.
+
+    python benchmarks/bench_process_readings.py --readings 200000
+
+Показания синтетические по сенсорам и профилю из data/seed.json; результаты
+обоих путей сравниваются целиком.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core.catalog import Catalog
+from core.domain import Reading
+from core.pipeline import ProfileTable, process_reading, process_readings
+from core.transforms import load_seed
+
+SEED = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "seed.json")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--readings", type=int, default=200000)
+    args = parser.parse_args()
+
+    seed = load_seed(SEED)
+    catalog = Catalog.from_seed(seed)
+    profile, rules = seed[1][0], seed[5]
+    rnd = random.Random(42)
+    sensors = catalog.sensors
+    readings = [Reading(f"r{i}", sensors[i % len(sensors)].id, "2025-09-01 00:00", round(rnd.uniform(0, 1000), 1))
+                for i in range(args.readings)]
+
+    t0 = time.perf_counter()
+    single = [process_reading(r, catalog, rules, {}, profile) for r in readings]
+    t_single = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    result = process_readings(readings, catalog, ProfileTable.from_profile(profile))
+    t_batch = time.perf_counter() - t0
+    counts = result.counts()
+
+    assert result.results() == single
+    n = args.readings
+    print(f"process_reading : {t_single:.3f} s  ({n / t_single:,.0f} readings/s)")
+    print(f"process_readings: {t_batch:.3f} s  ({n / t_batch:,.0f} readings/s)  x{t_single / t_batch:.1f}")
+    print(f"statuses: {counts}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Сравнение холодной загрузки JSON и загрузки из бинарного кэша (core.seedcache).
+
+    python benchmarks/bench_seed_cache.py --sizes 1000000,10000000
+
+Для каждого размера генерируется seed.json во временном каталоге, затем измеряются:
+  json   — load_seed(path)              (только при --with-json, создаёт все Reading)
+  cold   — load_seed(path, cache=True)  без сайдкара: разбор JSON + запись кэша
+  cached — load_seed(path, cache=True)  повторно: mmap готового кэша
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core.seedcache import cache_path
+from core.transforms import load_seed
+
+KINDS = ("temp", "hum_air", "hum_soil", "light", "co2")
+
+
+def write_seed(path: str, n: int, sensors: int = 100) -> None:
+    """Пишет seed.json с n показаниями потоково, не держа их в памяти."""
+    rnd = random.Random(42)
+    start = datetime(2025, 9, 1)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('{"zones":[{"id":"z1","name":"Теплица 1","parent_id":null}],"profiles":[],')
+        f.write('"sensors":' + json.dumps([
+            {"id": f"s{i + 1}", "device_id": f"d{i + 1}", "kind": KINDS[i % 5], "unit": ""}
+            for i in range(sensors)
+        ]))
+        f.write(',"actuators":[],"rules":[],"readings":[')
+        for i in range(n):
+            ts = (start + timedelta(minutes=10 * (i // sensors))).strftime("%Y-%m-%d %H:%M")
+            row = f'{{"id":"r{i + 1}","sensor_id":"s{i % sensors + 1}","ts":"{ts}","value":{rnd.uniform(0, 100):.1f}}}'
+            f.write(row if i == 0 else "," + row)
+        f.write("]}")
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - t0, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000000,10000000")
+    parser.add_argument("--with-json", action="store_true", help="также замерить load_seed без кэша")
+    args = parser.parse_args()
+
+    print(f"{'readings':>10} {'json, s':>9} {'cold, s':>9} {'cached, s':>10} {'speedup':>8}")
+    for n in (int(x) for x in args.sizes.split(",")):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "seed.json")
+            write_seed(path, n)
+            t_json = timed(lambda: load_seed(path))[0] if args.with_json else float("nan")
+            t_cold, _ = timed(lambda: load_seed(path, cache=True))
+            t_cached, loaded = timed(lambda: load_seed(path, cache=True))
+            assert len(loaded[4]) == n and os.path.exists(cache_path(path))
+            print(f"{n:>10} {t_json:>9.3f} {t_cold:>9.3f} {t_cached:>10.4f} {t_cold / t_cached:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,332 @@
+"""
+Набор бенчмарков горячих путей с масштабом из командной строки и результатом в JSON.
+
+    python benchmarks/suite.py --zones 8 --beds 4 --sensors 5 --readings 200000 --rules 40 --out run.json
+    python benchmarks/suite.py --only filters,process_readings --compare run.json
+
+Датасет синтетический и детерминированный: zones теплиц по beds грядок, на каждой
+грядке sensors сенсоров (виды по кругу), readings показаний за days дней,
+rules правил-диапазонов поверх delta/stale/priority из data/seed.json.
+Каждый случай повторяется repeat раз; в JSON — все замеры, лучший, медиана,
+число обработанных элементов и элементов в секунду, а также масштаб и окружение,
+чтобы прогоны можно было сравнивать между собой (--compare).
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+from core.alerts import AlertEngine, profile_rules
+from core.catalog import Catalog
+from core.domain import Reading, Rule, Sensor, Zone
+from core.filters import by_sensor_kind, by_time_range, by_zone
+from core.forecast import FORECAST_CACHE, soil_humidity_forecast
+from core.lazy import lazy_hysteresis_control, with_kind
+from core.pipeline import ProfileTable, process_reading, process_readings
+from core.recursion import collect_descendant_zones, expand_schedule, find_sensors_in_zone
+from core.render import downsample
+from core.report import simulate_day, simulate_week
+from core.transforms import load_seed, reading_stats
+
+KINDS = ("temp", "hum_air", "hum_soil", "light", "co2")
+UNITS = {"temp": "°C", "hum_air": "%", "hum_soil": "%", "light": "lux", "co2": "ppm"}
+CENTER = {"temp": 21.5, "hum_air": 60, "hum_soil": 70, "light": 2250, "co2": 700}
+SPREAD = {"temp": 5, "hum_air": 14, "hum_soil": 14, "light": 1000, "co2": 400}
+SEED = os.path.join(ROOT, "data", "seed.json")
+TS_FORMAT = "%Y-%m-%d %H:%M"
+
+CASES = {}
+
+
+def case(name: str):
+    """Регистрирует случай: функция (ds) -> (вызов без аргументов, число элементов)."""
+    def register(fn):
+        CASES[name] = fn
+        return fn
+    return register
+
+
+class Dataset:
+    def __init__(self, zones: int, beds: int, sensors: int, readings: int, rules: int, days: int, seed: int = 42):
+        _, profiles, _, _, _, seed_rules = load_seed(SEED)
+        rnd = random.Random(seed)
+        self.scale = {"zones": zones, "beds": beds, "sensors": sensors, "readings": readings,
+                      "rules": rules, "days": days}
+        self.zones = tuple(Zone(f"z{g + 1}", f"Теплица {g + 1}") for g in range(zones)) + tuple(
+            Zone(f"z{g + 1}_{b + 1}", f"Грядка {b + 1} (Теплица {g + 1})", f"z{g + 1}")
+            for g in range(zones) for b in range(beds))
+        leaves = [z for z in self.zones if z.parent_id is not None] or list(self.zones)
+        self.sensors = tuple(
+            Sensor(f"s{i * sensors + k + 1}", f"{z.id}_d{k + 1}", KINDS[k % len(KINDS)],
+                   UNITS[KINDS[k % len(KINDS)]], z.id)
+            for i, z in enumerate(leaves) for k in range(sensors))
+        self.profiles = profiles
+        self.rules = tuple(
+            Rule(f"b{i + 1}", "range", {
+                "param": KINDS[i % len(KINDS)],
+                "min": CENTER[KINDS[i % len(KINDS)]] - SPREAD[KINDS[i % len(KINDS)]] * rnd.uniform(0.3, 0.9),
+                "max": CENTER[KINDS[i % len(KINDS)]] + SPREAD[KINDS[i % len(KINDS)]] * rnd.uniform(0.3, 0.9),
+                "cooldown": rnd.choice((0, 60, 600)),
+            })
+            for i in range(rules)) + tuple(r for r in seed_rules if r.kind != "range")
+        self.catalog = Catalog(self.zones, profiles, self.sensors, (), self.rules)
+
+        start = datetime(2025, 9, 1)
+        n_sensors = len(self.sensors)
+        step = timedelta(minutes=days * 1440 / max(1, -(-readings // n_sensors)))
+        self.days = [(start + timedelta(days=d)).strftime("%Y-%m-%d") for d in range(days)]
+        self.readings = tuple(
+            Reading(f"r{i + 1}", s.id, (start + step * (i // n_sensors)).strftime(TS_FORMAT),
+                    round(rnd.gauss(CENTER[s.kind], SPREAD[s.kind]), 1))
+            for i, s in ((i, self.sensors[i % n_sensors]) for i in range(readings)))
+        self.schedules = [
+            [[f"{h:02d}:00", f"{h + rnd.randint(1, 6):02d}:30"] for h in sorted(rnd.sample(range(17), 4))]
+            for _ in range(len(self.zones))]
+        self._tmp = None
+
+    def seed_path(self) -> str:
+        """seed.json датасета во временном каталоге (пишется один раз)."""
+        if self._tmp is None:
+            self._tmp = tempfile.TemporaryDirectory()
+            self.write_seed(os.path.join(self._tmp.name, "seed.json"))
+        return os.path.join(self._tmp.name, "seed.json")
+
+    def close(self) -> None:
+        if self._tmp is not None:
+            self._tmp.cleanup()
+            self._tmp = None
+
+    def write_seed(self, path: str) -> None:
+        data = {
+            "zones": [vars(z) for z in self.zones],
+            "profiles": [vars(p) for p in self.profiles],
+            "sensors": [vars(s) for s in self.sensors],
+            "actuators": [],
+            "readings": [vars(r) for r in self.readings],
+            "rules": [vars(r) for r in self.rules],
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+
+
+# --- случаи ---
+@case("load_seed")
+def _load_seed(ds):
+    path = ds.seed_path()
+    return lambda: load_seed(path), len(ds.readings)
+
+
+@case("load_seed_cached")
+def _load_seed_cached(ds):
+    path = ds.seed_path()
+    load_seed(path, cache=True)  # холодный вызов строит сайдкар
+    return lambda: load_seed(path, cache=True), len(ds.readings)
+
+
+@case("reading_stats")
+def _reading_stats(ds):
+    return lambda: [reading_stats(ds.readings, ds.catalog, kind) for kind in KINDS], len(ds.readings) * len(KINDS)
+
+
+@case("filters")
+def _filters(ds):
+    top = [z.id for z in ds.zones if z.parent_id is None]
+    start, end = f"{ds.days[0]} 06:00", f"{ds.days[0]} 18:00"
+
+    def run():
+        for zone_id in top:
+            by_zone(ds.readings, ds.sensors, zone_id)
+        by_sensor_kind(ds.readings, ds.sensors, "temp")
+        by_time_range(ds.readings, start, end)
+    return run, len(ds.readings) * (len(top) + 2)
+
+
+@case("zone_tree")
+def _zone_tree(ds):
+    ids = [z.id for z in ds.zones]
+
+    def run():
+        for zone_id in ids:
+            collect_descendant_zones(ds.zones, zone_id)
+            find_sensors_in_zone(ds.zones, ds.sensors, zone_id)
+    return run, len(ids)
+
+
+@case("expand_schedule")
+def _expand_schedule(ds):
+    return lambda: [expand_schedule(s, ds.days[0]) for s in ds.schedules], len(ds.schedules)
+
+
+@case("lazy_hysteresis_control")
+def _hysteresis(ds):
+    profile = ds.profiles[0]
+    return lambda: sum(1 for _ in lazy_hysteresis_control(with_kind(ds.readings, ds.sensors), profile, ds.rules)), \
+        len(ds.readings)
+
+
+@case("process_reading")
+def _process_reading(ds):
+    profile = ds.profiles[0]
+    return lambda: [process_reading(r, ds.catalog, ds.rules, {}, profile) for r in ds.readings], len(ds.readings)
+
+
+@case("process_readings")
+def _process_readings(ds):
+    table = ProfileTable.from_profile(ds.profiles[0])
+    return lambda: process_readings(ds.readings, ds.catalog, table), len(ds.readings)
+
+
+@case("alert_batch")
+def _alert_batch(ds):
+    # снимок на каждую зону, значения — показания датасета по кругу; 10 тактов подряд
+    values = [r.value for r in ds.readings[:1000]] or [0.0]
+    snapshots = [{"zone": z.id, "temp": values[i % len(values)], "hum_air": values[(i + 1) % len(values)],
+                  "hum_soil": values[(i + 2) % len(values)], "co2": 600, "light": 2000}
+                 for i, z in enumerate(ds.zones)]
+    profile = ds.profiles[0]
+
+    def run():
+        engine = AlertEngine(profile_rules(profile))
+        for step in range(10):
+            engine.evaluate_batch(snapshots, now=step * 60)
+    return run, 10 * len(snapshots)
+
+
+@case("downsample")
+def _downsample(ds):
+    values = np.array([r.value for r in ds.readings], dtype=np.float64)
+
+    def run():
+        downsample(values, method="lttb")
+        downsample(values, method="minmax")
+    return run, 2 * len(values)
+
+
+@case("soil_humidity_forecast")
+def _forecast(ds):
+    soil = {s.id for s in ds.sensors if s.kind == "hum_soil"}
+    series = {}
+    for r in ds.readings:
+        if r.sensor_id in soil:
+            series.setdefault(r.sensor_id, []).append(r)
+    windows = [(sid, tuple(rs[i:i + 24])) for sid, rs in series.items() for i in range(0, len(rs) - 23, 24)]
+
+    def run():
+        FORECAST_CACHE.clear()  # иначе повторы — одни попадания в кэш
+        for i, (sid, window) in enumerate(windows):
+            soil_humidity_forecast(f"{sid}|{i}", window, 24)
+    return run, len(windows)
+
+
+@case("simulate_day")
+def _simulate_day(ds):
+    day = ds.days[0]
+    readings = tuple(r for r in ds.readings if r.ts.startswith(day))
+    return lambda: asyncio.run(simulate_day(day, readings, ds.zones, ds.catalog, ds.profiles, ds.rules)), \
+        len(readings)
+
+
+@case("simulate_week")
+def _simulate_week(ds):
+    return lambda: asyncio.run(simulate_week(ds.days, ds.readings, ds.zones, ds.catalog, ds.profiles, ds.rules)), \
+        len(ds.readings)
+
+
+# --- запуск ---
+def measure(fn, repeat: int) -> list[float]:
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return times
+
+
+def environment() -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                                text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "time": datetime.now().isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def run_suite(ds: Dataset, names, repeat: int, progress=None) -> dict:
+    results = {}
+    for name in names:
+        fn, items = CASES[name](ds)
+        times = measure(fn, repeat)
+        best = min(times)
+        results[name] = {
+            "seconds": times,
+            "best": best,
+            "median": statistics.median(times),
+            "items": items,
+            "items_per_s": items / best if best else None,
+        }
+        if progress is not None:
+            progress(name, results[name])
+    return {"environment": environment(), "scale": ds.scale, "repeat": repeat, "results": results}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--zones", type=int, default=4, help="теплиц (зон верхнего уровня)")
+    parser.add_argument("--beds", type=int, default=4, help="грядок в теплице")
+    parser.add_argument("--sensors", type=int, default=5, help="сенсоров на грядку")
+    parser.add_argument("--readings", type=int, default=50000)
+    parser.add_argument("--rules", type=int, default=10, help="правил-диапазонов")
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--only", help="случаи через запятую: " + ",".join(CASES))
+    parser.add_argument("--out", help="файл для JSON с результатами")
+    parser.add_argument("--compare", help="JSON прошлого прогона для сравнения")
+    args = parser.parse_args()
+
+    names = args.only.split(",") if args.only else list(CASES)
+    unknown = [n for n in names if n not in CASES]
+    if unknown:
+        parser.error(f"неизвестные случаи: {', '.join(unknown)}")
+    previous = {}
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            previous = json.load(f)["results"]
+
+    ds = Dataset(args.zones, args.beds, args.sensors, args.readings, args.rules, args.days)
+    print(f"{'case':<24} {'best, s':>9} {'median, s':>10} {'items/s':>12} {'vs prev':>8}")
+
+    def report(name, r):
+        prev = previous.get(name)
+        ratio = f"{prev['best'] / r['best']:>7.2f}x" if prev and r["best"] else f"{'—':>8}"
+        print(f"{name:<24} {r['best']:>9.4f} {r['median']:>10.4f} {r['items_per_s'] or 0:>12,.0f} {ratio}")
+
+    try:
+        result = run_suite(ds, names, args.repeat, report)
+    finally:
+        ds.close()
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
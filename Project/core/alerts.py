@@ -0,0 +1,188 @@
+"""
+Движок алертов с состоянием. На каждую пару (зона, правило) хранится флаг
+активности, начало ожидания и номер эпизода — ячейки массивов numpy, доступ O(1).
+Наружу выходят только переходы: подъём и снятие, повторные срабатывания
+того же условия событий не порождают.
+
+Правило задаёт гистерезис (порог подъёма и более мягкий порог снятия) и таймеры
+удержания: условие должно держаться raise_after / clear_after секунд, прежде чем
+состояние сменится. Пакет снимков зон оценивается одним вызовом, сравнения
+векторизованы по правилам и зонам сразу.
+"""
+from dataclasses import dataclass
+from typing import Iterable, Sequence
+
+import numpy as np
+
+from core.domain import Alert
+from core.metrics import instrument
+from core.store import from_epoch, to_epoch
+
+RANGE_PARAMS = {
+    "temp": "temp_range",
+    "hum_air": "hum_air_range",
+    "hum_soil": "hum_soil_range",
+    "co2": "co2_range",
+}
+
+
+@dataclass(frozen=True)
+class AlertRule:
+    """
+    above=True — алерт при value > raise_at, снятие при value < clear_at (clear_at <= raise_at);
+    above=False — зеркально, для нижних границ. Между порогами состояние не меняется.
+    """
+    code: str
+    param: str
+    raise_at: float
+    clear_at: float
+    above: bool = True
+    raise_after: int = 0
+    clear_after: int = 0
+    severity: str = "WARNING"
+    message: str = "{param} = {value:g}, порог {limit:g}"
+    clear_code: str = ""
+    clear_message: str = "{param} вернулся в норму: {value:g}"
+
+    def __post_init__(self):
+        if (self.clear_at > self.raise_at) if self.above else (self.clear_at < self.raise_at):
+            raise ValueError(f"{self.code}: порог снятия должен лежать по эту сторону порога подъёма")
+        if self.raise_after < 0 or self.clear_after < 0:
+            raise ValueError(f"{self.code}: таймеры удержания не могут быть отрицательными")
+
+
+def profile_rules(profile, band: float = 0.05, raise_after: int = 0, clear_after: int = 0) -> tuple[AlertRule, ...]:
+    """
+    Правила «выше / ниже нормы» по диапазонам профиля; полоса гистерезиса —
+    доля band ширины диапазона (для освещённости — от light_min).
+    """
+    rules = []
+    for param, attr in RANGE_PARAMS.items():
+        lo, hi = getattr(profile, attr)
+        margin = (hi - lo) * band
+        name = param.upper()
+        rules.append(AlertRule(f"{name}_HIGH", param, hi, hi - margin, True, raise_after, clear_after))
+        rules.append(AlertRule(f"{name}_LOW", param, lo, lo + margin, False, raise_after, clear_after))
+    light = profile.light_min
+    rules.append(AlertRule("LIGHT_LOW", "light", light, light * (1 + band), False, raise_after, clear_after))
+    return tuple(rules)
+
+
+class AlertEngine:
+    """
+    Состояние — массивы (правило × зона). Зона получает номер колонки при
+    первом появлении; ёмкость удваивается по мере роста.
+    """
+
+    def __init__(self, rules: Iterable[AlertRule], capacity: int = 64):
+        self.rules = tuple(rules)
+        self.params = tuple(dict.fromkeys(r.param for r in self.rules))
+        self._param_row = np.array([self.params.index(r.param) for r in self.rules], dtype=np.int64)
+        self._sign = np.array([1.0 if r.above else -1.0 for r in self.rules])[:, None]
+        self._raise_at = np.array([r.raise_at for r in self.rules], dtype=np.float64)[:, None]
+        self._clear_at = np.array([r.clear_at for r in self.rules], dtype=np.float64)[:, None]
+        self._raise_after = np.array([r.raise_after for r in self.rules], dtype=np.int64)[:, None]
+        self._clear_after = np.array([r.clear_after for r in self.rules], dtype=np.int64)[:, None]
+
+        self.zones: list = []
+        self.slots: dict = {}
+        shape = (len(self.rules), max(1, capacity))
+        self.active = np.zeros(shape, dtype=bool)
+        self.pending = np.full(shape, -1, dtype=np.int64)   # начало ожидания перехода, -1 — нет
+        self.episodes = np.zeros(shape, dtype=np.int64)     # сколько раз поднимался алерт пары
+
+    def _slot(self, zone) -> int:
+        slot = self.slots.get(zone)
+        if slot is None:
+            slot = self.slots[zone] = len(self.zones)
+            self.zones.append(zone)
+            if slot == self.active.shape[1]:
+                grow = self.active.shape[1]
+                self.active = np.hstack((self.active, np.zeros((len(self.rules), grow), dtype=bool)))
+                self.pending = np.hstack((self.pending, np.full((len(self.rules), grow), -1, dtype=np.int64)))
+                self.episodes = np.hstack((self.episodes, np.zeros((len(self.rules), grow), dtype=np.int64)))
+        return slot
+
+    def _episode(self, r: int, slot: int) -> str:
+        """Id эпизода: код, зона и номер подъёма пары — уникален при любой частоте переходов."""
+        return f"{self.rules[r].code.lower()}_{self.zones[slot]}_{self.episodes[r, slot]}"
+
+    @instrument("alerts.evaluate_batch", items=lambda result, args: len(args["snapshots"]))
+    def evaluate_batch(self, snapshots: Sequence[dict], now=None) -> tuple[Alert, ...]:
+        """
+        Снимки зон {"zone", "ts", параметр: значение, ...} за один такт. now — общее
+        время такта (иначе берётся ts снимка). Несколько снимков одной зоны
+        сворачиваются по порядку: k-й снимок зоны оценивается в k-м проходе.
+        Отсутствующий параметр (None/NaN) состояние не меняет.
+        Возвращает переходы в порядке снимков, внутри снимка — в порядке правил.
+        """
+        n = len(snapshots)
+        if not n or not self.rules:
+            return ()
+        slots = np.fromiter((self._slot(s["zone"]) for s in snapshots), dtype=np.int64, count=n)
+        if now is not None:
+            ts = np.full(n, to_epoch(now), dtype=np.int64)
+        else:
+            ts = np.fromiter((to_epoch(s["ts"]) for s in snapshots), dtype=np.int64, count=n)
+        values = np.array([[s.get(p) for s in snapshots] for p in self.params], dtype=np.float64)[self._param_row]
+
+        order = np.argsort(slots, kind="stable")
+        firsts = np.flatnonzero(np.r_[True, np.diff(slots[order]) != 0])
+        if len(firsts) == n:
+            passes = (np.arange(n),)
+        else:
+            rank = np.empty(n, dtype=np.int64)
+            rank[order] = np.arange(n) - np.repeat(firsts, np.diff(np.r_[firsts, n]))
+            passes = [np.flatnonzero(rank == k) for k in range(int(rank.max()) + 1)]
+
+        out = []
+        for cols in passes:
+            out.extend(self._step(snapshots, cols, slots[cols], ts[cols], values[:, cols], now))
+        if len(passes) > 1:
+            out.sort(key=lambda item: item[:2])
+        return tuple(alert for _, _, alert in out)
+
+    def _step(self, snapshots, cols, slots, ts, values, now) -> list:
+        """Один векторный шаг по зонам без повторов; [(номер снимка, номер правила, алерт)]."""
+        active = self.active[:, slots]
+        pending = self.pending[:, slots]
+        # для неактивных ждём нарушения порога подъёма, для активных — возврата за порог снятия
+        margin = self._sign * (values - np.where(active, self._clear_at, self._raise_at))
+        cond = np.where(active, margin < 0, margin > 0)
+        started = np.where(cond & (pending < 0), ts, pending)
+        fire = cond & (ts - started >= np.where(active, self._clear_after, self._raise_after))
+        waiting = np.where(cond & ~fire, started, -1)
+
+        self.pending[:, slots] = np.where(np.isnan(values), pending, waiting)
+        self.active[:, slots] = active ^ fire
+        if not fire.any():
+            return []
+
+        out = []
+        for i, r in zip(*np.nonzero(fire.T)):  # по снимкам, внутри — по правилам
+            rule, slot, value, col = self.rules[r], slots[i], float(values[r, i]), int(cols[i])
+            stamp = snapshots[col].get("ts") if now is None else from_epoch(ts[i])
+            if active[r, i]:
+                alert = Alert(
+                    id=f"{self._episode(r, slot)}_cleared", zone_id=self.zones[slot], sensor_id=rule.param,
+                    ts=stamp, code=rule.clear_code or f"{rule.code}_CLEAR", severity="INFO",
+                    message=rule.clear_message.format(param=rule.param, value=value, limit=rule.clear_at))
+            else:
+                self.episodes[r, slot] += 1
+                alert = Alert(
+                    id=self._episode(r, slot), zone_id=self.zones[slot], sensor_id=rule.param,
+                    ts=stamp, code=rule.code, severity=rule.severity,
+                    message=rule.message.format(param=rule.param, value=value, limit=rule.raise_at))
+            out.append((col, int(r), alert))
+        return out
+
+    def evaluate(self, snapshot: dict, now=None) -> tuple[Alert, ...]:
+        return self.evaluate_batch((snapshot,), now)
+
+    def active_alerts(self) -> tuple[tuple, ...]:
+        """Активные пары (зона, код)."""
+        rows, cols = np.nonzero(self.active[:, :len(self.zones)])
+        return tuple(sorted((self.zones[c], self.rules[r].code) for r, c in zip(rows, cols)))
+
+    def __len__(self) -> int:
+        return int(self.active.sum())
@@ -0,0 +1,243 @@
+"""
+Асинхронная шина событий: ограниченная очередь на топик, пакетная доставка,
+монотонные номера событий, политики переполнения и метрики очередей.
+Синхронные обработчики handle_* из core.frp подключаются через batch_adapter.
+"""
+import asyncio
+import inspect
+import time
+from dataclasses import dataclass, replace
+from datetime import datetime
+from itertools import count
+from typing import Awaitable, Callable, Optional, Union
+
+from core.domain import Event
+
+POLICIES = ("block", "drop_newest", "drop_oldest", "error")
+
+BatchHandler = Callable[[list, dict], Union[dict, None, Awaitable]]
+
+
+class QueueFull(Exception):
+    """Очередь топика заполнена и политика 'error'."""
+
+
+@dataclass(frozen=True)
+class TopicConfig:
+    maxsize: int = 1024
+    batch_size: int = 64
+    policy: str = "block"  # одна из POLICIES
+
+    def __post_init__(self):
+        if self.policy not in POLICIES:
+            raise ValueError(f"неизвестная политика {self.policy!r}, ожидается одна из {POLICIES}")
+        if self.maxsize < 1 or self.batch_size < 1:
+            raise ValueError("maxsize и batch_size должны быть положительными")
+
+
+class TopicStats:
+    __slots__ = ("published", "delivered", "dropped", "errors", "batches", "last_seq", "lag_last", "lag_max")
+
+    def __init__(self):
+        self.published = self.delivered = self.dropped = self.errors = self.batches = 0
+        self.last_seq = 0
+        self.lag_last = self.lag_max = 0.0
+
+
+def batch_adapter(handler: Callable[[Event, dict], dict]) -> BatchHandler:
+    """Оборачивает обработчик одного события (event, store) -> store в пакетный."""
+    def run(events: list, store: dict) -> dict:
+        for event in events:
+            store = handler(event, store)
+            if not isinstance(store, dict):
+                raise ValueError("Handler must return a new dict")
+        return store
+    run.__name__ = getattr(handler, "__name__", "handler")
+    return run
+
+
+class AsyncEventBus:
+    """
+    Публикация кладёт событие в очередь топика и сразу возвращает управление;
+    отдельная задача на топик забирает до batch_size событий и передаёт их
+    списком каждому обработчику. Обработчик возвращает новую витрину (dict)
+    или None, если изменил store на месте. Ошибка обработчика считается
+    в метриках и не останавливает доставку.
+    """
+
+    def __init__(self, maxsize: int = 1024, batch_size: int = 64, policy: str = "block",
+                 clock: Callable[[], float] = time.monotonic):
+        self.default = TopicConfig(maxsize, batch_size, policy)
+        self.configs: dict[str, TopicConfig] = {}
+        self.subscribers: dict[str, list[BatchHandler]] = {}
+        self.store: dict = {}
+        self.queues: dict[str, asyncio.Queue] = {}
+        # публикации с ожиданием места (block) выстраиваются по топику в FIFO;
+        # номер событию выдаётся только в момент попадания в очередь
+        self._putters: dict[str, asyncio.Lock] = {}
+        self._space: dict[str, asyncio.Event] = {}
+        self.stats: dict[str, TopicStats] = {}
+        self.clock = clock
+        self.seq = 0
+        self._seq = count(1)
+        self._tasks: dict[str, asyncio.Task] = {}
+        self._running = False
+
+    # --- настройка ---
+    def configure(self, topic: str, **options) -> TopicConfig:
+        """Параметры топика (maxsize, batch_size, policy); до первой публикации в него."""
+        if topic in self.queues:
+            raise RuntimeError(f"топик {topic!r} уже используется")
+        config = self.configs[topic] = replace(self.configs.get(topic, self.default), **options)
+        return config
+
+    def subscribe(self, topic: str, handler: BatchHandler) -> None:
+        """Пакетный обработчик handler(events, store)."""
+        self.subscribers.setdefault(topic, []).append(handler)
+        self._queue(topic)
+
+    def subscribe_each(self, topic: str, handler: Callable[[Event, dict], dict]) -> None:
+        """Обработчик одного события в стиле core.frp (handle_reading и т. п.)."""
+        self.subscribe(topic, batch_adapter(handler))
+
+    def _queue(self, topic: str) -> asyncio.Queue:
+        q = self.queues.get(topic)
+        if q is None:
+            config = self.configs.get(topic, self.default)
+            q = self.queues[topic] = asyncio.Queue(config.maxsize)
+            self._putters[topic] = asyncio.Lock()
+            self._space[topic] = asyncio.Event()
+            self.stats[topic] = TopicStats()
+            if self._running:
+                self._spawn(topic)
+        return q
+
+    # --- публикация ---
+    def _event(self, topic: str, payload: dict) -> Event:
+        self.seq = next(self._seq)
+        ts = datetime.now().isoformat(timespec="seconds")
+        return Event(id=f"{topic.lower()}_{self.seq}", ts=ts, name=topic, payload=payload)
+
+    def _put(self, q: asyncio.Queue, topic: str, payload: dict) -> Event:
+        event = self._event(topic, payload)
+        q.put_nowait((self.seq, self.clock(), event))
+        self.stats[topic].published += 1
+        return event
+
+    def publish_nowait(self, topic: str, payload: dict) -> Optional[Event]:
+        """
+        Публикация без ожидания. При полной очереди: drop_newest — событие
+        отбрасывается (None), drop_oldest — вытесняется самое старое,
+        block и error — QueueFull. При политике block очередь считается полной
+        и тогда, когда места уже ждут публикации publish: обгонять их нельзя.
+        """
+        q = self._queue(topic)
+        policy = self.configs.get(topic, self.default).policy
+        stats = self.stats[topic]
+        if q.full() or (policy == "block" and self._putters[topic].locked()):
+            if policy == "drop_newest":
+                stats.dropped += 1
+                return None
+            if policy == "drop_oldest":
+                q.get_nowait()
+                q.task_done()
+                stats.dropped += 1
+            else:
+                raise QueueFull(topic)
+        return self._put(q, topic, payload)
+
+    async def publish(self, topic: str, payload: dict) -> Optional[Event]:
+        """
+        Как publish_nowait, но с политикой block ждёт места в очереди (обратное
+        давление). Ждущие публикации проходят по очереди в порядке вызова,
+        поэтому номера событий в топике доставляются по возрастанию.
+        """
+        q = self._queue(topic)
+        putters = self._putters[topic]
+        if self.configs.get(topic, self.default).policy != "block" or not (q.full() or putters.locked()):
+            return self.publish_nowait(topic, payload)
+        async with putters:
+            space = self._space[topic]
+            while q.full():
+                space.clear()
+                await space.wait()
+            return self._put(q, topic, payload)
+
+    # --- доставка ---
+    def _spawn(self, topic: str) -> None:
+        self._tasks[topic] = asyncio.get_running_loop().create_task(self._consume(topic))
+
+    async def start(self) -> None:
+        self._running = True
+        for topic in self.queues:
+            if topic not in self._tasks:
+                self._spawn(topic)
+
+    async def join(self) -> None:
+        """Ждёт, пока все уже опубликованные события будут доставлены."""
+        for q in list(self.queues.values()):
+            await q.join()
+
+    async def stop(self, drain: bool = True) -> None:
+        if drain:
+            await self.join()
+        self._running = False
+        for task in self._tasks.values():
+            task.cancel()
+        await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+        self._tasks.clear()
+
+    async def __aenter__(self) -> "AsyncEventBus":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.stop()
+
+    async def _consume(self, topic: str) -> None:
+        q = self.queues[topic]
+        batch_size = self.configs.get(topic, self.default).batch_size
+        stats = self.stats[topic]
+        while True:
+            batch = [await q.get()]
+            while len(batch) < batch_size and not q.empty():
+                batch.append(q.get_nowait())
+            self._space[topic].set()
+            events = [event for _, _, event in batch]
+            for handler in self.subscribers.get(topic, ()):
+                try:
+                    result = handler(events, self.store)
+                    if inspect.isawaitable(result):
+                        result = await result
+                    if result is not None:
+                        self.store = result
+                except Exception:
+                    stats.errors += 1
+            lag = self.clock() - batch[0][1]
+            stats.delivered += len(batch)
+            stats.batches += 1
+            stats.last_seq = batch[-1][0]
+            stats.lag_last = lag
+            stats.lag_max = max(stats.lag_max, lag)
+            for _ in batch:
+                q.task_done()
+
+    # --- метрики ---
+    def metrics(self) -> dict:
+        """Глубина очереди, счётчики и задержка доставки (секунды от публикации до конца обработки) по топикам."""
+        result = {}
+        for topic, q in self.queues.items():
+            s = self.stats[topic]
+            result[topic] = {
+                "depth": q.qsize(),
+                "maxsize": q.maxsize,
+                "published": s.published,
+                "delivered": s.delivered,
+                "dropped": s.dropped,
+                "errors": s.errors,
+                "batches": s.batches,
+                "last_seq": s.last_seq,
+                "lag_last": s.lag_last,
+                "lag_max": s.lag_max,
+            }
+        return result
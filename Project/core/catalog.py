@@ -0,0 +1,80 @@
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Iterator, Mapping, Optional
+
+from core.domain import Zone, PlantProfile, Sensor, Actuator, Rule
+
+
+def _group(items, key) -> Mapping:
+    groups: dict = {}
+    for item in items:
+        groups.setdefault(key(item), []).append(item)
+    return MappingProxyType({k: tuple(v) for k, v in groups.items()})
+
+
+@dataclass(frozen=True, eq=False)
+class Catalog:
+    """
+    Неизменяемый справочник датасета с хэш-индексами.
+    Итерация и len() идут по сенсорам, поэтому Catalog можно передавать
+    везде, где раньше ожидался кортеж сенсоров.
+    """
+    zones: tuple[Zone, ...] = ()
+    profiles: tuple[PlantProfile, ...] = ()
+    sensors: tuple[Sensor, ...] = ()
+    actuators: tuple[Actuator, ...] = ()
+    rules: tuple[Rule, ...] = ()
+
+    sensor_by_id: Mapping[str, Sensor] = field(init=False, repr=False)
+    kind_by_sensor: Mapping[str, str] = field(init=False, repr=False)
+    sensors_by_kind: Mapping[str, tuple[Sensor, ...]] = field(init=False, repr=False)
+    sensors_by_zone: Mapping[Optional[str], tuple[Sensor, ...]] = field(init=False, repr=False)
+    actuators_by_kind: Mapping[str, tuple[Actuator, ...]] = field(init=False, repr=False)
+    zone_by_id: Mapping[str, Zone] = field(init=False, repr=False)
+    profile_by_id: Mapping[str, PlantProfile] = field(init=False, repr=False)
+
+    def __post_init__(self):
+        indexes = {
+            "sensor_by_id": MappingProxyType({s.id: s for s in self.sensors}),
+            "kind_by_sensor": MappingProxyType({s.id: s.kind for s in self.sensors}),
+            "sensors_by_kind": _group(self.sensors, lambda s: s.kind),
+            "sensors_by_zone": _group(self.sensors, lambda s: s.zone_id),
+            "actuators_by_kind": _group(self.actuators, lambda a: a.kind),
+            "zone_by_id": MappingProxyType({z.id: z for z in self.zones}),
+            "profile_by_id": MappingProxyType({p.id: p for p in self.profiles}),
+        }
+        for name, value in indexes.items():
+            object.__setattr__(self, name, value)
+
+    @classmethod
+    def from_seed(cls, seed: tuple) -> "Catalog":
+        """Строит справочник из результата load_seed (показания не нужны)."""
+        zones, profiles, sensors, actuators, _, rules = seed
+        return cls(tuple(zones), tuple(profiles), tuple(sensors), tuple(actuators), tuple(rules))
+
+    def sensor(self, sensor_id: str) -> Optional[Sensor]:
+        return self.sensor_by_id.get(sensor_id)
+
+    def __iter__(self) -> Iterator[Sensor]:
+        return iter(self.sensors)
+
+    def __len__(self) -> int:
+        return len(self.sensors)
+
+    def __reduce__(self):
+        # индексы (MappingProxyType) не сериализуются — передаём только исходные кортежи
+        return Catalog, (self.zones, self.profiles, self.sensors, self.actuators, self.rules)
+
+
+def as_catalog(sensors) -> Catalog:
+    """Catalog как есть, либо справочник только из сенсоров (индекс строится один раз)."""
+    if isinstance(sensors, Catalog):
+        return sensors
+    return Catalog(sensors=tuple(sensors))
+
+
+def lookup_sensor(sensors, sensor_id: str) -> Optional[Sensor]:
+    """O(1) по Catalog, линейный поиск по обычному кортежу сенсоров."""
+    if isinstance(sensors, Catalog):
+        return sensors.sensor_by_id.get(sensor_id)
+    return next((s for s in sensors if s.id == sensor_id), None)
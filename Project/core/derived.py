@@ -0,0 +1,102 @@
+"""
+Производные структуры датасета для интерфейса: справочник, индекс времени,
+предагрегаты, дерево зон, расписания, наборы для фильтров. Строятся один раз
+на версию датасета (путь, размер и mtime файла) и дальше только читаются,
+поэтому перезапуск страницы не зависит от длины истории показаний.
+"""
+import os
+from dataclasses import dataclass, field
+from functools import cached_property
+from datetime import datetime
+from typing import Mapping, NamedTuple, Optional, Union
+
+from core.catalog import Catalog
+from core.domain import Zone, PlantProfile, Sensor, Actuator, Reading, Rule
+from core.forecast import SoilForecaster
+from core.recursion import zone_tree
+from core.rollup import Rollup
+from core.schedule import WeeklySchedule
+from core.store import ReadingStore, TS_FORMAT
+from core.timeindex import TimeIndex
+from core.transforms import load_seed
+from core.zonetree import ZoneTree
+
+
+def dataset_version(path: str) -> tuple:
+    """Ключ версии: меняется при любой перезаписи файла, считается одним stat()."""
+    st = os.stat(path)
+    return os.path.abspath(path), st.st_size, st.st_mtime_ns
+
+
+class ControlReading(NamedTuple):
+    """Показание для пошагового управления: с типом параметра и разобранным временем."""
+    id: str
+    sensor_id: str
+    kind: Optional[str]
+    value: float
+    ts: datetime
+
+
+@dataclass(frozen=True, eq=False)
+class DerivedData:
+    version: tuple
+    zones: tuple[Zone, ...]
+    profiles: tuple[PlantProfile, ...]
+    sensors: tuple[Sensor, ...]
+    actuators: tuple[Actuator, ...]
+    readings: Union[tuple[Reading, ...], ReadingStore]
+    rules: tuple[Rule, ...]
+
+    catalog: Catalog = field(init=False, repr=False)
+    time_index: TimeIndex = field(init=False, repr=False)
+    rollup: Rollup = field(init=False, repr=False)
+    zone_tree: ZoneTree = field(init=False, repr=False)
+    schedules: Mapping[str, WeeklySchedule] = field(init=False, repr=False)
+    sensor_ids: tuple[str, ...] = field(init=False, repr=False)
+    sensor_kinds: tuple[str, ...] = field(init=False, repr=False)
+    _zone_sensors: dict = field(init=False, repr=False, default_factory=dict)
+
+    def __post_init__(self):
+        catalog = Catalog(self.zones, self.profiles, self.sensors, self.actuators, self.rules)
+        time_index = TimeIndex(self.readings)
+        derived = {
+            "catalog": catalog,
+            "time_index": time_index,
+            "rollup": Rollup.from_readings(self.readings, self.sensors, time_index),
+            "zone_tree": zone_tree(self.zones),
+            "schedules": {p.id: WeeklySchedule.from_profile(p) for p in self.profiles},
+            "sensor_ids": tuple(s.id for s in self.sensors),
+            "sensor_kinds": tuple(sorted(catalog.sensors_by_kind)),
+        }
+        for name, value in derived.items():
+            object.__setattr__(self, name, value)
+
+    @classmethod
+    def load(cls, path: str, version: Optional[tuple] = None) -> "DerivedData":
+        version = version if version is not None else dataset_version(path)
+        return cls(version, *load_seed(path, cache=True))
+
+    def sensors_of_kind(self, kind: str) -> tuple[Sensor, ...]:
+        return self.catalog.sensors_by_kind.get(kind, ())
+
+    def zone_sensor_ids(self, zone_id: str) -> frozenset:
+        """Сенсоры поддерева зоны; множество строится при первом запросе и запоминается."""
+        ids = self._zone_sensors.get(zone_id)
+        if ids is None:
+            ids = self._zone_sensors[zone_id] = frozenset(
+                s.id for s in self.zone_tree.sensors_under(zone_id, self.catalog))
+        return ids
+
+    @cached_property
+    def soil_forecaster(self) -> SoilForecaster:
+        """Состояние прогноза по каждому сенсору влажности почвы: история проходится один раз."""
+        forecaster = SoilForecaster()
+        for sensor in self.sensors_of_kind("hum_soil"):
+            forecaster.extend(self.time_index.last_n(sensor.id, len(self.time_index)))
+        return forecaster
+
+    def control_reading(self, i: int) -> ControlReading:
+        """i-е показание потока управления; разбирается только запрошенное."""
+        r = self.readings[i]
+        return ControlReading(r.id, r.sensor_id, self.catalog.kind_by_sensor.get(r.sensor_id), r.value,
+                              datetime.strptime(r.ts, TS_FORMAT))
@@ -0,0 +1,293 @@
+"""
+Журнал событий шины: сегменты JSONL только на дозапись, групповая фиксация
+с fsync, снимки bus.store и компактация старых сегментов. При старте
+шина восстанавливается из последнего снимка и дочитывает хвост журнала.
+"""
+import json
+import os
+import pickle
+import threading
+import time
+from itertools import count
+from typing import Iterator, Optional
+
+from core.domain import Event
+from core.frp import EventBus
+from core.metrics import instrument
+
+SEGMENT_PREFIX = "segment-"
+SNAPSHOT_PREFIX = "snapshot-"
+LOCK_NAME = "LOCK"
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+def _seq_of(name: str, prefix: str) -> int:
+    return int(name[len(prefix):].split(".", 1)[0])
+
+
+def _fsync_dir(directory: str) -> None:
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:  # Windows не открывает каталоги
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _lock_directory(directory: str) -> int:
+    """
+    Эксклюзивная неблокирующая блокировка файла LOCK в каталоге журнала:
+    писатель у каталога один. Блокировку снимает закрытие дескриптора.
+    """
+    fd = os.open(os.path.join(directory, LOCK_NAME), os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+    except OSError:
+        os.close(fd)
+        raise RuntimeError(f"журнал {directory} уже открыт другим писателем") from None
+    return fd
+
+
+class EventLog:
+    """
+    Сегменты segment-<первый seq>.jsonl, одна строка — одно событие с его номером.
+    append копит строки в памяти; commit пишет пачку одним write и делает fsync.
+    Пачка фиксируется сама, когда набралось group_size событий или с первой
+    незафиксированной прошло commit_interval секунд (проверяется при append).
+    Каталог блокируется на всё время жизни объекта (до close): второй EventLog
+    на тот же каталог — в этом или другом процессе — получит RuntimeError.
+    """
+
+    def __init__(self, directory: str, segment_bytes: int = 64 << 20, group_size: int = 512,
+                 commit_interval: float = 0.2, fsync: bool = True):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.group_size = group_size
+        self.commit_interval = commit_interval
+        self.fsync = fsync
+        self.last_seq = 0
+        self._pending: list[str] = []
+        self._pending_first = 0
+        self._pending_since = 0.0
+        self._file = None
+        os.makedirs(directory, exist_ok=True)
+        self._lock_fd = _lock_directory(directory)
+        self._open_tail()
+
+    # --- файлы ---
+    def segments(self) -> list[tuple[int, str]]:
+        """[(первый seq, путь)] по возрастанию."""
+        names = [n for n in os.listdir(self.directory) if n.startswith(SEGMENT_PREFIX) and n.endswith(".jsonl")]
+        return sorted((_seq_of(n, SEGMENT_PREFIX), os.path.join(self.directory, n)) for n in names)
+
+    def snapshots(self) -> list[tuple[int, str]]:
+        names = [n for n in os.listdir(self.directory) if n.startswith(SNAPSHOT_PREFIX) and n.endswith(".pkl")]
+        return sorted((_seq_of(n, SNAPSHOT_PREFIX), os.path.join(self.directory, n)) for n in names)
+
+    def _open_tail(self) -> None:
+        """Находит последний номер; недописанную последнюю строку (сбой посреди записи) отрезает."""
+        segments = self.segments()
+        snaps = self.snapshots()
+        self.last_seq = snaps[-1][0] if snaps else 0
+        if not segments:
+            return
+        path = segments[-1][1]
+        with open(path, "rb+") as f:
+            data = f.read()
+            end = data.rfind(b"\n") + 1
+            if end < len(data):
+                f.truncate(end)
+            lines = data[:end].splitlines()
+        if lines:
+            self.last_seq = max(self.last_seq, json.loads(lines[-1])["seq"])
+        elif segments[-1][0] > 0:
+            self.last_seq = max(self.last_seq, segments[-1][0] - 1)
+        self._file = open(path, "ab")
+
+    def _rotate(self, first_seq: int) -> None:
+        if self._file is not None:
+            self._file.close()
+        path = os.path.join(self.directory, f"{SEGMENT_PREFIX}{first_seq:012d}.jsonl")
+        self._file = open(path, "ab")
+        if self.fsync:
+            _fsync_dir(self.directory)
+
+    # --- запись ---
+    def append(self, seq: int, event: Event) -> None:
+        if seq <= self.last_seq:
+            raise ValueError(f"номер {seq} не больше последнего записанного {self.last_seq}")
+        if not self._pending:
+            self._pending_since = time.monotonic()
+            self._pending_first = seq
+        self._pending.append(json.dumps(
+            {"seq": seq, "id": event.id, "ts": event.ts, "name": event.name, "payload": event.payload},
+            ensure_ascii=False, separators=(",", ":")))
+        self.last_seq = seq
+        if len(self._pending) >= self.group_size or time.monotonic() - self._pending_since >= self.commit_interval:
+            self.commit()
+
+    def commit(self) -> int:
+        """Пишет накопленные события одним блоком и делает fsync; возвращает их число."""
+        if not self._pending:
+            return 0
+        if self._file is None or self._file.tell() >= self.segment_bytes:
+            self._rotate(self._pending_first)
+        self._file.write(("\n".join(self._pending) + "\n").encode("utf-8"))
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+        n = len(self._pending)
+        self._pending = []
+        return n
+
+    # --- чтение ---
+    def replay(self, after: int = 0) -> Iterator[tuple[int, Event]]:
+        """События с номером больше after в порядке записи (включая ещё не зафиксированные)."""
+        self.commit()
+        segments = self.segments()
+        for i, (first, path) in enumerate(segments):
+            if i + 1 < len(segments) and segments[i + 1][0] <= after + 1:
+                continue  # сегмент целиком до after
+            with open(path, "rb") as f:
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break
+                    # строка начинается с {"seq":N, — пропуск без полного разбора
+                    if int(line[7:line.index(b",")]) <= after:
+                        continue
+                    rec = json.loads(line)
+                    yield rec["seq"], Event(rec["id"], rec["ts"], rec["name"], rec["payload"])
+
+    # --- снимки ---
+    def write_snapshot(self, seq: int, store: dict) -> str:
+        """
+        Атомарно сохраняет store на момент события seq (tmp + fsync + rename).
+        Текущий сегмент закрывается: следующие события пойдут в новый,
+        а покрытый снимком можно удалить при компактации.
+        """
+        self.commit()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        path = os.path.join(self.directory, f"{SNAPSHOT_PREFIX}{seq:012d}.pkl")
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump({"seq": seq, "store": store}, f, protocol=pickle.HIGHEST_PROTOCOL)
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+        os.replace(tmp, path)
+        if self.fsync:
+            _fsync_dir(self.directory)
+        return path
+
+    def latest_snapshot(self) -> tuple[int, Optional[dict]]:
+        """(seq, store) последнего снимка или (0, None)."""
+        snaps = self.snapshots()
+        if not snaps:
+            return 0, None
+        with open(snaps[-1][1], "rb") as f:
+            data = pickle.load(f)
+        return data["seq"], data["store"]
+
+    def compact(self) -> int:
+        """
+        Удаляет сегменты, целиком покрытые последним снимком, и старые снимки.
+        Дописываемый сегмент не удаляется. Возвращает число удалённых файлов.
+        """
+        snaps = self.snapshots()
+        if not snaps:
+            return 0
+        covered = snaps[-1][0]
+        removed = 0
+        segments = self.segments()
+        for i, (first, path) in enumerate(segments):
+            if i + 1 < len(segments):
+                last = segments[i + 1][0] - 1
+            else:
+                last = self.last_seq if self._file is None and not self._pending else None
+            if last is not None and last <= covered:
+                os.remove(path)
+                removed += 1
+        for _, path in snaps[:-1]:
+            os.remove(path)
+            removed += 1
+        return removed
+
+    def close(self) -> None:
+        self.commit()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)
+            self._lock_fd = None
+
+    def __enter__(self) -> "EventLog":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class LoggedEventBus(EventBus):
+    """
+    EventBus, который пишет каждое событие в EventLog до вызова обработчиков
+    и раз в snapshot_every событий сохраняет снимок store с компактацией.
+    Порядок запуска: подписать обработчики, затем recover().
+    publish/flush/snapshot сериализованы замком: шину можно делить между потоками.
+    """
+
+    def __init__(self, log: EventLog, snapshot_every: int = 10000):
+        super().__init__()
+        self.log = log
+        self.snapshot_every = snapshot_every
+        self._since_snapshot = 0
+        self.lock = threading.RLock()
+
+    def recover(self) -> int:
+        """Загружает последний снимок и прогоняет через обработчики события после него."""
+        with self.lock:
+            seq, store = self.log.latest_snapshot()
+            if store is not None:
+                self.store = store
+            self.seq = seq
+            replayed = 0
+            for seq, event in self.log.replay(after=seq):
+                self.seq = seq
+                self.dispatch(event)
+                replayed += 1
+            self._seq = count(self.seq + 1)
+            self._since_snapshot = replayed
+            return replayed
+
+    @instrument("bus.publish")
+    def publish(self, name, payload):
+        with self.lock:
+            event = self.make_event(name, payload)
+            self.log.append(self.seq, event)
+            self.dispatch(event)
+            self._since_snapshot += 1
+            if self.snapshot_every and self._since_snapshot >= self.snapshot_every:
+                self.snapshot()
+            return event
+
+    def snapshot(self) -> None:
+        with self.lock:
+            self.log.write_snapshot(self.seq, self.store)
+            self.log.compact()
+            self._since_snapshot = 0
+
+    def flush(self) -> int:
+        with self.lock:
+            return self.log.commit()
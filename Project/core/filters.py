@@ -1,9 +1,13 @@
 from core.domain import Reading, Sensor
+from core.store import ReadingStore
+from core.timeindex import TimeIndex
 from datetime import datetime
 
 def by_zone(readings: tuple[Reading, ...], sensors: tuple[Sensor, ...], zone_id: str) -> tuple[Reading, ...]:
     """Фильтрует показания по зоне (через связь sensor.device_id → zone_id)."""
     sensor_ids = {s.id for s in sensors if s.device_id.startswith(zone_id)}
+    if isinstance(readings, ReadingStore):
+        return readings.filter(sensor_ids=sensor_ids)
     
     def zone_predicate(reading: Reading) -> bool:
         return reading.sensor_id in sensor_ids
@@ -14,6 +18,8 @@ def by_zone(readings: tuple[Reading, ...], sensors: tuple[Sensor, ...], zone_id:
 def by_sensor_kind(readings: tuple[Reading, ...], sensors: tuple[Sensor, ...], kind: str) -> tuple[Reading, ...]:
     """Фильтрует показания по типу сенсора (temp, hum_air, hum_soil, light, co2)."""
     sensor_ids = {s.id for s in sensors if s.kind == kind}
+    if isinstance(readings, ReadingStore):
+        return readings.filter(sensor_ids=sensor_ids)
     
     def kind_predicate(reading: Reading) -> bool:
         return reading.sensor_id in sensor_ids
@@ -23,6 +29,11 @@ def by_sensor_kind(readings: tuple[Reading, ...], sensors: tuple[Sensor, ...], k
 
 def by_time_range(readings: tuple[Reading, ...], start: str, end: str) -> tuple[Reading, ...]:
     """Фильтрует показания по временному интервалу (строки вида '2025-09-01 00:00')."""
+    if isinstance(readings, TimeIndex):
+        return readings.between(start, end)
+    if isinstance(readings, ReadingStore):
+        return readings.filter(start=start, end=end)
+
     fmt = "%Y-%m-%d %H:%M"
     start_dt = datetime.strptime(start, fmt)
     end_dt = datetime.strptime(end, fmt)
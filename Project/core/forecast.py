@@ -0,0 +1,236 @@
+"""
+Прогноз влажности почвы: экспоненциальное сглаживание + линейный тренд
+по последним fit_window сглаженным точкам + суточная синусоида.
+Состояние ряда обновляется за O(1) на показание.
+"""
+from collections import OrderedDict, deque
+from typing import Hashable, Iterable, Optional
+
+import numpy as np
+
+from core.store import to_epoch
+
+ALPHA = 0.8
+FIT_WINDOW = 24
+DAILY_AMPLITUDE = 2
+
+
+class TrendState:
+    """
+    EWMA и суммы для МНК по скользящему окну сглаженных значений.
+    Окно храним явно, суммы Σs и Σx·s (x — позиция в окне) сдвигаются
+    за O(1); раз в fit_window обновлений пересчитываются, чтобы не копить ошибку.
+    """
+
+    __slots__ = ("alpha", "fit_window", "level", "last_ts", "window", "sum_s", "sum_xs", "_since_exact")
+
+    def __init__(self, alpha: float = ALPHA, fit_window: int = FIT_WINDOW):
+        self.alpha = alpha
+        self.fit_window = fit_window
+        self.level: Optional[float] = None
+        self.last_ts: Optional[int] = None
+        self.window: deque = deque()
+        self.sum_s = 0.0
+        self.sum_xs = 0.0
+        self._since_exact = 0
+
+    def __len__(self) -> int:
+        return len(self.window)
+
+    def update(self, ts, value: float) -> None:
+        sec = to_epoch(ts)
+        if self.last_ts is not None and sec < self.last_ts:
+            raise ValueError(f"показание {ts} старше последнего в ряду")
+        self.last_ts = sec
+        value = float(value)
+        self.level = value if self.level is None else self.alpha * value + (1 - self.alpha) * self.level
+
+        if len(self.window) == self.fit_window:
+            oldest = self.window.popleft()
+            # позиции всех оставшихся точек уменьшаются на 1
+            self.sum_s -= oldest
+            self.sum_xs -= self.sum_s
+        self.sum_xs += len(self.window) * self.level
+        self.sum_s += self.level
+        self.window.append(self.level)
+
+        self._since_exact += 1
+        if self._since_exact >= self.fit_window:
+            self.sum_s = sum(self.window)
+            self.sum_xs = sum(x * s for x, s in enumerate(self.window))
+            self._since_exact = 0
+
+    def trend(self) -> tuple[float, float]:
+        """(наклон, свободный член) МНК-прямой по окну; x = 0..n-1."""
+        n = len(self.window)
+        if n == 0:
+            return 0.0, 0.0
+        sum_x = n * (n - 1) / 2
+        sum_xx = (n - 1) * n * (2 * n - 1) / 6
+        denom = n * sum_xx - sum_x * sum_x
+        slope = (n * self.sum_xs - sum_x * self.sum_s) / denom if denom else 0.0
+        return slope, (self.sum_s - slope * sum_x) / n
+
+    def forecast(self, window: int = 24) -> tuple[float, ...]:
+        if not self.window:
+            return ()
+        slope, intercept = self.trend()
+        x = np.arange(len(self.window), len(self.window) + window)
+        hours = np.arange(window)
+        values = intercept + slope * x + DAILY_AMPLITUDE * np.sin(2 * np.pi * hours / 24)
+        return tuple(np.round(np.clip(values, 0, 100), 2))
+
+
+class ForecastCache:
+    """LRU ограниченного размера с ключом (ряд, последний ts, горизонт) и счётчиками попаданий."""
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict = OrderedDict()
+
+    def get(self, key: Hashable):
+        value = self._data.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._data.move_to_end(key)
+        return value
+
+    def put(self, key: Hashable, value) -> None:
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        self._data.clear()
+        self.hits = self.misses = 0
+
+    def info(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._data), "maxsize": self.maxsize}
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SoilForecaster:
+    """Состояние TrendState на каждый ряд (сенсор) и общий кэш прогнозов."""
+
+    def __init__(self, alpha: float = ALPHA, fit_window: int = FIT_WINDOW, cache_size: int = 256):
+        self.alpha = alpha
+        self.fit_window = fit_window
+        self.states: dict[str, TrendState] = {}
+        self.cache = ForecastCache(cache_size)
+
+    def update(self, sensor_id: str, ts, value: float) -> None:
+        state = self.states.get(sensor_id)
+        if state is None:
+            state = self.states[sensor_id] = TrendState(self.alpha, self.fit_window)
+        state.update(ts, value)
+
+    def extend(self, readings: Iterable) -> "SoilForecaster":
+        for r in readings:
+            self.update(r.sensor_id, r.ts, r.value)
+        return self
+
+    def forecast(self, sensor_id: str, window: int = 24) -> tuple[float, ...]:
+        state = self.states.get(sensor_id)
+        if state is None:
+            return ()
+        key = (sensor_id, state.last_ts, window)
+        result = self.cache.get(key)
+        if result is None:
+            result = state.forecast(window)
+            self.cache.put(key, result)
+        return result
+
+
+FORECAST_CACHE = ForecastCache()
+
+
+def soil_humidity_forecast(key: str, readings_idx: Iterable, window: int = 24) -> tuple[float, ...]:
+    """
+    Прогноз влажности почвы с экспоненциальным сглаживанием.
+    key — подпись ряда для вызывающего кода; кэш от неё не зависит и адресуется
+    содержимым: (сенсоры, последний ts, window, число точек, хэш пар (ts, value)).
+    """
+    readings_idx = sorted(readings_idx, key=lambda r: to_epoch(r.ts))
+    if not readings_idx:
+        return ()
+    cache_key = (
+        tuple(sorted({r.sensor_id for r in readings_idx})),
+        to_epoch(readings_idx[-1].ts),
+        window,
+        len(readings_idx),
+        hash(tuple((r.ts, r.value) for r in readings_idx)),
+    )
+    result = FORECAST_CACHE.get(cache_key)
+    if result is None:
+        state = TrendState(fit_window=len(readings_idx))
+        for r in readings_idx:
+            state.update(r.ts, r.value)
+        result = state.forecast(window)
+        FORECAST_CACHE.put(cache_key, result)
+    return result
+
+
+def _ewma_weights(length: int, alpha: float) -> np.ndarray:
+    """Нижнетреугольная матрица W: сглаженный ряд S = Y @ W.T (s_0 = y_0)."""
+    t = np.arange(length)
+    lag = t[:, None] - t[None, :]
+    weights = np.where(lag >= 0, alpha * (1 - alpha) ** np.maximum(lag, 0), 0.0)
+    weights[:, 0] = (1 - alpha) ** t
+    return weights
+
+
+def forecast_batch(values: np.ndarray, lengths: Optional[np.ndarray] = None, window: int = 24,
+                   alpha: float = ALPHA) -> np.ndarray:
+    """
+    Прогнозы для всех рядов сразу. values — (рядов × время), ряд i занимает
+    первые lengths[i] столбцов (остальное игнорируется). Сглаживание — одним
+    матричным умножением, тренд — МНК в замкнутой форме, плюс суточная синусоида.
+    Возвращает (рядов × window); строки пустых рядов заполнены NaN.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    rows, length = values.shape
+    lengths = np.full(rows, length) if lengths is None else np.asarray(lengths)
+    mask = np.arange(length)[None, :] < lengths[:, None]
+    smoothed = np.where(mask, values, 0.0) @ _ewma_weights(length, alpha).T
+
+    n = lengths.astype(np.float64)
+    x = np.arange(length, dtype=np.float64)
+    sum_s = np.where(mask, smoothed, 0.0).sum(axis=1)
+    sum_xs = np.where(mask, smoothed * x, 0.0).sum(axis=1)
+    sum_x = n * (n - 1) / 2
+    sum_xx = (n - 1) * n * (2 * n - 1) / 6
+    denom = n * sum_xx - sum_x * sum_x
+    with np.errstate(invalid="ignore", divide="ignore"):
+        slope = np.where(denom != 0, (n * sum_xs - sum_x * sum_s) / np.where(denom != 0, denom, 1), 0.0)
+        intercept = (sum_s - slope * sum_x) / n
+
+    hours = np.arange(window)
+    future = n[:, None] + hours[None, :]
+    result = intercept[:, None] + slope[:, None] * future + DAILY_AMPLITUDE * np.sin(2 * np.pi * hours / 24)
+    result = np.round(np.clip(result, 0, 100), 2)
+    result[lengths == 0] = np.nan
+    return result
+
+
+def forecast_series(series: Iterable[Iterable], window: int = 24, fit_window: int = FIT_WINDOW) -> list[tuple]:
+    """
+    Прогнозы для набора рядов показаний за один вызов forecast_batch:
+    каждый ряд — последние fit_window показаний, упорядоченные по времени,
+    как в soil_humidity_forecast. Для пустого ряда — ().
+    """
+    series = [sorted(list(s)[-fit_window:], key=lambda r: to_epoch(r.ts)) for s in series]
+    if not series:
+        return []
+    lengths = np.array([len(s) for s in series])
+    values = np.zeros((len(series), max(int(lengths.max()), 1)))
+    for i, s in enumerate(series):
+        values[i, :len(s)] = [r.value for r in s]
+    result = forecast_batch(values, lengths, window)
+    return [tuple(row) if n else () for row, n in zip(result, lengths)]
@@ -3,42 +3,95 @@ from datetime import datetime
 from core.domain import Event
 from datetime import datetime
 from typing import Callable, Dict
+from itertools import count
+import numpy as np
+from core.ringbuffer import RingBuffer, KeyedRings
+from core.metrics import instrument
+
+# витрины — кольцевые буферы фиксированной ёмкости (записей на буфер)
+VIEW_CAPACITY = {
+    "readings": 1000,
+    "readings_by_sensor": 256,
+    "readings_by_zone": 512,
+    "commands": 500,
+}
+READING_FIELDS = {"sensor": object, "value": np.float64, "ts": object}
+COMMAND_FIELDS = {"ts": object, "device": object, "action": object}
 
 class EventBus:
     def __init__(self):
         self.subscribers = {}
         self.store = {}   # витрины
+        self._seq = count(1)
+        self.seq = 0      # номер последнего опубликованного события
 
     def subscribe(self, name: str, handler: Callable[[Event, dict], dict]):
         self.subscribers.setdefault(name, []).append(handler)
 
-    def publish(self, name: str, payload: Dict):
+    def unsubscribe(self, name: str, handler: Callable[[Event, dict], dict]) -> None:
+        # список подменяется целиком: идущая в другом потоке доставка дочитает старый
+        handlers = self.subscribers.get(name)
+        if handlers:
+            self.subscribers[name] = [h for h in handlers if h is not handler]
+
+    def make_event(self, name: str, payload: Dict) -> Event:
         ts = datetime.now().isoformat(timespec="seconds")
-        eid = f"{name.lower()}_{ts}"
+        self.seq = next(self._seq)
+        # монотонный номер в id: события одной секунды не совпадают
+        eid = f"{name.lower()}_{ts}_{self.seq}"
 
-        event = Event(
+        return Event(
             id=eid,
             ts=ts,
             name=name,
             payload=payload
         )
 
-        for h in self.subscribers.get(name, []):
+    def dispatch(self, event: Event) -> Event:
+        for h in self.subscribers.get(event.name, []):
             new_store = h(event, self.store)
             if not isinstance(new_store, dict):
                 raise ValueError("Handler must return a new dict")
             self.store = new_store
 
         return event
+
+    @instrument("bus.publish")
+    def publish(self, name: str, payload: Dict):
+        return self.dispatch(self.make_event(name, payload))
+
+def configure_views(store: dict, **capacities) -> dict:
+    """
+    Создаёт витрины с заданной ёмкостью: configure_views(bus.store, readings=5000).
+    Для readings_by_sensor/readings_by_zone можно передать словарь {ключ: ёмкость}
+    через sensor_capacities/zone_capacities. Уже созданные витрины не трогает.
+    """
+    sizes = {**VIEW_CAPACITY, **{k: v for k, v in capacities.items() if k in VIEW_CAPACITY}}
+    store.setdefault("readings", RingBuffer(sizes["readings"], READING_FIELDS))
+    store.setdefault("commands", RingBuffer(sizes["commands"], COMMAND_FIELDS))
+    store.setdefault("readings_by_sensor", KeyedRings(sizes["readings_by_sensor"], READING_FIELDS,
+                                                      capacities.get("sensor_capacities")))
+    store.setdefault("readings_by_zone", KeyedRings(sizes["readings_by_zone"], READING_FIELDS,
+                                                    capacities.get("zone_capacities")))
+    return store
+
+
 def handle_reading(event, store):
     sid = event.payload["sensor"]
     val = event.payload["value"]
 
-    store.setdefault("readings", []).append({
+    if "readings" not in store:
+        configure_views(store)
+    row = {
         "sensor": sid,
         "value": val,
         "ts": event.ts
-    })
+    }
+    store["readings"].append(row)
+    store["readings_by_sensor"].append(sid, row)
+    zone = event.payload.get("zone")
+    if zone is not None:
+        store["readings_by_zone"].append(zone, row)
     return store
 
 
@@ -66,7 +119,9 @@ def handle_actuate(event, store):
         "device": event.payload["device"],
         "action": event.payload["action"]
     }
-    store.setdefault("commands", []).append(entry)
+    if "commands" not in store:
+        configure_views(store)
+    store["commands"].append(entry)
     return store
 
 
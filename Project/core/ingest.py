@@ -0,0 +1,420 @@
+"""
+Сетевой приём показаний: асинхронный сервер (TCP — по строке JSON на пакет,
+UDP — по датаграмме на пакет), проверка в семантике core.pipeline.process_reading
+и публикация принятых показаний в шину событий. Здесь же генератор нагрузки
+с перцентилями задержки.
+
+Пакет — JSON-объект {"batch": n, "readings": [...]}, просто массив показаний
+или одно показание {"sensor_id", "value", "ts"[, "id"]}. На каждый пакет сервер
+отвечает строкой (датаграммой) {"batch": n, "accepted": a, "rejected": r}.
+
+    python -m core.ingest serve --port 8765 --udp-port 8766
+    python -m core.ingest load --port 8765 --readings 100000 --batch 100
+"""
+import argparse
+import asyncio
+import inspect
+import json
+import math
+import random
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Optional
+
+import numpy as np
+
+from core.asyncbus import QueueFull
+from core.catalog import as_catalog
+from core.pipeline import ERROR, STATUSES, ProfileTable, process_readings
+
+MAX_LINE = 4 << 20        # предел строки TCP (StreamReader по умолчанию — 64 КиБ)
+MAX_DATAGRAM = 65507      # полезная нагрузка UDP по IPv4
+
+
+class IngestStats:
+    __slots__ = ("batches", "readings", "accepted", "rejected", "malformed", "dropped", "statuses")
+
+    def __init__(self):
+        self.batches = self.readings = self.accepted = self.rejected = self.malformed = self.dropped = 0
+        self.statuses: dict[str, int] = {}
+
+
+def _well_formed(r) -> bool:
+    """Объект со строковым sensor_id, конечным числовым value и строковым ts (или без него)."""
+    if not isinstance(r, dict):
+        return False
+    value, ts = r.get("value"), r.get("ts")
+    return (isinstance(r.get("sensor_id"), str) and isinstance(value, (int, float)) and not isinstance(value, bool)
+            and math.isfinite(value) and (ts is None or isinstance(ts, str)))
+
+
+class Ingestor:
+    """
+    Разбор пакета, проверка (core.pipeline.process_readings) и публикация без
+    привязки к транспорту. Показание без сенсора в справочнике (статус error)
+    или с нечисловым значением отклоняется; ok/warning/alert публикуются
+    в topic с полями sensor, value, ts, zone и status. Шина — core.frp.EventBus (и наследники)
+    или core.asyncbus.AsyncEventBus: у асинхронной публикация по TCP ждёт
+    места в очереди, по UDP — не ждёт (переполнение считается в dropped).
+    """
+
+    def __init__(self, bus, sensors, profile, rules=(), topic: str = "READING"):
+        self.bus = bus
+        self.sensors = as_catalog(sensors)
+        self.profile = profile
+        self.table = ProfileTable.from_profile(profile)
+        self.rules = rules
+        self.topic = topic
+        self.stats = IngestStats()
+        self._async = inspect.iscoroutinefunction(bus.publish)
+
+    def decode(self, data: bytes) -> tuple[Optional[int], list]:
+        """(номер пакета, показания); ValueError на битом пакете или пакете не той формы."""
+        msg = json.loads(data)
+        if isinstance(msg, list):
+            return None, msg
+        if isinstance(msg, dict):
+            if "readings" in msg:
+                if not isinstance(msg["readings"], list):
+                    raise ValueError("readings должен быть массивом")
+                return msg.get("batch"), msg["readings"]
+            return None, [msg]
+        raise ValueError("ожидается объект или массив")
+
+    def validate(self, readings: list) -> list[dict]:
+        """Полезные нагрузки принятых показаний; счётчики обновляются в stats."""
+        stats = self.stats
+        stats.readings += len(readings)
+        numeric = [r for r in readings if _well_formed(r)]
+        stats.malformed += len(readings) - len(numeric)
+        result = process_readings(numeric, self.sensors, self.table)
+        for name, n in result.counts().items():
+            if n:
+                stats.statuses[name] = stats.statuses.get(name, 0) + n
+        sensor_by_id = self.sensors.sensor_by_id
+        payloads = []
+        for r, status in zip(numeric, result.status.tolist()):
+            if status == ERROR:
+                continue
+            sensor = sensor_by_id[r["sensor_id"]]
+            payloads.append({"sensor": sensor.id, "value": r["value"], "ts": r.get("ts"),
+                             "zone": sensor.zone_id, "status": STATUSES[status]})
+        stats.rejected += len(readings) - len(payloads)
+        stats.accepted += len(payloads)
+        return payloads
+
+    def handle(self, data: bytes) -> tuple[dict, list[dict]]:
+        """Ответ на пакет и нагрузки к публикации."""
+        self.stats.batches += 1
+        try:
+            batch, readings = self.decode(data)
+        except ValueError as exc:  # json.JSONDecodeError — тоже ValueError
+            self.stats.malformed += 1
+            return {"batch": None, "accepted": 0, "rejected": 0, "error": str(exc)}, []
+        rejected = self.stats.rejected
+        payloads = self.validate(readings)
+        return {"batch": batch, "accepted": len(payloads), "rejected": self.stats.rejected - rejected}, payloads
+
+    def handle_safe(self, data: bytes) -> tuple[dict, list[dict]]:
+        """handle, для которого любой неожиданный сбой разбора — ответ с ошибкой, а не обрыв соединения."""
+        try:
+            return self.handle(data)
+        except Exception as exc:
+            self.stats.malformed += 1
+            return {"batch": None, "accepted": 0, "rejected": 0, "error": f"{type(exc).__name__}: {exc}"}, []
+
+    async def publish(self, payloads: list[dict]) -> None:
+        if self._async:
+            for payload in payloads:
+                await self.bus.publish(self.topic, payload)
+        else:
+            for payload in payloads:
+                self.bus.publish(self.topic, payload)
+
+    def publish_nowait(self, payloads: list[dict]) -> None:
+        publish = getattr(self.bus, "publish_nowait", self.bus.publish)
+        for payload in payloads:
+            try:
+                publish(self.topic, payload)
+            except QueueFull:
+                self.stats.dropped += 1
+
+    def metrics(self) -> dict:
+        s = self.stats
+        return {"batches": s.batches, "readings": s.readings, "accepted": s.accepted, "rejected": s.rejected,
+                "malformed": s.malformed, "dropped": s.dropped, "statuses": dict(s.statuses)}
+
+
+def _encode(obj: dict) -> bytes:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class _UdpServer(asyncio.DatagramProtocol):
+    def __init__(self, ingestor: Ingestor):
+        self.ingestor = ingestor
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        ack, payloads = self.ingestor.handle_safe(data)
+        self.ingestor.publish_nowait(payloads)
+        self.transport.sendto(_encode(ack), addr)
+
+
+class IngestServer:
+    """TCP на (host, port) и, если задан udp_port, UDP; порт 0 — выбрать свободный."""
+
+    def __init__(self, ingestor: Ingestor, host: str = "127.0.0.1", port: int = 0,
+                 udp_port: Optional[int] = None):
+        self.ingestor = ingestor
+        self.host = host
+        self.port = port
+        self.udp_port = udp_port
+        self._tcp = None
+        self._udp = None
+
+    async def start(self) -> None:
+        self._tcp = await asyncio.start_server(self._serve_tcp, self.host, self.port, limit=MAX_LINE)
+        self.port = self._tcp.sockets[0].getsockname()[1]
+        if self.udp_port is not None:
+            self._udp, _ = await asyncio.get_running_loop().create_datagram_endpoint(
+                lambda: _UdpServer(self.ingestor), local_addr=(self.host, self.udp_port))
+            self.udp_port = self._udp.get_extra_info("sockname")[1]
+
+    async def _serve_tcp(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:  # строка длиннее MAX_LINE
+                    break
+                if not line:
+                    break
+                ack, payloads = self.ingestor.handle_safe(line)
+                await self.ingestor.publish(payloads)
+                writer.write(_encode(ack) + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def stop(self) -> None:
+        if self._udp is not None:
+            self._udp.close()
+        if self._tcp is not None:
+            self._tcp.close()
+            await self._tcp.wait_closed()
+
+    async def __aenter__(self) -> "IngestServer":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.stop()
+
+
+# --- генератор нагрузки ---
+def make_batches(sensor_ids, total: int, batch_size: int, seed: int = 42) -> list[bytes]:
+    """Готовые к отправке пакеты (без перевода строки): total показаний по batch_size."""
+    rnd = random.Random(seed)
+    start = datetime(2025, 9, 1)
+    sensor_ids = list(sensor_ids)
+    batches = []
+    for b, first in enumerate(range(0, total, batch_size)):
+        readings = [{"id": f"r{i + 1}", "sensor_id": sensor_ids[i % len(sensor_ids)],
+                     "ts": (start + timedelta(seconds=i)).strftime("%Y-%m-%d %H:%M:%S"),
+                     "value": round(rnd.uniform(0, 100), 1)}
+                    for i in range(first, min(first + batch_size, total))]
+        batches.append(_encode({"batch": b, "readings": readings}))
+    return batches
+
+
+@dataclass
+class LoadReport:
+    readings: int
+    batches: int
+    acked: int = 0
+    accepted: int = 0
+    rejected: int = 0
+    elapsed: float = 0.0
+    latencies: list = field(default_factory=list)  # секунды от отправки пакета до ответа
+
+    @property
+    def rate(self) -> float:
+        """Принятых сервером показаний в секунду."""
+        return self.accepted / self.elapsed if self.elapsed else 0.0
+
+    def percentiles(self, qs=(50, 90, 99, 100)) -> dict:
+        """Задержка пакета в миллисекундах по перцентилям."""
+        if not self.latencies:
+            return {q: float("nan") for q in qs}
+        values = np.percentile(np.asarray(self.latencies) * 1000, qs)
+        return dict(zip(qs, values.tolist()))
+
+
+def _count_ack(report: LoadReport, ack: dict, sent_at: float) -> None:
+    report.latencies.append(time.perf_counter() - sent_at)
+    report.acked += 1
+    report.accepted += ack.get("accepted", 0)
+    report.rejected += ack.get("rejected", 0)
+
+
+async def load_tcp(host: str, port: int, batches: list[bytes], readings: int, window: int = 8) -> LoadReport:
+    """Одно соединение, до window пакетов в полёте; ответы TCP приходят по порядку."""
+    report = LoadReport(readings, len(batches))
+    reader, writer = await asyncio.open_connection(host, port, limit=MAX_LINE)
+    slots = asyncio.Semaphore(window)
+    in_flight: deque = deque()
+
+    async def receive():
+        for _ in batches:
+            line = await reader.readline()
+            if not line:
+                break
+            _count_ack(report, json.loads(line), in_flight.popleft())
+            slots.release()
+
+    t0 = time.perf_counter()
+    receiver = asyncio.create_task(receive())
+    for data in batches:
+        await slots.acquire()
+        in_flight.append(time.perf_counter())
+        writer.write(data + b"\n")
+        await writer.drain()
+    await receiver
+    report.elapsed = time.perf_counter() - t0
+    writer.close()
+    return report
+
+
+class _UdpClient(asyncio.DatagramProtocol):
+    def __init__(self, report: LoadReport, slots: asyncio.Semaphore):
+        self.report = report
+        self.slots = slots
+        self.sent_at: dict = {}
+        self.done = asyncio.get_running_loop().create_future()
+
+    def datagram_received(self, data, addr):
+        ack = json.loads(data)
+        sent_at = self.sent_at.pop(ack.get("batch"), None)
+        if sent_at is None:
+            return
+        _count_ack(self.report, ack, sent_at)
+        self.slots.release()
+        if self.report.acked == self.report.batches and not self.done.done():
+            self.done.set_result(None)
+
+
+async def load_udp(host: str, port: int, batches: list[bytes], readings: int, window: int = 8,
+                   timeout: float = 1.0) -> LoadReport:
+    """Датаграммы с номерами пакетов; ответ, не пришедший за timeout, считается потерей."""
+    report = LoadReport(readings, len(batches))
+    slots = asyncio.Semaphore(window)
+    loop = asyncio.get_running_loop()
+    transport, proto = await loop.create_datagram_endpoint(
+        lambda: _UdpClient(report, slots), remote_addr=(host, port))
+
+    def expire(b):
+        if proto.sent_at.pop(b, None) is not None:
+            slots.release()
+
+    t0 = time.perf_counter()
+    for b, data in enumerate(batches):
+        if len(data) > MAX_DATAGRAM:
+            raise ValueError(f"пакет {b} длиннее датаграммы ({len(data)} байт): уменьшите batch")
+        await slots.acquire()
+        proto.sent_at[b] = time.perf_counter()
+        transport.sendto(data)
+        loop.call_later(timeout, expire, b)
+    try:
+        await asyncio.wait_for(asyncio.shield(proto.done), timeout)
+    except asyncio.TimeoutError:
+        pass
+    report.elapsed = time.perf_counter() - t0
+    transport.close()
+    return report
+
+
+def format_report(report: LoadReport) -> str:
+    p = report.percentiles()
+    return (f"{report.accepted:,} из {report.readings:,} показаний за {report.elapsed:.2f} с "
+            f"({report.rate:,.0f}/с), пакетов с ответом {report.acked}/{report.batches}, "
+            f"задержка пакета, мс: p50 {p[50]:.2f}  p90 {p[90]:.2f}  p99 {p[99]:.2f}  max {p[100]:.2f}")
+
+
+# --- запуск из командной строки ---
+async def _serve(args) -> None:
+    from core.asyncbus import AsyncEventBus
+    from core.frp import configure_views, handle_reading
+    from core.transforms import load_seed
+
+    zones, profiles, sensors, actuators, _, rules = load_seed(args.seed, cache=True)
+    if args.log:
+        from core.eventlog import EventLog, LoggedEventBus
+        bus = LoggedEventBus(EventLog(args.log))
+        bus.subscribe("READING", handle_reading)
+        configure_views(bus.store)
+        bus.recover()
+    else:
+        bus = AsyncEventBus(maxsize=args.queue)
+        configure_views(bus.store)
+        bus.subscribe_each("READING", handle_reading)
+        await bus.start()
+    ingestor = Ingestor(bus, sensors, profiles[0], rules)
+    async with IngestServer(ingestor, args.host, args.port, args.udp_port) as server:
+        udp = f", UDP {server.udp_port}" if server.udp_port is not None else ""
+        print(f"приём показаний: TCP {args.host}:{server.port}{udp}")
+        try:
+            while True:
+                await asyncio.sleep(args.every)
+                print(json.dumps(ingestor.metrics(), ensure_ascii=False))
+        finally:
+            if args.log:
+                bus.log.close()
+            else:
+                await bus.stop()
+
+
+async def _load(args) -> None:
+    from core.transforms import load_seed
+
+    sensor_ids = [s.id for s in load_seed(args.seed, cache=True)[2]]
+    batches = make_batches(sensor_ids, args.readings, args.batch)
+    if args.udp:
+        report = await load_udp(args.host, args.port, batches, args.readings, args.window)
+    else:
+        report = await load_tcp(args.host, args.port, batches, args.readings, args.window)
+    print(format_report(report))
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seed", default="data/seed.json")
+    parser.add_argument("--host", default="127.0.0.1")
+    sub = parser.add_subparsers(dest="command", required=True)
+    serve = sub.add_parser("serve", help="сервер приёма")
+    serve.add_argument("--port", type=int, default=8765)
+    serve.add_argument("--udp-port", type=int)
+    serve.add_argument("--queue", type=int, default=8192, help="ёмкость очереди топика READING")
+    serve.add_argument("--log", help="каталог журнала событий (LoggedEventBus вместо асинхронной шины)")
+    serve.add_argument("--every", type=float, default=5.0, help="период вывода метрик, с")
+    load = sub.add_parser("load", help="генератор нагрузки")
+    load.add_argument("--port", type=int, default=8765)
+    load.add_argument("--udp", action="store_true", help="порт — UDP")
+    load.add_argument("--readings", type=int, default=100000)
+    load.add_argument("--batch", type=int, default=100)
+    load.add_argument("--window", type=int, default=8, help="пакетов в полёте")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(_serve(args) if args.command == "serve" else _load(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
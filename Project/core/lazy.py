@@ -3,24 +3,54 @@ import sys
 from datetime import datetime
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from core.domain import Reading, Command
-from typing import Iterable, Callable
-def iter_readings(readings: tuple[Reading, ...], pred: Callable[[Reading], bool]) -> Iterable[Reading]:
+from core.store import ReadingStore, epochs
+from core.rules import DEVICE_MAP, compile_rules  # DEVICE_MAP — реэкспорт для совместимости
+from core.schedule import VENTILATION_DEVICES
+from typing import Iterable, Callable, NamedTuple, Optional
+from itertools import chain
+from datetime import timedelta
+import numpy as np
+
+
+class KindReading(NamedTuple):
+    """Показание с типом сенсора — формат входа для lazy_hysteresis_control."""
+    id: str
+    sensor_id: str
+    kind: str
+    value: float
+    ts: str
+
+
+def iter_readings(readings: Iterable[Reading], pred: Callable[[Reading], bool]) -> Iterable[Reading]:
     """Ленивый генератор, фильтрует показания по предикату."""
     for r in readings:
         if pred(r):
             yield r
 
-def lazy_hysteresis_control(stream, profile, rules):
-    """Генератор команд с гистерезисом, фильтрацией по параметрам и защитой от дребезга."""
+
+def iter_chunks(chunks: Iterable[tuple[Reading, ...]]) -> Iterable[Reading]:
+    """Разворачивает поток чанков (core.loader) в поток показаний без буферизации."""
+    return chain.from_iterable(chunks)
+
+
+def with_kind(readings: Iterable[Reading], sensors) -> Iterable[KindReading]:
+    """Лениво добавляет к показаниям тип сенсора."""
+    kinds = {s.id: s.kind for s in sensors}
+    for r in readings:
+        yield KindReading(r.id, r.sensor_id, kinds.get(r.sensor_id), r.value, r.ts)
+
+def lazy_hysteresis_control(stream, profile, rules, schedule=None):
+    """
+    Генератор команд с гистерезисом, фильтрацией по параметрам и защитой от дребезга.
+    schedule (core.schedule.WeeklySchedule) — вентиляционные окна: вне них не выдаются
+    команды вентиляционным устройствам (VENTILATION_DEVICES), остальные актуаторы
+    управляются без ограничений по времени.
+    Правила компилируются в таблицу по параметру: показание проверяется
+    только правилами своего параметра.
+    """
     last_actions = {}
     last_times = {}
-    device_map = {
-        "temp": "heater",
-        "hum_air": "humidifier",
-        "hum_soil": "pump",
-        "light": "lamp",
-        "co2": "co2_valve"
-    }
+    controls = compile_rules(rules).controls
 
     for reading in stream:
         kind = getattr(reading, "kind", None)
@@ -33,20 +63,15 @@ def lazy_hysteresis_control(stream, profile, rules):
                 now_dt = datetime.fromisoformat(now)
         else:
             now_dt = now
+        closed = schedule is not None and not schedule.is_active(now_dt)
 
-        for rule in rules:
-            payload = rule.payload
-            param = payload.get("param")
-            if param != kind:
+        for rule in controls.get(kind, ()):
+            if closed and rule.device in VENTILATION_DEVICES:
                 continue
-
-            if rule.kind not in ("hysteresis", "range"):
-                continue
-
-            vmin = payload.get("min")
-            vmax = payload.get("max")
-            actuator = payload.get("device", device_map.get(param, param))
-            cooldown = payload.get("cooldown", 300)  # секунды
+            param = rule.param
+            vmin, vmax = rule.vmin, rule.vmax
+            actuator = rule.device
+            cooldown = rule.cooldown  # секунды
 
             prev_action = last_actions.get(param)
             prev_time = last_times.get(param, datetime.min)
@@ -71,3 +96,134 @@ def lazy_hysteresis_control(stream, profile, rules):
                     action=action,
                     payload={"reason": reason, "value": value}
                 )
+
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def store_columns(store: ReadingStore, sensors=()) -> tuple:
+    """Колонки (ts, kind, value) из ReadingStore — вход для hysteresis_control_batch."""
+    kinds = {s.id: s.kind for s in sensors} if sensors else dict(zip(store.sensor_ids, store.sensor_kinds or ()))
+    kind_table = np.array([kinds.get(sid) for sid in store.sensor_ids], dtype=object)
+    return store.ts, kind_table[store.sensor_idx], store.value
+
+
+def _control_groups(rules) -> dict:
+    """Правила range/hysteresis, сгруппированные по параметру с сохранением порядка."""
+    return {param: [(r.vmin, r.vmax, r.device, r.cooldown) for r in group]
+            for param, group in compile_rules(rules).controls.items()}
+
+
+def _jump_single_rule(ts, vals, vmin, vmax, cooldown):
+    """
+    Переходы ON/OFF для одного правила при неубывающем времени: между командами
+    состояние не меняется, поэтому следующая команда ищется бинарным поиском —
+    O(число команд × log n) вместо прохода по всем показаниям.
+    """
+    below = np.flatnonzero(vals < vmin)
+    above = np.flatnonzero(vals > vmax)
+    events = []
+    prev, pos, t_prev = None, 0, None
+    n = len(ts)
+    while pos < n:
+        start = pos if t_prev is None else max(pos, int(np.searchsorted(ts, t_prev + cooldown, side="left")))
+        nxt_on = nxt_off = n
+        if prev != "ON":
+            k = np.searchsorted(below, start)
+            nxt_on = int(below[k]) if k < len(below) else n
+        if prev != "OFF":
+            k = np.searchsorted(above, start)
+            nxt_off = int(above[k]) if k < len(above) else n
+        row = min(nxt_on, nxt_off)
+        if row >= n:
+            break
+        prev = "ON" if row == nxt_on else "OFF"
+        events.append((row, prev))
+        t_prev = ts[row]
+        pos = row + 1
+    return events
+
+
+def _scan_rules(ts, vals, group, is_open=None):
+    """
+    Последовательная проверка кандидатов — для нескольких правил на параметр или
+    неупорядоченного времени. is_open — маска вентиляционных окон по строкам:
+    вне окна правила вентиляционных устройств пропускаются.
+    """
+    candidate = np.zeros(len(vals), dtype=bool)
+    for vmin, vmax, _, _ in group:
+        candidate |= (vals < vmin) | (vals > vmax)
+    events = []
+    prev, t_prev = None, None
+    for row in np.flatnonzero(candidate).tolist():
+        t, v = int(ts[row]), float(vals[row])
+        for j, (vmin, vmax, device, cooldown) in enumerate(group):
+            if is_open is not None and not is_open[row] and device in VENTILATION_DEVICES:
+                continue
+            if t_prev is not None and t - t_prev < cooldown:
+                continue
+            action = None
+            if v < vmin and prev != "ON":
+                action = "ON"
+            elif v > vmax and prev != "OFF":
+                action = "OFF"
+            if action:
+                prev, t_prev = action, t
+                events.append((row, j, action))
+    return events
+
+
+def hysteresis_control_batch(ts, kinds, values, rules, schedule=None) -> tuple[Command, ...]:
+    """
+    Пакетный вариант lazy_hysteresis_control: на входе колонки времени
+    (epoch-секунды или строки), типа параметра и значения. Возвращает ту же
+    последовательность Command, что и генератор на тех же показаниях.
+    """
+    ts = np.asarray(ts)
+    if ts.dtype.kind in "UO":
+        ts = epochs(ts)
+    elif ts.dtype.kind == "M":
+        ts = ts.astype("datetime64[s]").astype(np.int64)
+    else:
+        ts = ts.astype(np.int64)
+    kinds = np.asarray(kinds, dtype=object)
+    values = np.asarray(values)
+    if values.dtype == np.float32:
+        # как ленивый адаптер ReadingStore: кратчайшее десятичное представление float32
+        values = values.astype(str)
+    values = values.astype(np.float64)
+
+    active = schedule.active_mask(ts) if schedule is not None else None
+    groups = _control_groups(rules)
+    events = []
+    for param, group in groups.items():
+        rows = np.flatnonzero(kinds == param)
+        is_open = None
+        if active is not None:
+            gated = [device in VENTILATION_DEVICES for _, _, device, _ in group]
+            if all(gated):
+                rows = rows[active[rows]]
+            elif any(gated):
+                is_open = active[rows]  # окна ограничивают только часть правил параметра
+        if rows.size == 0:
+            continue
+        p_ts, p_vals = ts[rows], values[rows]
+        if len(group) == 1 and np.all(p_ts[1:] >= p_ts[:-1]):
+            vmin, vmax, _, cooldown = group[0]
+            found = [(row, 0, action) for row, action in _jump_single_rule(p_ts, p_vals, vmin, vmax, cooldown)]
+        else:
+            found = _scan_rules(p_ts, p_vals, group, is_open)
+        events.extend((int(rows[row]), j, param, action) for row, j, action in found)
+
+    events.sort(key=lambda e: (e[0], e[1]))
+    commands = []
+    for row, j, param, action in events:
+        stamp = (_EPOCH + timedelta(seconds=int(ts[row]))).strftime("%Y-%m-%d %H:%M")
+        commands.append(Command(
+            id=f"{param}_{action.lower()}_{stamp}",
+            actuator_id=groups[param][j][2],
+            ts=stamp,
+            action=action,
+            payload={"reason": "below_min" if action == "ON" else "above_max", "value": values[row].item()}
+        ))
+    return tuple(commands)
@@ -0,0 +1,220 @@
+"""Потоковая загрузка seed.json и файлов показаний в формате JSON Lines."""
+import json
+import re
+from itertools import chain
+from typing import Iterator, Optional
+
+from core.domain import Zone, PlantProfile, Sensor, Reading, Actuator, Rule
+
+CATALOG_SECTIONS = ("zones", "profiles", "sensors", "actuators", "rules")
+DEFAULT_CHUNK = 1000
+_BLOCK = 1 << 16
+_WS = re.compile(r"[ \t\r\n]*")
+
+SECTION_TYPES = {
+    "zones": Zone,
+    "profiles": PlantProfile,
+    "sensors": Sensor,
+    "actuators": Actuator,
+    "rules": Rule,
+}
+
+
+class _JsonReader:
+    """Инкрементальный разбор JSON поверх файла: читает блоками, хранит только хвост буфера."""
+
+    def __init__(self, f, block: int = _BLOCK):
+        self.f = f
+        self.block = block
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self, size: int) -> bool:
+        if self.eof:
+            return False
+        chunk = self.f.read(size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Пропускает пробелы и возвращает следующий символ ('' в конце файла)."""
+        while True:
+            self.pos = pos = _WS.match(self.buf, self.pos).end()
+            if pos < len(self.buf):
+                return self.buf[pos]
+            if not self._fill(self.block):
+                return ""
+
+    def expect(self, ch: str) -> None:
+        got = self.peek()
+        if got != ch:
+            raise ValueError(f"JSON: ожидался {ch!r}, получено {got!r}")
+        self.pos += 1
+
+    def value(self):
+        """Разбирает одно JSON-значение, дочитывая файл при необходимости."""
+        self.peek()
+        while True:
+            try:
+                obj, end = self.decoder.raw_decode(self.buf, self.pos)
+                # число на границе блока могло быть обрезано — дочитываем
+                if end < len(self.buf) or self.eof:
+                    self.pos = end
+                    return obj
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            # буфер растёт геометрически, чтобы большие значения не разбирались заново много раз
+            self._fill(max(self.block, len(self.buf) - self.pos))
+
+    def iter_array(self) -> Iterator:
+        """Лениво перебирает элементы массива."""
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            sep = self.peek()
+            self.pos += 1
+            if sep == "]":
+                return
+            if sep != ",":
+                raise ValueError(f"JSON: ожидалась ',' или ']', получено {sep!r}")
+
+    def iter_object_keys(self) -> Iterator[str]:
+        """Перебирает ключи объекта; значение каждого ключа должен прочитать вызывающий код."""
+        self.expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(":")
+            yield key
+            sep = self.peek()
+            self.pos += 1
+            if sep == "}":
+                return
+            if sep != ",":
+                raise ValueError(f"JSON: ожидалась ',' или '}}', получено {sep!r}")
+
+
+def _chunked(items, chunk_size: int) -> Iterator[tuple]:
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= chunk_size:
+            yield tuple(chunk)
+            chunk = []
+    if chunk:
+        yield tuple(chunk)
+
+
+class SeedStream:
+    """
+    Потоковое чтение seed.json: каталог (зоны, профили, сенсоры, актуаторы, правила)
+    разбирается сразу, показания отдаются кортежами не длиннее chunk_size.
+    Если секции каталога лежат в файле после показаний, файл читается вторым проходом.
+    """
+
+    def __init__(self, path: str, chunk_size: int = DEFAULT_CHUNK, block: int = _BLOCK):
+        self.path = path
+        self.chunk_size = chunk_size
+        self.block = block
+        self.sections = {name: () for name in CATALOG_SECTIONS}
+        self._f = open(path, encoding="utf-8")
+        self._reader: Optional[_JsonReader] = _JsonReader(self._f, block)
+        self._keys = self._reader.iter_object_keys()
+        self._second_pass = False
+        self._read_catalog()
+
+    def _read_catalog(self) -> None:
+        seen = set()
+        for key in self._keys:
+            if key == "readings":
+                if seen >= set(CATALOG_SECTIONS):
+                    return  # показания читаем прямо из этого прохода
+                # каталог мог оказаться после показаний: пропускаем их и дочитываем
+                for _ in self._reader.iter_array():
+                    pass
+                self._second_pass = True
+            elif key in SECTION_TYPES:
+                build = SECTION_TYPES[key]
+                self.sections[key] = tuple(build(**item) for item in self._reader.iter_array())
+                seen.add(key)
+            else:
+                self._reader.value()
+        # показаний нет, либо их нужно перечитать вторым проходом
+        if not self._second_pass:
+            self._reader = None
+        self._f.close()
+
+    @property
+    def catalog(self) -> tuple:
+        """(zones, profiles, sensors, actuators, rules) — в порядке load_seed."""
+        return tuple(self.sections[name] for name in CATALOG_SECTIONS)
+
+    @property
+    def sensors(self) -> tuple[Sensor, ...]:
+        return self.sections["sensors"]
+
+    @property
+    def rules(self) -> tuple[Rule, ...]:
+        return self.sections["rules"]
+
+    def _raw_readings(self, reader: Optional[_JsonReader]) -> Iterator[dict]:
+        if reader is None:
+            return
+        if self._second_pass:
+            with open(self.path, encoding="utf-8") as f:
+                reader = _JsonReader(f, self.block)
+                for key in reader.iter_object_keys():
+                    if key == "readings":
+                        yield from reader.iter_array()
+                        return
+                    reader.value()
+            return
+        try:
+            yield from reader.iter_array()
+        finally:
+            self._f.close()
+
+    def chunks(self) -> Iterator[tuple[Reading, ...]]:
+        """Показания кортежами по chunk_size; поток можно пройти только один раз."""
+        reader, self._reader = self._reader, None
+        rows = (Reading(**r) for r in self._raw_readings(reader))
+        return _chunked(rows, self.chunk_size)
+
+    def readings(self) -> Iterator[Reading]:
+        return chain.from_iterable(self.chunks())
+
+    def close(self) -> None:
+        self._reader = None
+        self._f.close()
+
+    def __enter__(self) -> "SeedStream":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def iter_jsonl_chunks(path: str, chunk_size: int = DEFAULT_CHUNK) -> Iterator[tuple[Reading, ...]]:
+    """Показания из файла JSON Lines (один объект Reading на строку)."""
+    with open(path, encoding="utf-8") as f:
+        rows = (Reading(**json.loads(line)) for line in f if line.strip())
+        yield from _chunked(rows, chunk_size)
+
+
+def iter_reading_chunks(path: str, chunk_size: int = DEFAULT_CHUNK) -> Iterator[tuple[Reading, ...]]:
+    """Чанки показаний из seed.json или из .jsonl/.ndjson — по расширению файла."""
+    if path.endswith((".jsonl", ".ndjson")):
+        return iter_jsonl_chunks(path, chunk_size)
+    return SeedStream(path, chunk_size).chunks()
@@ -0,0 +1,204 @@
+"""
+Метрики стадий обработки: число вызовов, ошибок, обработанных элементов и
+гистограмма задержек с фиксированными корзинами. Счётчики — заранее выделенные
+массивы int64 (array('q')), запись вызова их только увеличивает.
+Пока метрики выключены, обёртка instrument стоит одну проверку флага.
+
+Экспорт: snapshot() — словарь, to_prometheus() / write_prometheus() — текстовый
+формат Prometheus. Включение — enable() или переменная окружения GREENHOUSE_METRICS=1.
+"""
+import inspect
+import os
+from array import array
+from bisect import bisect_left
+from functools import wraps
+from time import perf_counter_ns
+from typing import Callable, Optional
+
+# верхние границы корзин, нс: 1 мкс … 10 с по шкале 1–2.5–5
+BOUNDS_NS = tuple(int(m * 10 ** e) for e in range(3, 10) for m in (1, 2.5, 5)) + (10 ** 10,)
+COUNT, ITEMS, ERRORS, SUM_NS, MAX_NS, METRICS_ERRORS = range(6)
+METRIC = "greenhouse_stage_seconds"
+
+
+class Stage:
+    """Счётчики одной стадии: корзины задержек (последняя — +Inf) и итоги."""
+
+    __slots__ = ("name", "buckets", "totals")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.buckets = array("q", bytes(8 * (len(BOUNDS_NS) + 1)))
+        self.totals = array("q", bytes(8 * 6))
+
+    def observe(self, ns: int, items: int = 1) -> None:
+        self.buckets[bisect_left(BOUNDS_NS, ns)] += 1
+        totals = self.totals
+        totals[COUNT] += 1
+        totals[ITEMS] += items
+        totals[SUM_NS] += ns
+        if ns > totals[MAX_NS]:
+            totals[MAX_NS] = ns
+
+    def reset(self) -> None:
+        for i in range(len(self.buckets)):
+            self.buckets[i] = 0
+        for i in range(len(self.totals)):
+            self.totals[i] = 0
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Оценка квантиля, с: верхняя граница корзины (для +Inf — максимум)."""
+        count = self.totals[COUNT]
+        if not count:
+            return None
+        rank = q * count
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if seen >= rank and n:
+                ns = BOUNDS_NS[i] if i < len(BOUNDS_NS) else self.totals[MAX_NS]
+                return min(ns, self.totals[MAX_NS]) / 1e9
+        return self.totals[MAX_NS] / 1e9
+
+    def snapshot(self) -> dict:
+        t = self.totals
+        count, total = t[COUNT], t[SUM_NS] / 1e9
+        cumulative, buckets = 0, []
+        for bound, n in zip(BOUNDS_NS + (None,), self.buckets):
+            cumulative += n
+            buckets.append((bound / 1e9 if bound is not None else float("inf"), cumulative))
+        return {
+            "count": count,
+            "errors": t[ERRORS],
+            "metrics_errors": t[METRICS_ERRORS],
+            "items": t[ITEMS],
+            "sum": total,
+            "mean": total / count if count else None,
+            "max": t[MAX_NS] / 1e9,
+            "items_per_s": t[ITEMS] / total if total else None,
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "p99": self.quantile(0.99),
+            "buckets": buckets,
+        }
+
+
+class Registry:
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.stages: dict[str, Stage] = {}
+
+    def stage(self, name: str) -> Stage:
+        stage = self.stages.get(name)
+        if stage is None:
+            stage = self.stages[name] = Stage(name)
+        return stage
+
+    def reset(self) -> None:
+        for stage in self.stages.values():
+            stage.reset()
+
+    def snapshot(self) -> dict:
+        """{стадия: {count, errors, metrics_errors, items, sum, mean, max, items_per_s, p50, p90, p99, buckets}}."""
+        return {name: stage.snapshot() for name, stage in self.stages.items()}
+
+    def to_prometheus(self) -> str:
+        lines = [
+            f"# HELP {METRIC} Время выполнения стадии обработки.",
+            f"# TYPE {METRIC} histogram",
+        ]
+        for name, stage in self.stages.items():
+            label = name.replace("\\", "\\\\").replace('"', '\\"')
+            cumulative = 0
+            for bound, n in zip(BOUNDS_NS + (None,), stage.buckets):
+                cumulative += n
+                le = "+Inf" if bound is None else repr(bound / 1e9)
+                lines.append(f'{METRIC}_bucket{{stage="{label}",le="{le}"}} {cumulative}')
+            lines.append(f'{METRIC}_sum{{stage="{label}"}} {stage.totals[SUM_NS] / 1e9!r}')
+            lines.append(f'{METRIC}_count{{stage="{label}"}} {stage.totals[COUNT]}')
+        for metric, index, help_text in (("items", ITEMS, "Обработано элементов (показаний, событий)."),
+                                         ("errors", ERRORS, "Вызовов, завершившихся исключением."),
+                                         ("metrics_errors", METRICS_ERRORS, "Сбоев подсчёта элементов (items).")):
+            lines.append(f"# HELP greenhouse_stage_{metric}_total {help_text}")
+            lines.append(f"# TYPE greenhouse_stage_{metric}_total counter")
+            for name, stage in self.stages.items():
+                label = name.replace("\\", "\\\\").replace('"', '\\"')
+                lines.append(f'greenhouse_stage_{metric}_total{{stage="{label}"}} {stage.totals[index]}')
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str) -> str:
+        """Атомарно пишет текстовый файл (например, для textfile-коллектора node_exporter)."""
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp, path)
+        return path
+
+
+REGISTRY = Registry(enabled=os.environ.get("GREENHOUSE_METRICS", "") not in ("", "0"))
+
+
+def enable() -> None:
+    REGISTRY.enabled = True
+
+
+def disable() -> None:
+    REGISTRY.enabled = False
+
+
+def instrument(name: str, items: Optional[Callable[..., int]] = None, registry: Registry = REGISTRY):
+    """
+    Декоратор стадии: время вызова попадает в гистограмму name.
+    items(result, arguments) — сколько элементов обработал вызов (по умолчанию 1);
+    arguments — аргументы вызова по именам параметров, как бы они ни были переданы.
+    Ошибка в items не доходит до вызывающего: вызов учитывается с 0 элементов,
+    сбой — в счётчике metrics_errors. Корутины замеряются до завершения.
+    """
+    stage = registry.stage(name)
+
+    def decorate(fn):
+        signature = inspect.signature(fn) if items else None
+
+        def count(result, args, kwargs) -> int:
+            if items is None:
+                return 1
+            try:
+                bound = signature.bind(*args, **kwargs)
+                bound.apply_defaults()
+                return int(items(result, bound.arguments))
+            except Exception:
+                stage.totals[METRICS_ERRORS] += 1
+                return 0
+
+        if inspect.iscoroutinefunction(fn):
+            @wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                if not registry.enabled:
+                    return await fn(*args, **kwargs)
+                t0 = perf_counter_ns()
+                try:
+                    result = await fn(*args, **kwargs)
+                except BaseException:
+                    stage.totals[ERRORS] += 1
+                    stage.observe(perf_counter_ns() - t0)
+                    raise
+                stage.observe(perf_counter_ns() - t0, count(result, args, kwargs))
+                return result
+            return async_wrapper
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not registry.enabled:
+                return fn(*args, **kwargs)
+            t0 = perf_counter_ns()
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException:
+                stage.totals[ERRORS] += 1
+                stage.observe(perf_counter_ns() - t0)
+                raise
+            stage.observe(perf_counter_ns() - t0, count(result, args, kwargs))
+            return result
+        return wrapper
+
+    return decorate
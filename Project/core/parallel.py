@@ -0,0 +1,138 @@
+"""
+Параллельные отчёты: единицы работы (день, зона) в пуле процессов.
+Показания лежат в разделяемой памяти одним блоком колонок — воркеры
+читают их без сериализации, по пулу передаются только границы срезов.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Optional
+
+import numpy as np
+
+from core.catalog import as_catalog
+from core.domain import Reading
+
+# состояние воркера: заполняется в _init_worker один раз на процесс
+_worker: dict = {}
+
+
+class SharedReadings:
+    """
+    Партиции {day: {zone: {kind: [Reading]}}} в SharedMemory: колонки value (float64),
+    sensor (int32), is_int, id и ts (байтовые строки фиксированной ширины).
+    Показания уложены подряд в порядке партиций; units — [(day, zone, {kind: (start, stop)})].
+    """
+
+    def __init__(self, days, parts):
+        readings = []
+        self.units = []
+        for day in days:
+            for zone_id, zone_parts in parts.get(day, {}).items():
+                slices = {}
+                for kind, kind_readings in zone_parts.items():
+                    slices[kind] = (len(readings), len(readings) + len(kind_readings))
+                    readings.extend(kind_readings)
+                self.units.append((day, zone_id, slices))
+
+        n = len(readings)
+        self.sensor_ids = tuple(dict.fromkeys(r.sensor_id for r in readings))
+        pos = {sid: i for i, sid in enumerate(self.sensor_ids)}
+        columns = {
+            "value": np.fromiter((r.value for r in readings), dtype=np.float64, count=n),
+            "sensor": np.fromiter((pos[r.sensor_id] for r in readings), dtype=np.int32, count=n),
+            # целые значения из JSON остаются int, чтобы отчёт совпадал с последовательным
+            "is_int": np.fromiter((isinstance(r.value, int) for r in readings), dtype=np.bool_, count=n),
+            "ids": np.array([r.id.encode() for r in readings] or [b""], dtype=bytes)[:n],
+            "ts": np.array([str(r.ts).encode() for r in readings] or [b""], dtype=bytes)[:n],
+        }
+
+        self.layout = []
+        offset = 0
+        for name, col in columns.items():
+            offset = -(-offset // 8) * 8
+            self.layout.append((name, col.dtype.str, col.shape, offset))
+            offset += col.nbytes
+        self.shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        for (name, _, _, start), col in zip(self.layout, columns.values()):
+            self.shm.buf[start:start + col.nbytes] = col.tobytes()
+
+    def close(self) -> None:
+        self.shm.close()
+        self.shm.unlink()
+
+    def __enter__(self) -> "SharedReadings":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def attach(name: str, layout) -> tuple[shared_memory.SharedMemory, dict]:
+    """Подключается к блоку по имени и возвращает numpy-представления колонок без копирования."""
+    shm = shared_memory.SharedMemory(name=name)
+    columns = {
+        col: np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf, offset=start)
+        for col, dtype, shape, start in layout
+    }
+    return shm, columns
+
+
+def _init_worker(name, layout, sensor_ids, sensors, profiles, rules) -> None:
+    shm, columns = attach(name, layout)
+    _worker.update(shm=shm, columns=columns, sensor_ids=sensor_ids,
+                   sensors=sensors, profiles=profiles, rules=rules)
+
+
+def _materialize(columns: dict, sensor_ids: tuple, start: int, stop: int) -> list[Reading]:
+    ids, ts = columns["ids"][start:stop], columns["ts"][start:stop]
+    sensor, value, is_int = columns["sensor"][start:stop], columns["value"][start:stop], columns["is_int"][start:stop]
+    return [
+        Reading(id=i.decode(), sensor_id=sensor_ids[s], ts=t.decode(), value=int(v) if k else v)
+        for i, s, t, v, k in zip(ids.tolist(), sensor.tolist(), ts.tolist(), value.tolist(), is_int.tolist())
+    ]
+
+
+def _run_unit(unit: tuple) -> dict:
+    from core.report import zone_report
+    day, zone_id, slices, forecast = unit
+    w = _worker
+    parts = {kind: _materialize(w["columns"], w["sensor_ids"], a, b) for kind, (a, b) in slices.items()}
+    return zone_report(day, zone_id, parts, w["sensors"], w["profiles"], w["rules"], forecast)
+
+
+def resolve_workers(workers: Optional[int]) -> int:
+    """0 или None — по числу ядер."""
+    return workers or os.cpu_count() or 1
+
+
+def report_partitions(days, parts, sensors, profiles, rules, workers: Optional[int] = None,
+                      progress=None, forecasts=None) -> list[dict]:
+    """
+    Параллельный вариант core.report.report_days: те же отчёты дней, единицы (день, зона)
+    считаются в пуле и собираются в исходном порядке, поэтому результат совпадает
+    с последовательным режимом. progress(done, total) — по мере готовности единиц.
+    """
+    from core.report import day_result, zone_forecasts
+    sensors = as_catalog(sensors)
+    days = list(days)
+    if forecasts is None:
+        forecasts = zone_forecasts(days, parts)
+    with SharedReadings(days, parts) as shared:
+        units = [(day, zone_id, slices, forecasts[day, zone_id]) for day, zone_id, slices in shared.units]
+        n_workers = min(resolve_workers(workers), max(len(units), 1))
+        chunk = max(1, len(units) // (n_workers * 4))
+        reports = []
+        with ProcessPoolExecutor(
+                max_workers=n_workers, initializer=_init_worker,
+                initargs=(shared.shm.name, shared.layout, shared.sensor_ids,
+                          sensors, tuple(profiles), tuple(rules))) as pool:
+            for report in pool.map(_run_unit, units, chunksize=chunk):
+                reports.append(report)
+                if progress is not None:
+                    progress(len(reports), len(units))
+
+    by_day: dict = {day: [] for day in days}
+    for (day, zone_id, _, _), report in zip(units, reports):
+        by_day[day].append((zone_id, report))
+    return [day_result(day, by_day[day]) for day in days]
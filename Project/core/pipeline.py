@@ -1,60 +1,218 @@
 # core/pipeline.py
 
+from dataclasses import dataclass
+from numbers import Real
+from typing import Any, Mapping, NamedTuple, Optional
+
+import numpy as np
+
+from core.catalog import as_catalog
+from core.metrics import instrument
 from core.service import safe_sensor, validate_reading, issue_alert_if_needed
 from core.ftypes import Maybe, Either
 
-def process_reading(r, sensors, rules, snapshot, profile):
-    """Обрабатывает показание через контейнеры Maybe/Either без try/except."""
+# коды статусов пакетной проверки: STATUSES[code] — статус из process_reading
+OK, WARNING, ALERT, ERROR = range(4)
+STATUSES = ("ok", "warning", "alert", "error")
+
+# вид проверки параметра (как в core.service.validate_reading)
+CHECK_NONE, CHECK_RANGE, CHECK_MIN = range(3)
+RANGE_FIELDS = {
+    "temp": "temp_range",
+    "hum_air": "hum_air_range",
+    "hum_soil": "hum_soil_range",
+    "co2": "co2_range",
+}
+
+
+class _Probe(NamedTuple):
+    # то, что validate_reading читает у показания
+    sensor_id: Any
+    value: Any
 
 
+def _fields(r) -> tuple:
     if isinstance(r, dict):
-        sensor_id = r.get("sensor_id")
-        value = r.get("value")
-        ts = r.get("ts")
-    else:
-        sensor_id = getattr(r, "sensor_id", None)
-        value = getattr(r, "value", None)
-        ts = getattr(r, "ts", None)
+        return r.get("sensor_id"), r.get("value"), r.get("ts")
+    return getattr(r, "sensor_id", None), getattr(r, "value", None), getattr(r, "ts", None)
 
 
-    maybe_sensor = safe_sensor(sensors, sensor_id)
-    if not maybe_sensor.is_some():
-        return {
-            "status": "error",
-            "message": f"Сенсор '{sensor_id}' не найден",
-            "timestamp": ts
-        }
-
-    reading_obj = type("Reading", (), {"sensor_id": sensor_id, "value": value})
-    validation = validate_reading(reading_obj, sensors, profile)
-    if not validation.is_right:
-        return {
-            "status": "warning",
-            "param": maybe_sensor.get_or_else(None).kind if maybe_sensor.is_some() else None,
-            "value": value,
-            "message": "Значение вне допустимого диапазона",
-            "range": profile.temp_range if maybe_sensor.get_or_else(None) and maybe_sensor.get_or_else(None).kind == "temp" else None,
-            "timestamp": ts
-        }
-
-   
-    alert = issue_alert_if_needed(snapshot, profile)
-    if alert.is_some():
-        return {
-            "status": "alert",
-            "alert_type": "CRITICAL",
-            "message": "Порог превышен, сгенерирован алерт!",
-            "timestamp": ts
-        }
-
-    sensor_obj = maybe_sensor.get_or_else(None)
+def _error(sensor_id, ts) -> dict:
+    return {
+        "status": "error",
+        "message": f"Сенсор '{sensor_id}' не найден",
+        "timestamp": ts
+    }
+
+
+def _warning(sensor, value, ts, profile) -> dict:
+    return {
+        "status": "warning",
+        "param": sensor.kind,
+        "value": value,
+        "message": "Значение вне допустимого диапазона",
+        "range": profile.temp_range if sensor.kind == "temp" else None,
+        "timestamp": ts
+    }
+
+
+def _alert(ts) -> dict:
+    return {
+        "status": "alert",
+        "alert_type": "CRITICAL",
+        "message": "Порог превышен, сгенерирован алерт!",
+        "timestamp": ts
+    }
+
+
+def _ok(sensor, value, ts) -> dict:
     return {
         "status": "ok",
-        "param": getattr(sensor_obj, "kind", None),
+        "param": getattr(sensor, "kind", None),
         "value": value,
-        "unit": getattr(sensor_obj, "unit", ""),
-        "sensor_name": getattr(sensor_obj, "id", ""),
+        "unit": getattr(sensor, "unit", ""),
+        "sensor_name": getattr(sensor, "id", ""),
         "timestamp": ts
     }
 
 
+@instrument("process_reading")
+def process_reading(r, sensors, rules, snapshot, profile):
+    """Обрабатывает показание через контейнеры Maybe/Either без try/except."""
+    sensor_id, value, ts = _fields(r)
+
+    maybe_sensor = safe_sensor(sensors, sensor_id)
+    if not maybe_sensor.is_some():
+        return _error(sensor_id, ts)
+    sensor = maybe_sensor.get_or_else(None)
+
+    validation = validate_reading(_Probe(sensor_id, value), sensors, profile)
+    if not validation.is_right:
+        return _warning(sensor, value, ts, profile)
+
+    alert = issue_alert_if_needed(snapshot, profile)
+    if alert.is_some():
+        return _alert(ts)
+
+    return _ok(sensor, value, ts)
+
+
+@dataclass(frozen=True, eq=False)
+class ProfileTable:
+    """
+    Пределы профиля, разложенные по массивам: строка на параметр (kinds),
+    последняя строка — «без проверки» для остальных видов сенсоров.
+    """
+    profile: Any
+    kinds: tuple
+    code: Mapping[str, int]
+    lo: np.ndarray
+    hi: np.ndarray
+    check: np.ndarray
+
+    @classmethod
+    def from_profile(cls, profile) -> "ProfileTable":
+        kinds = (*RANGE_FIELDS, "light")
+        lo = [getattr(profile, f)[0] for f in RANGE_FIELDS.values()] + [profile.light_min, -np.inf]
+        hi = [getattr(profile, f)[1] for f in RANGE_FIELDS.values()] + [np.inf, np.inf]
+        check = [CHECK_RANGE] * len(RANGE_FIELDS) + [CHECK_MIN, CHECK_NONE]
+        return cls(profile, kinds, {k: i for i, k in enumerate(kinds)},
+                   np.array(lo, dtype=np.float64), np.array(hi, dtype=np.float64),
+                   np.array(check, dtype=np.int8))
+
+    @property
+    def unchecked(self) -> int:
+        return len(self.kinds)
+
+
+@dataclass(frozen=True, eq=False)
+class BatchResult:
+    """
+    Итог process_readings: status — коды OK/WARNING/ALERT/ERROR на каждое показание,
+    kind — строка ProfileTable (-1 для неизвестного сенсора), alert — алерт снимка,
+    если он был. result(i) собирает тот же словарь, что вернул бы process_reading.
+    """
+    status: np.ndarray
+    kind: np.ndarray
+    readings: tuple
+    sensors: Any
+    table: ProfileTable
+    alert: Optional[dict] = None
+
+    def __len__(self) -> int:
+        return len(self.readings)
+
+    def counts(self) -> dict:
+        n = np.bincount(self.status, minlength=len(STATUSES))
+        return {name: int(c) for name, c in zip(STATUSES, n)}
+
+    def indices(self, status: int) -> np.ndarray:
+        return np.flatnonzero(self.status == status)
+
+    def params(self, status: int = WARNING) -> list:
+        """Параметры (виды сенсоров) показаний с данным статусом — для WARNING это нарушенные пределы."""
+        sensor_by_id = self.sensors.sensor_by_id
+        return [sensor_by_id[_fields(self.readings[i])[0]].kind for i in self.indices(status)]
+
+    def result(self, i: int) -> dict:
+        sensor_id, value, ts = _fields(self.readings[i])
+        status = self.status[i]
+        if status == ERROR:
+            return _error(sensor_id, ts)
+        sensor = self.sensors.sensor_by_id[sensor_id]
+        if status == WARNING:
+            return _warning(sensor, value, ts, self.table.profile)
+        if status == ALERT:
+            return _alert(ts)
+        return _ok(sensor, value, ts)
+
+    def results(self, status: Optional[int] = None) -> list[dict]:
+        """Словари результатов (все или только с данным статусом) в порядке пакета."""
+        rows = range(len(self)) if status is None else self.indices(status).tolist()
+        return [self.result(i) for i in rows]
+
+
+@instrument("process_readings", items=lambda result, args: len(result))
+def process_readings(batch, catalog, profile_table, snapshot: Optional[dict] = None) -> BatchResult:
+    """
+    Пакетный process_reading: тот же статус для каждого показания пакета.
+    Сенсор ищется один раз по индексу справочника, пределы сравниваются
+    сразу для всего пакета, алерт по snapshot проверяется один раз.
+    profile_table — ProfileTable или сам профиль.
+    """
+    catalog = as_catalog(catalog)
+    table = profile_table if isinstance(profile_table, ProfileTable) else ProfileTable.from_profile(profile_table)
+    readings = batch if isinstance(batch, (list, tuple)) else tuple(batch)
+    n = len(readings)
+
+    kind = np.full(n, -1, dtype=np.int8)
+    values = np.full(n, np.nan)
+    missing = np.zeros(n, dtype=bool)
+    kind_by_sensor, code, unchecked = catalog.kind_by_sensor, table.code, table.unchecked
+    for i, r in enumerate(readings):
+        sensor_id, value, _ = _fields(r)
+        k = kind_by_sensor.get(sensor_id)
+        if k is None and sensor_id not in kind_by_sensor:
+            continue
+        kind[i] = c = code.get(k, unchecked)
+        if value is None:
+            missing[i] = True
+        elif isinstance(value, Real):
+            values[i] = value
+        elif c != unchecked:
+            # сравнение с пределом в одиночном пути падает так же
+            raise TypeError(f"нечисловое значение {value!r} у сенсора {sensor_id!r}")
+
+    known = kind >= 0
+    rows = np.where(known, kind, unchecked)
+    lo, hi, check = table.lo[rows], table.hi[rows], table.check[rows]
+    with np.errstate(invalid="ignore"):
+        # NaN вне диапазона, но не «ниже минимума» — как сравнения в validate_reading
+        bad = (missing
+               | ((check == CHECK_RANGE) & ~((lo <= values) & (values <= hi)))
+               | ((check == CHECK_MIN) & (values < lo)))
+
+    alert = issue_alert_if_needed(snapshot or {}, table.profile)
+    status = np.where(bad, WARNING, ALERT if alert.is_some() else OK).astype(np.int8)
+    status[~known] = ERROR
+    return BatchResult(status, kind, readings, catalog, table, alert.get_or_else(None))
@@ -1,69 +1,45 @@
 from core.domain import Zone, Sensor
-from datetime import datetime, timedelta
-
-def collect_descendant_zones(zones: tuple[Zone, ...], root_id: str) -> tuple[str, ...]:
-    children = [z.id for z in zones if z.parent_id == root_id]
-    result = [root_id] 
-    for child_id in children:
-        result.extend(collect_descendant_zones(zones, child_id))
-    return tuple(result)
-
-
-def find_sensors_in_zone(zones: tuple[Zone, ...], sensors: tuple[Sensor, ...], root_id: str, index: int = 0, result: list = None) -> tuple[Sensor, ...]:
-    if result is None:
-        result = []
-    
-    if index >= len(sensors):
-        return tuple(result)
-    
-    zone_ids = collect_descendant_zones(zones, root_id)
-    sensor = sensors[index]
-    
-    if any(zid in sensor.device_id for zid in zone_ids):
-        result.append(sensor)
-    
-    return find_sensors_in_zone(zones, sensors, root_id, index + 1, result)
+from core.zonetree import ZoneTree
+from functools import lru_cache
 
 
-from datetime import datetime, timedelta
+@lru_cache(maxsize=8)
+def _zone_tree(zones: tuple[Zone, ...]) -> ZoneTree:
+    return ZoneTree(zones)
 
-def expand_schedule(schedule_for_day: list[list[str]], day: str, interval_index: int = 0, all_slots: list = None) -> tuple[str, ...]:
-    """Рекурсивно разворачивает список интервалов в минутные слоты (с устранением пересечений)."""
-    if all_slots is None:
-        all_slots = []
-
-    # Базовый случай
-    if interval_index >= len(schedule_for_day):
-        # удаляем дубликаты и сортируем перед возвратом
-        unique_sorted = sorted(set(all_slots))
-        return tuple(unique_sorted)
 
-    interval = schedule_for_day[interval_index]
+def zone_tree(zones) -> ZoneTree:
+    """ZoneTree для кортежа зон (строится один раз на набор зон)."""
+    if isinstance(zones, ZoneTree):
+        return zones
+    return _zone_tree(tuple(zones))
 
-    # Проверяем корректность интервала
-    if len(interval) == 2:
-        slots = _expand_interval_recursive(interval[0], interval[1], day, [])
-        all_slots.extend(slots)
 
-    # Рекурсивный вызов для следующего интервала
-    return expand_schedule(schedule_for_day, day, interval_index + 1, all_slots)
+def collect_descendant_zones(zones: tuple[Zone, ...], root_id: str) -> tuple[str, ...]:
+    """Зона и все её потомки (обход в глубину) — срез Эйлерова обхода ZoneTree."""
+    return zone_tree(zones).descendants(root_id)
 
 
-def _expand_interval_recursive(start_time: str, end_time: str, day: str, slots: list, current_time: datetime = None) -> list[str]:
-    """Рекурсивно разворачивает один интервал времени в минутные слоты."""
-    if current_time is None:
-        current_time = datetime.strptime(f"{day} {start_time}", "%Y-%m-%d %H:%M")
+def find_sensors_in_zone(zones: tuple[Zone, ...], sensors: tuple[Sensor, ...], root_id: str, index: int = 0, result: list = None) -> tuple[Sensor, ...]:
+    """Сенсоры, в device_id которых встречается id зоны из поддерева root_id (итеративно)."""
+    found = list(result) if result is not None else []
+    zone_ids = collect_descendant_zones(zones, root_id)
+    for sensor in sensors[index:]:
+        if any(zid in sensor.device_id for zid in zone_ids):
+            found.append(sensor)
+    return tuple(found)
 
-    end_datetime = datetime.strptime(f"{day} {end_time}", "%Y-%m-%d %H:%M")
 
-    # Базовый случай: достигли конца интервала
-    if current_time > end_datetime:
-        return slots
+from core.schedule import day_minutes
 
-    # Добавляем текущий временной слот
-    slots.append(current_time.strftime("%H:%M"))
+_SLOTS = tuple(f"{m // 60:02d}:{m % 60:02d}" for m in range(1440))
 
-    # Рекурсивно переходим к следующей минуте
-    next_time = current_time + timedelta(minutes=1)
-    return _expand_interval_recursive(start_time, end_time, day, slots, next_time)
 
+def expand_schedule(schedule_for_day: list[list[str]], day: str, interval_index: int = 0, all_slots: list = None) -> tuple[str, ...]:
+    """Разворачивает список интервалов в минутные слоты (с устранением пересечений)."""
+    # интервалы сливаются на уровне минут, строки берутся из готовой таблицы
+    minutes = day_minutes(schedule_for_day[interval_index:])
+    slots = [slot for a, b in minutes for slot in _SLOTS[a:b]]
+    if all_slots:
+        return tuple(sorted(set(all_slots).union(slots)))
+    return tuple(slots)
@@ -0,0 +1,101 @@
+"""
+Бюджет отрисовки для дашборда: прореживание рядов до числа точек, которое
+график реально может показать (LTTB и min/max по корзинам), и постраничный
+просмотр таблиц. Только numpy, без зависимостей от Streamlit.
+"""
+from typing import Optional
+
+import numpy as np
+
+CHART_POINTS = 800   # ширина графика в пикселях ≈ сколько точек имеет смысл рисовать
+PAGE_SIZE = 50
+
+
+def _xy(y, x=None) -> tuple[np.ndarray, np.ndarray]:
+    y = np.asarray(y, dtype=np.float64)
+    x = np.arange(len(y), dtype=np.float64) if x is None else np.asarray(x, dtype=np.float64)
+    if len(x) != len(y):
+        raise ValueError("длины x и y не совпадают")
+    keep = np.isfinite(y) & np.isfinite(x)
+    return (x, y) if keep.all() else (x[keep], y[keep])
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: первая и последняя точки плюс по одной точке
+    на корзину — та, что образует наибольший треугольник с выбранной точкой
+    предыдущей корзины и средним следующей. Форма и пики ряда сохраняются.
+    """
+    n = len(y)
+    if threshold >= n or n <= 2:
+        return np.arange(n)
+    if threshold < 3:
+        return np.array([0, n - 1])
+    every = (n - 2) / (threshold - 2)
+    bounds = np.floor(np.arange(threshold - 1) * every).astype(np.int64) + 1
+    bounds[-1] = n - 1
+    idx = np.empty(threshold, dtype=np.int64)
+    idx[0], idx[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = bounds[i], bounds[i + 1]
+        nlo, nhi = (bounds[i + 1], bounds[i + 2]) if i + 2 < len(bounds) else (n - 1, n)
+        avg_x, avg_y = x[nlo:nhi].mean(), y[nlo:nhi].mean()
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(np.argmax(area))
+        idx[i + 1] = a
+    return idx
+
+
+def minmax_indices(y: np.ndarray, buckets: int) -> np.ndarray:
+    """Минимум и максимум каждой из buckets равных по числу точек корзин (плюс края) — без цикла."""
+    n = len(y)
+    if 2 * buckets + 2 >= n:
+        return np.arange(n)
+    bucket = np.arange(n) * buckets // n
+    order = np.lexsort((y, bucket))
+    edges = np.searchsorted(bucket[order], np.arange(buckets + 1))
+    picked = np.concatenate(([0, n - 1], order[edges[:-1]], order[edges[1:] - 1]))
+    return np.unique(picked)
+
+
+def downsample(y, x=None, points: int = CHART_POINTS, method: str = "lttb") -> tuple[np.ndarray, np.ndarray]:
+    """
+    Ряд (x, y), прореженный до points точек. NaN отбрасываются. method:
+    "lttb" — визуально точная форма линии; "minmax" — гарантированно сохраняет
+    экстремумы (для шумных рядов и полос), даёт до points точек.
+    """
+    x, y = _xy(y, x)
+    if method == "lttb":
+        idx = lttb_indices(x, y, points)
+    elif method == "minmax":
+        idx = minmax_indices(y, max(1, (points - 2) // 2))
+    else:
+        raise ValueError(f"неизвестный метод прореживания: {method}")
+    return x[idx], y[idx]
+
+
+def page_count(total: int, page_size: int = PAGE_SIZE) -> int:
+    return max(1, -(-total // page_size))
+
+
+def page_bounds(total: int, page: int, page_size: int = PAGE_SIZE, newest_first: bool = True) -> tuple[int, int]:
+    """
+    Полуинтервал [start, stop) строк страницы page (с нуля, обрезается до последней).
+    newest_first — страница 0 содержит самые новые строки (хвост), как в журналах.
+    """
+    page = min(max(0, page), page_count(total, page_size) - 1)
+    if newest_first:
+        stop = total - page * page_size
+        return max(0, stop - page_size), stop
+    start = page * page_size
+    return start, min(total, start + page_size)
+
+
+def series_points(series, points: Optional[int] = CHART_POINTS, method: str = "lttb") -> tuple:
+    """Кортеж ((x...), (y...)) — прореженный ряд в хэшируемом виде для кэша картинок графиков."""
+    if points is None:
+        x, y = _xy(series)
+    else:
+        x, y = downsample(series, points=points, method=method)
+    return tuple(x.tolist()), tuple(y.tolist())
@@ -1,107 +1,139 @@
-from functools import lru_cache
-import numpy as np
-import pandas as pd
 from core.transforms import next_command
-from datetime import datetime, timedelta
+from core.forecast import forecast_series
+from core.domain import Reading
+# core/report.py
+
+from datetime import datetime
+from statistics import mean
+from core.transforms import reading_stats
+from core.pipeline import ALERT, ProfileTable, process_readings
+from core.catalog import as_catalog
+from core.timeindex import TimeIndex
+from core.metrics import instrument
 
-@lru_cache
-def soil_humidity_forecast(key: str, readings_idx: tuple, window: int = 24) -> tuple[float, ...]:
+
+KINDS = ("temp", "hum_air", "hum_soil", "light", "co2")
+
+
+@instrument("zone_report")
+def zone_report(day, zone_id, parts, sensors, profiles, rules, forecast=None) -> dict:
     """
-    Прогноз влажности почвы с экспоненциальным сглаживанием.
+    Отчёт одной зоны за день из её партиций {kind: [показания]} —
+    независимая единица работы (последовательно или в пуле процессов).
+    forecast — готовый прогноз из zone_forecasts; без него считается здесь.
     """
+    profile = profiles[0]
+    stats = {
+        kind: reading_stats(parts.get(kind, ()), sensors, kind)
+        for kind in KINDS
+    }
+
+    batch = [r for kind_readings in parts.values() for r in kind_readings]
+    alerts = process_readings(batch, sensors, ProfileTable.from_profile(profile)).results(ALERT)
 
-    if not readings_idx:
-        return ()
+    if forecast is None:
+        # тот же расчёт, что в zone_forecasts, для одной единицы: последние 24 показания
+        forecast = forecast_series([parts.get("hum_soil", ())], 24)[0] or []
 
-    df = pd.DataFrame([{"ts": r.ts, "value": r.value} for r in readings_idx])
-    df["ts"] = pd.to_datetime(df["ts"])
-    df = df.sort_values("ts")
+    ctrl = next_command(profile, rules, {
+        k: stats[k].get("avg") for k in stats if stats[k]
+    })
+
+    return {
+        "profile": profile.name,
+        "stats": stats,
+        "alerts": alerts,
+        "controller": ctrl,
+        "forecast": forecast,
+    }
 
-    y = df["value"].values
 
-    alpha = 0.8
-    smoothed = [y[0]]
-    for i in range(1, len(y)):
-        smoothed.append(alpha * y[i] + (1 - alpha) * smoothed[-1])
+def partition_readings(readings, sensors, days=None, day_of=None) -> dict:
+    """
+    Один проход по показаниям: {day: {zone_id: {kind: [показания]}}}.
+    Дни, зоны и типы — в порядке первого появления, показания — в исходном.
+    days — оставить только эти дни; day_of — свой ключ дня (по умолчанию дата из ts).
+    """
+    sensors = as_catalog(sensors)
+    wanted = set(days) if days is not None else None
+    parts = {}
+    for r in readings:
+        day = day_of(r) if day_of is not None else str(r.ts)[:10]
+        if wanted is not None and day not in wanted:
+            continue
+        sensor = sensors.sensor_by_id[r.sensor_id]
+        parts.setdefault(day, {}).setdefault(sensor.zone_id, {}).setdefault(sensor.kind, []).append(r)
+    return parts
 
-    x = np.arange(len(smoothed))
-    coeffs = np.polyfit(x, smoothed, 1)
-    trend = np.poly1d(coeffs)
-    future_x = np.arange(len(smoothed), len(smoothed) + window)
-    forecast = trend(future_x)
 
-    hours = np.arange(window)
-    daily_cycle = 2 * np.sin(2 * np.pi * hours / 24)
-    forecast = forecast + daily_cycle
+def zone_forecasts(days, parts, window: int = 24) -> dict:
+    """Прогнозы влажности почвы всех единиц (день, зона) одним вызовом forecast_batch."""
+    keys = [(day, zone_id) for day in days for zone_id in parts.get(day, {})]
+    series = [parts[day][zone_id].get("hum_soil", ()) for day, zone_id in keys]
+    return {key: forecast or [] for key, forecast in zip(keys, forecast_series(series, window))}
 
-    forecast = np.clip(forecast, 0, 100)
-    return tuple(np.round(forecast, 2))
-@lru_cache(maxsize=128)
-def forecast_cache(key, readings_tuple, hours):
-    """Кэш для soil_humidity_forecast."""
-    return soil_humidity_forecast(key, readings_tuple, hours)
-# core/report.py
 
-import asyncio
-from datetime import datetime
-from statistics import mean
-from core.transforms import reading_stats
-from core.pipeline import process_reading
+def report_days(days, parts, sensors, profiles, rules, progress=None, forecasts=None) -> list[dict]:
+    """
+    Отчёты дней по готовым партициям. progress(done, total) вызывается
+    после каждой единицы (день, зона).
+    """
+    if forecasts is None:
+        forecasts = zone_forecasts(days, parts)
+    total = sum(len(parts.get(day, {})) for day in days)
+    done = 0
+    per_day = []
+    for day in days:
+        zones_results = []
+        for zone_id, zone_parts in parts.get(day, {}).items():
+            zones_results.append((zone_id, zone_report(day, zone_id, zone_parts, sensors, profiles, rules,
+                                                       forecasts[day, zone_id])))
+            done += 1
+            if progress is not None:
+                progress(done, total)
+        per_day.append(day_result(day, zones_results))
+    return per_day
+
+
+def run_report(days, parts, sensors, profiles, rules, workers=None, progress=None) -> list[dict]:
+    """
+    Последовательно (workers None или 1) или в пуле процессов (core.parallel).
+    Прогнозы всех зон считаются заранее одним пакетом.
+    """
+    forecasts = zone_forecasts(days, parts)
+    if workers is not None and workers != 1:
+        from core.parallel import report_partitions
+        return report_partitions(days, parts, sensors, profiles, rules, workers, progress, forecasts)
+    return report_days(days, parts, sensors, profiles, rules, progress, forecasts)
+
+
+def _readings_count(result, arguments: dict) -> int:
+    readings = arguments["readings"]
+    return len(readings) if hasattr(readings, "__len__") else 1
 
 
-async def simulate_day(day, readings, zones, sensors, profiles, rules):
+@instrument("simulate_day", items=_readings_count)
+async def simulate_day(day, readings, zones, sensors, profiles, rules, workers=None, progress=None):
     """
     FULL end-to-end pipeline for 1 day:
-    - reading grouping by zone
-    - async stats per zone
-    - async alerts
+    - reading grouping by zone and kind
+    - stats per zone
+    - alerts
     - lazy controller
     - soil humidity forecast
     - final daily report
-    """
 
-    result = {"date": day, "zones": {}, "summary": {}}
-    zone_map = {}
-    for r in readings:
-        sensor = next(s for s in sensors if s.id == r.sensor_id)
-        zone_map.setdefault(sensor.zone_id, []).append(r)
-
-    async def process_zone(zone_id, zone_readings):
-        profile = profiles[0]
-        stats = {
-            kind: reading_stats(zone_readings, sensors, kind)
-            for kind in ["temp", "hum_air", "hum_soil", "light", "co2"]
-        }
+    Все переданные показания относятся к дню day.
+    workers — число процессов (0 — по числу ядер); None или 1 — в текущем процессе.
+    """
+    sensors = as_catalog(sensors)
+    parts = partition_readings(readings, sensors, day_of=lambda r: day)
+    return run_report([day], parts, sensors, profiles, rules, workers, progress)[0]
 
-        alerts = []
-        for r in zone_readings:
-            res = process_reading(r, sensors, rules,
-                                  snapshot={}, profile=profile)
-            if res.get("status") == "alert":
-                alerts.append(res)
-
-        soil_r = [r for r in zone_readings if r.sensor_id.startswith("s3")]
-        soil_r_last = soil_r[-24:] if len(soil_r) >= 24 else soil_r
-
-        forecast = []
-        if soil_r_last:
-            key = f"{zone_id}|{day}|soil|{profile.id}"
-            forecast = soil_humidity_forecast(key, tuple(soil_r_last), 24)
-
-        ctrl = next_command(profile, rules, {
-            k: stats[k].get("avg") for k in stats if stats[k]
-        })
-
-        return zone_id, {
-            "profile": profile.name,
-            "stats": stats,
-            "alerts": alerts,
-            "controller": ctrl,
-            "forecast": forecast,
-        }
-    tasks = [process_zone(z, rs) for z, rs in zone_map.items()]
-    zones_results = await asyncio.gather(*tasks)
 
+def day_result(day, zones_results) -> dict:
+    """Собирает отчёт дня из пар (zone_id, отчёт зоны) в заданном порядке."""
+    result = {"date": day, "zones": {}, "summary": {}}
     alerts_total = 0
     for zone_id, data in zones_results:
         alerts_total += len(data["alerts"])
@@ -115,11 +147,16 @@ async def simulate_day(day, readings, zones, sensors, profiles, rules):
 
     return result
 
-async def simulate_week(days, readings, zones, sensors, profiles, rules):
-    per_day = []
-    for day in days:
-        day_report = await simulate_day(day, readings, zones, sensors, profiles, rules)
-        per_day.append(day_report)
+@instrument("simulate_week", items=_readings_count)
+async def simulate_week(days, readings, zones, sensors, profiles, rules, workers=None, progress=None):
+    """
+    Отчёт за несколько дней: показания один раз раскладываются по (день, зона, тип),
+    каждый день строится только из своих партиций. workers > 1 (или 0) — пул процессов.
+    """
+    sensors = as_catalog(sensors)
+    days = list(days)
+    parts = partition_readings(readings, sensors, days)
+    per_day = run_report(days, parts, sensors, profiles, rules, workers, progress)
 
     total_alerts = sum(day["summary"]["total_alerts"] for day in per_day)
     zones_ok = sum(day["summary"]["zones_ok"] for day in per_day)
@@ -136,21 +173,18 @@ async def simulate_week(days, readings, zones, sensors, profiles, rules):
 
 def make_daily_readings(date_str: str, readings: list):
     """Формирует список показаний за конкретный день."""
-    
+    if isinstance(readings, TimeIndex):
+        return list(readings.day(date_str))
+
     daily = []
     for r in readings:
-        ts = r.ts if hasattr(r, "ts") else r.get("ts")
-        dt = datetime.strptime(ts, "%Y-%m-%d %H:%M")
+        if isinstance(r, dict):
+            r = Reading(id=r.get("id"), sensor_id=r.get("sensor_id"), ts=r.get("ts"), value=r.get("value"))
+        dt = datetime.strptime(r.ts, "%Y-%m-%d %H:%M")
 
         # фильтрация по дате
         if dt.strftime("%Y-%m-%d") == date_str:
-            reading_obj = type("Reading", (), {
-                "id": r.id if hasattr(r, "id") else r.get("id"),
-                "sensor_id": r.sensor_id if hasattr(r, "sensor_id") else r.get("sensor_id"),
-                "value": r.value if hasattr(r, "value") else r.get("value"),
-                "ts": ts
-            })
-            daily.append(reading_obj)
+            daily.append(r)
 
     # сортируем по времени
     daily_sorted = sorted(daily, key=lambda x: x.ts)
@@ -0,0 +1,102 @@
+"""
+Кольцевые буферы фиксированной ёмкости для витрин шины событий:
+добавление O(1), последние k записей O(k), память не растёт со временем.
+"""
+from typing import Hashable, Iterator, Mapping, Optional
+
+import numpy as np
+
+
+class RingBuffer:
+    """
+    Колоночный кольцевой буфер: на каждое поле — заранее выделенный массив
+    (числовой dtype для чисел, object для строк). Самые старые записи
+    перезаписываются новыми.
+    """
+
+    __slots__ = ("capacity", "columns", "total")
+
+    def __init__(self, capacity: int, fields: Mapping[str, object]):
+        if capacity < 1:
+            raise ValueError("ёмкость буфера должна быть положительной")
+        self.capacity = capacity
+        self.columns = {name: np.empty(capacity, dtype=np.dtype(dtype)) for name, dtype in fields.items()}
+        self.total = 0  # сколько записей добавлено за всё время
+
+    def append(self, row: Mapping) -> None:
+        i = self.total % self.capacity
+        for name, col in self.columns.items():
+            value = row.get(name)
+            col[i] = np.nan if value is None and col.dtype.kind == "f" else value
+        self.total += 1
+
+    def __len__(self) -> int:
+        return min(self.total, self.capacity)
+
+    def _positions(self, k: Optional[int]) -> np.ndarray:
+        n = len(self) if k is None else max(0, min(k, len(self)))
+        return np.arange(self.total - n, self.total) % self.capacity
+
+    def latest_columns(self, k: Optional[int] = None) -> dict[str, np.ndarray]:
+        """Последние k записей (по умолчанию все) по колонкам, от старых к новым — O(k)."""
+        pos = self._positions(k)
+        return {name: col[pos] for name, col in self.columns.items()}
+
+    def window_columns(self, start: int, stop: int) -> dict[str, np.ndarray]:
+        """Строки [start, stop) в порядке от старых к новым (0 — самая старая из хранимых) — O(stop - start)."""
+        n = len(self)
+        start, stop = max(0, min(start, n)), max(0, min(stop, n))
+        first = self.total - n
+        pos = np.arange(first + start, first + max(start, stop)) % self.capacity
+        return {name: col[pos] for name, col in self.columns.items()}
+
+    def latest(self, k: Optional[int] = None) -> list[dict]:
+        """Последние k записей как словари, от старых к новым — O(k)."""
+        cols = self.latest_columns(k)
+        names = list(cols)
+        return [dict(zip(names, values)) for values in zip(*(cols[n].tolist() for n in names))]
+
+    def __iter__(self) -> Iterator[dict]:
+        return iter(self.latest())
+
+    def __getitem__(self, i: int) -> dict:
+        n = len(self)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError(i)
+        p = (self.total - n + i) % self.capacity
+        return {name: col[p].item() if col.dtype.kind != "O" else col[p] for name, col in self.columns.items()}
+
+
+class KeyedRings:
+    """Отдельный RingBuffer на каждый ключ (сенсор, зона); ёмкость можно задать для ключа."""
+
+    def __init__(self, capacity: int, fields: Mapping[str, object],
+                 capacities: Optional[Mapping[Hashable, int]] = None):
+        self.capacity = capacity
+        self.fields = dict(fields)
+        self.capacities = dict(capacities or {})
+        self.buffers: dict[Hashable, RingBuffer] = {}
+
+    def append(self, key: Hashable, row: Mapping) -> None:
+        buf = self.buffers.get(key)
+        if buf is None:
+            buf = self.buffers[key] = RingBuffer(self.capacities.get(key, self.capacity), self.fields)
+        buf.append(row)
+
+    def get(self, key: Hashable) -> Optional[RingBuffer]:
+        return self.buffers.get(key)
+
+    def latest(self, key: Hashable, k: Optional[int] = None) -> list[dict]:
+        buf = self.buffers.get(key)
+        return buf.latest(k) if buf is not None else []
+
+    def keys(self):
+        return self.buffers.keys()
+
+    def __contains__(self, key) -> bool:
+        return key in self.buffers
+
+    def __len__(self) -> int:
+        return len(self.buffers)
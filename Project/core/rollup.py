@@ -0,0 +1,265 @@
+import threading
+from array import array
+from bisect import bisect_left
+from datetime import date
+from typing import Callable, Iterable, Optional, Union
+
+import numpy as np
+
+from core.domain import Reading
+from core.store import ReadingStore, to_epoch, py_value
+from core.timeindex import TimeIndex
+
+HOUR = 3600
+DAY = 86400
+
+
+def _merge(acc: list, bucket) -> None:
+    mn, mx, total, count = bucket
+    if acc[3] == 0:
+        acc[0], acc[1] = mn, mx
+    else:
+        acc[0] = min(acc[0], mn)
+        acc[1] = max(acc[1], mx)
+    acc[2] += total
+    acc[3] += count
+
+
+def _add(buckets: dict, key: int, value: float) -> None:
+    b = buckets.get(key)
+    if b is None:
+        buckets[key] = [value, value, value, 1]
+    else:
+        if value < b[0]:
+            b[0] = value
+        if value > b[1]:
+            b[1] = value
+        b[2] += value
+        b[3] += 1
+
+
+class Rollup:
+    """
+    Предагрегаты показаний: почасовые и посуточные корзины (min, max, sum, count)
+    по каждому сенсору, обновляемые инкрементально. Запрос по интервалу собирается
+    из суточных корзин, на краях — из часовых, и только неполные часы на самых
+    краях дочитываются из сырых показаний: загруженная история — через индекс
+    времени (TimeIndex) без копирования, а показания, добавленные после
+    построения (add, поток READING), — из небольшого хвоста живых показаний.
+    Наполнение и запросы идут под собственным замком: предагрегаты можно
+    делить между потоками (шина пишет, страницы читают).
+    """
+
+    def __init__(self, sensors=(), index: Optional[TimeIndex] = None):
+        self.kind_by_sensor = {s.id: s.kind for s in sensors}
+        self.hourly: dict[str, dict[int, list]] = {}
+        self.daily: dict[str, dict[int, list]] = {}
+        self.index = index
+        self._live_ts: dict[str, array] = {}
+        self._live_val: dict[str, array] = {}
+        self._follows: dict = {}  # шина → подписанный обработчик
+        self._lock = threading.RLock()
+        self._f32 = False  # значения пришли из ReadingStore с точностью float32
+
+    # --- наполнение ---
+    def _bucket(self, sensor_id: str, sec: int, value: float) -> None:
+        _add(self.hourly.setdefault(sensor_id, {}), sec - sec % HOUR, value)
+        _add(self.daily.setdefault(sensor_id, {}), sec - sec % DAY, value)
+
+    def add(self, sensor_id: str, ts, value: float) -> None:
+        """
+        Добавляет новое показание (которого нет в индексе). Корзины обновляются
+        за O(1); в хвост живых показаний сенсора значение дописывается за O(1),
+        опоздавшее — вставляется со сдвигом, O(k) по числу более поздних в хвосте.
+        """
+        sec = to_epoch(ts)
+        value = float(value)
+        with self._lock:
+            self._bucket(sensor_id, sec, value)
+            ts_col = self._live_ts.setdefault(sensor_id, array("q"))
+            val_col = self._live_val.setdefault(sensor_id, array("d"))
+            if not ts_col or ts_col[-1] <= sec:
+                ts_col.append(sec)
+                val_col.append(value)
+            else:
+                i = bisect_left(ts_col, sec + 1)
+                ts_col.insert(i, sec)
+                val_col.insert(i, value)
+
+    def extend(self, readings: Iterable[Reading]) -> "Rollup":
+        for r in readings:
+            self.add(r.sensor_id, r.ts, r.value)
+        return self
+
+    def handle_reading(self, event, store):
+        """Обработчик READING для EventBus: показание попадает в предагрегаты, витрины не меняются."""
+        payload = event.payload
+        self.add(payload["sensor"], payload.get("ts") or event.ts, payload["value"])
+        return store
+
+    def follow(self, bus) -> Callable[[], None]:
+        """
+        Подписывает предагрегаты на поток READING шины (повторно — та же подписка).
+        Возвращает функцию отписки: её вызывают, когда предагрегаты больше не нужны.
+        """
+        with self._lock:
+            if bus not in self._follows:
+                handler = self._follows[bus] = self.handle_reading
+                bus.subscribe("READING", handler)
+
+        def cancel() -> None:
+            with self._lock:
+                handler = self._follows.pop(bus, None)
+            if handler is not None:
+                bus.unsubscribe("READING", handler)
+        return cancel
+
+    @classmethod
+    def from_readings(cls, readings, sensors=(), index: Optional[TimeIndex] = None) -> "Rollup":
+        """
+        Строит предагрегаты векторно (для ReadingStore) или по одному показанию.
+        Края интервалов читаются через index; если он не передан, строится здесь.
+        """
+        if isinstance(readings, ReadingStore):
+            return cls.from_store(readings, sensors, index)
+        index = index if index is not None else TimeIndex(readings)
+        rollup = cls(sensors, index)
+        for r in index.readings:
+            rollup._bucket(r.sensor_id, to_epoch(r.ts), float(r.value))
+        return rollup
+
+    @classmethod
+    def from_store(cls, store: ReadingStore, sensors=(), index: Optional[TimeIndex] = None) -> "Rollup":
+        rollup = cls(sensors, index if index is not None else TimeIndex(store))
+        rollup._f32 = True
+        if store.sensor_kinds is not None:
+            for sid, kind in zip(store.sensor_ids, store.sensor_kinds):
+                rollup.kind_by_sensor.setdefault(sid, kind)
+        if len(store) == 0:
+            return rollup
+        order = np.lexsort((store.ts, store.sensor_idx))
+        idx = store.sensor_idx[order]
+        ts = store.ts[order]
+        val = store.value[order].astype(np.float64)
+
+        for width, target in ((HOUR, rollup.hourly), (DAY, rollup.daily)):
+            key = ts - ts % width
+            starts = np.flatnonzero(np.r_[True, (idx[1:] != idx[:-1]) | (key[1:] != key[:-1])])
+            mins = np.minimum.reduceat(val, starts)
+            maxs = np.maximum.reduceat(val, starts)
+            sums = np.add.reduceat(val, starts)
+            counts = np.diff(np.r_[starts, len(val)])
+            for i, s in enumerate(starts.tolist()):
+                sid = store.sensor_ids[idx[s]]
+                target.setdefault(sid, {})[int(key[s])] = [
+                    float(mins[i]), float(maxs[i]), float(sums[i]), int(counts[i])]
+        return rollup
+
+    # --- запросы ---
+    def _span(self, sensor_ids) -> tuple[int, int]:
+        starts, ends = [], []
+        for sid in sensor_ids:
+            span = self.index.sensor_span(sid) if self.index is not None else None
+            if span is not None:
+                starts.append(span[0])
+                ends.append(span[1])
+            live = self._live_ts.get(sid)
+            if live:
+                starts.append(live[0])
+                ends.append(live[-1])
+        if not starts:
+            return 0, 0
+        return min(starts), max(ends) + 1
+
+    def _raw(self, acc: list, sid: str, lo: int, hi: int) -> None:
+        if lo >= hi:
+            return
+        if self.index is not None:
+            vals = self.index.sensor_values(sid, lo, hi)
+            if len(vals):
+                _merge(acc, (float(vals.min()), float(vals.max()), float(vals.sum()), len(vals)))
+        ts_col = self._live_ts.get(sid)
+        if ts_col:
+            a, b = bisect_left(ts_col, lo), bisect_left(ts_col, hi)
+            if a < b:
+                vals = self._live_val[sid][a:b]
+                _merge(acc, (min(vals), max(vals), sum(vals), b - a))
+
+    @staticmethod
+    def _buckets(acc: list, buckets: dict, lo: int, hi: int, width: int) -> None:
+        if (hi - lo) // width > len(buckets):
+            # интервал шире истории — дешевле пройти по существующим корзинам
+            for key, bucket in buckets.items():
+                if lo <= key < hi:
+                    _merge(acc, bucket)
+            return
+        for key in range(lo, hi, width):
+            bucket = buckets.get(key)
+            if bucket is not None:
+                _merge(acc, bucket)
+
+    def _hours(self, acc: list, sid: str, lo: int, hi: int) -> None:
+        h_lo = -(-lo // HOUR) * HOUR
+        h_hi = hi - hi % HOUR
+        if h_lo >= h_hi:
+            self._raw(acc, sid, lo, hi)
+            return
+        self._raw(acc, sid, lo, h_lo)
+        self._buckets(acc, self.hourly.get(sid, {}), h_lo, h_hi, HOUR)
+        self._raw(acc, sid, h_hi, hi)
+
+    def _collect(self, sid: str, lo: int, hi: int) -> list:
+        acc = [0.0, 0.0, 0.0, 0]
+        d_lo = -(-lo // DAY) * DAY
+        d_hi = hi - hi % DAY
+        if d_lo >= d_hi:
+            self._hours(acc, sid, lo, hi)
+        else:
+            self._hours(acc, sid, lo, d_lo)
+            self._buckets(acc, self.daily.get(sid, {}), d_lo, d_hi, DAY)
+            self._hours(acc, sid, d_hi, hi)
+        return acc
+
+    def sensors_of(self, kind: Optional[str] = None,
+                   sensor_ids: Optional[Iterable[str]] = None) -> list[str]:
+        with self._lock:
+            ids = list(self.hourly) if sensor_ids is None else [s for s in sensor_ids if s in self.hourly]
+        if kind is not None:
+            ids = [s for s in ids if self.kind_by_sensor.get(s) == kind]
+        return ids
+
+    def stats(self, kind: Optional[str] = None, sensor_ids: Optional[Iterable[str]] = None,
+              start=None, end=None) -> dict:
+        """min/max/avg/count как у reading_stats; start и end включительно."""
+        with self._lock:
+            ids = self.sensors_of(kind, sensor_ids)
+            lo, hi = self._span(ids)
+            if start is not None:
+                lo = to_epoch(start)
+            if end is not None:
+                hi = to_epoch(end) + 1
+            return self._result(ids, lo, hi)
+
+    def stats_days(self, first: Union[str, date], last: Union[str, date], kind: Optional[str] = None,
+                   sensor_ids: Optional[Iterable[str]] = None) -> dict:
+        """Статистика за календарные дни с first по last включительно."""
+        lo = to_epoch(f"{str(first)[:10]} 00:00")
+        hi = to_epoch(f"{str(last)[:10]} 00:00") + DAY
+        with self._lock:
+            return self._result(self.sensors_of(kind, sensor_ids), lo, hi)
+
+    def _result(self, ids, lo: int, hi: int) -> dict:
+        acc = [0.0, 0.0, 0.0, 0]
+        for sid in ids:
+            part = self._collect(sid, lo, hi)
+            if part[3]:
+                _merge(acc, part)
+        if not acc[3]:
+            return {}
+        value = (lambda v: py_value(np.float32(v))) if self._f32 else float
+        return {
+            "min": value(acc[0]),
+            "max": value(acc[1]),
+            "avg": acc[2] / acc[3],
+            "count": acc[3],
+        }
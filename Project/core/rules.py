@@ -0,0 +1,269 @@
+"""
+Компилятор правил: кортеж Rule → таблицы диспетчеризации по параметру.
+Стоимость обработки показания зависит только от правил его параметра.
+"""
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from types import MappingProxyType
+from typing import Iterable, Iterator, Mapping, Optional, Union
+
+from core.domain import Alert, Command, Rule
+from core.schedule import VENTILATION_DEVICES
+from core.store import to_epoch
+
+DEVICE_MAP = {
+    "temp": "heater",
+    "hum_air": "humidifier",
+    "hum_soil": "pump",
+    "light": "lamp",
+    "co2": "co2_valve"
+}
+CONTROL_RULE_KINDS = ("hysteresis", "range")
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+@dataclass(frozen=True)
+class ControlRule:
+    rule_id: str
+    param: str
+    vmin: float
+    vmax: float
+    device: str
+    cooldown: float
+
+
+@dataclass(frozen=True)
+class DeltaRule:
+    rule_id: str
+    param: str
+    max_delta: float
+
+
+@dataclass(frozen=True)
+class StaleRule:
+    rule_id: str
+    param: Optional[str]  # None — для всех параметров
+    max_minutes: float
+
+
+@dataclass(frozen=True, eq=False)
+class RuleTable:
+    controls: Mapping[str, tuple[ControlRule, ...]]
+    deltas: Mapping[str, tuple[DeltaRule, ...]]
+    stale: Mapping[Optional[str], tuple[StaleRule, ...]]
+    rank: Mapping[str, int]  # меньше — приоритетнее
+
+    def stale_for(self, param: Optional[str]) -> tuple[StaleRule, ...]:
+        """Правила stale параметра и общие; для неизвестного параметра (None) — только общие."""
+        if param is None:
+            return self.stale.get(None, ())
+        return self.stale.get(param, ()) + self.stale.get(None, ())
+
+    def priority(self, param: str) -> int:
+        return self.rank.get(param, len(self.rank))
+
+
+def _priority_rank(pairs: list[tuple[str, str]]) -> dict[str, int]:
+    """Топологический порядок по парам (first важнее second); при цикле — порядок появления."""
+    params: list[str] = []
+    for first, second in pairs:
+        for p in (first, second):
+            if p not in params:
+                params.append(p)
+    incoming = {p: 0 for p in params}
+    edges: dict[str, list[str]] = {p: [] for p in params}
+    for first, second in pairs:
+        edges[first].append(second)
+        incoming[second] += 1
+    ready = [p for p in params if incoming[p] == 0]
+    order = []
+    while ready:
+        p = ready.pop(0)
+        order.append(p)
+        for q in edges[p]:
+            incoming[q] -= 1
+            if incoming[q] == 0:
+                ready.append(q)
+    order.extend(p for p in params if p not in order)
+    return {p: i for i, p in enumerate(order)}
+
+
+def compile_rules(rules: Iterable[Rule], device_map: Mapping[str, str] = DEVICE_MAP) -> RuleTable:
+    """Раскладывает правила по типам и параметрам, сохраняя исходный порядок внутри параметра."""
+    controls: dict = {}
+    deltas: dict = {}
+    stale: dict = {}
+    pairs = []
+    for rule in rules:
+        p = rule.payload
+        param = p.get("param")
+        if rule.kind in CONTROL_RULE_KINDS:
+            controls.setdefault(param, []).append(ControlRule(
+                rule.id, param, p.get("min"), p.get("max"),
+                p.get("device", device_map.get(param, param)), p.get("cooldown", 300)))
+        elif rule.kind == "delta":
+            deltas.setdefault(param, []).append(DeltaRule(rule.id, param, p["max_delta"]))
+        elif rule.kind == "stale":
+            stale.setdefault(param, []).append(StaleRule(rule.id, param, p["max_minutes"]))
+        elif rule.kind == "priority":
+            pairs.append((p["first"], p["second"]))
+    freeze = lambda d: MappingProxyType({k: tuple(v) for k, v in d.items()})  # noqa: E731
+    return RuleTable(freeze(controls), freeze(deltas), freeze(stale), MappingProxyType(_priority_rank(pairs)))
+
+
+def _stamp(sec: int) -> str:
+    return (_EPOCH + timedelta(seconds=sec)).strftime("%Y-%m-%d %H:%M")
+
+
+class RuleEngine:
+    """
+    Исполнитель скомпилированных правил с состоянием O(1) на параметр/сенсор:
+      range/hysteresis — команды ON/OFF с защитой от дребезга (как lazy_hysteresis_control);
+      delta            — алерт при скачке значения сенсора больше max_delta между показаниями;
+      stale            — алерт, если сенсор молчал дольше max_minutes;
+      priority         — в одном такте конфликт команд на один актуатор решается в пользу
+                         более приоритетного параметра.
+    """
+
+    def __init__(self, rules: Union[RuleTable, Iterable[Rule]], sensors=(), schedule=None):
+        self.table = rules if isinstance(rules, RuleTable) else compile_rules(rules)
+        self.kind_by_sensor = getattr(sensors, "kind_by_sensor", None) or {s.id: s.kind for s in sensors}
+        self.schedule = schedule
+        self.last_action: dict[str, str] = {}
+        self.last_time: dict[str, int] = {}
+        self.last_value: dict[str, tuple[int, float]] = {}
+        self.last_seen: dict[str, int] = {}
+
+    def _kind(self, reading) -> Optional[str]:
+        kind = getattr(reading, "kind", None)
+        return kind if kind is not None else self.kind_by_sensor.get(reading.sensor_id)
+
+    def _control(self, param: str, value: float, now: int, closed: bool = False) -> list[Command]:
+        cmds = []
+        for rule in self.table.controls.get(param, ()):
+            if closed and rule.device in VENTILATION_DEVICES:
+                continue
+            prev_time = self.last_time.get(param)
+            if prev_time is not None and now - prev_time < rule.cooldown:
+                continue
+            prev_action = self.last_action.get(param)
+            action = reason = None
+            if value < rule.vmin and prev_action != "ON":
+                action, reason = "ON", "below_min"
+            elif value > rule.vmax and prev_action != "OFF":
+                action, reason = "OFF", "above_max"
+            if action:
+                self.last_action[param] = action
+                self.last_time[param] = now
+                stamp = _stamp(now)
+                cmds.append(Command(
+                    id=f"{param}_{action.lower()}_{stamp}",
+                    actuator_id=rule.device,
+                    ts=stamp,
+                    action=action,
+                    payload={"reason": reason, "value": value, "param": param}
+                ))
+        return cmds
+
+    def _checks(self, sensor_id: str, param: str, value: float, now: int) -> list[Alert]:
+        alerts = []
+        stamp = _stamp(now)
+        deltas = self.table.deltas.get(param, ())
+        if deltas:
+            prev = self.last_value.get(sensor_id)
+            if prev is not None:
+                diff = abs(value - prev[1])
+                for rule in deltas:
+                    if diff > rule.max_delta:
+                        alerts.append(Alert(
+                            id=f"delta_{sensor_id}_{stamp}", zone_id=None, sensor_id=sensor_id, ts=stamp,
+                            code="DELTA_EXCEEDED", severity="WARNING",
+                            message=f"{param}: скачок {diff:g} > {rule.max_delta}"))
+            self.last_value[sensor_id] = (now, value)
+        stale = self.table.stale_for(param)
+        if stale:
+            seen = self.last_seen.get(sensor_id)
+            if seen is not None:
+                gap = (now - seen) / 60
+                for rule in stale:
+                    if gap > rule.max_minutes:
+                        alerts.append(Alert(
+                            id=f"stale_{sensor_id}_{stamp}", zone_id=None, sensor_id=sensor_id, ts=stamp,
+                            code="STALE_DATA", severity="WARNING",
+                            message=f"{param}: нет данных {gap:g} мин > {rule.max_minutes}"))
+            self.last_seen[sensor_id] = now
+        return alerts
+
+    def feed(self, reading) -> tuple:
+        """
+        Обрабатывает одно показание; возвращает команды и алерты. Расписание
+        (вентиляционные окна) ограничивает только команды вентиляционным
+        устройствам: остальные актуаторы и проверки delta/stale работают всегда.
+        """
+        param = self._kind(reading)
+        now = to_epoch(reading.ts)
+        value = reading.value
+        alerts = self._checks(getattr(reading, "sensor_id", param), param, value, now)
+        closed = self.schedule is not None and not self.schedule.is_active(now)
+        return tuple(self._control(param, value, now, closed)) + tuple(alerts)
+
+    def stale_sensors(self, now) -> tuple[str, ...]:
+        """Сенсоры, которые молчат дольше порога stale к моменту now."""
+        now = to_epoch(now)
+        result = []
+        for sid, seen in self.last_seen.items():
+            rules = self.table.stale_for(self.kind_by_sensor.get(sid))
+            if any((now - seen) / 60 > r.max_minutes for r in rules):
+                result.append(sid)
+        return tuple(result)
+
+    def feed_tick(self, readings: Iterable) -> tuple:
+        """
+        Такт — показания с одной меткой времени. Команды на один актуатор
+        сводятся к одной от самого приоритетного параметра; состояние
+        отброшенного параметра откатывается, будто команды не было.
+        """
+        readings = list(readings)
+        params = {self._kind(r) for r in readings}
+        saved = {p: (self.last_action.get(p), self.last_time.get(p)) for p in params}
+        out = []
+        for r in readings:
+            out.extend(self.feed(r))
+        cmds = [x for x in out if isinstance(x, Command)]
+        alerts = [x for x in out if not isinstance(x, Command)]
+        if not self.table.rank or len(cmds) < 2:
+            return tuple(cmds) + tuple(alerts)
+
+        # стабильная сортировка: сначала приоритетные параметры
+        cmds.sort(key=lambda c: self.table.priority(c.payload["param"]))
+        kept, winners = [], {}
+        for c in cmds:
+            if c.actuator_id in winners:
+                param = c.payload["param"]
+                if param != winners[c.actuator_id]:
+                    action, ts = saved[param]
+                    self._restore(param, action, ts)
+                continue
+            winners[c.actuator_id] = c.payload["param"]
+            kept.append(c)
+        return tuple(kept) + tuple(alerts)
+
+    def _restore(self, param: str, action: Optional[str], ts: Optional[int]) -> None:
+        for store, value in ((self.last_action, action), (self.last_time, ts)):
+            if value is None:
+                store.pop(param, None)
+            else:
+                store[param] = value
+
+    def run(self, stream: Iterable) -> Iterator:
+        """Поток показаний → поток команд и алертов; соседние показания с одним ts — один такт."""
+        tick, tick_ts = [], None
+        for r in stream:
+            if tick and r.ts != tick_ts:
+                yield from self.feed_tick(tick)
+                tick = []
+            tick.append(r)
+            tick_ts = r.ts
+        if tick:
+            yield from self.feed_tick(tick)
@@ -0,0 +1,184 @@
+from bisect import bisect_right
+from datetime import datetime, timedelta
+from typing import Iterable, Mapping, Optional, Union
+
+import numpy as np
+
+from core.store import to_epoch
+
+DAY_MINUTES = 1440
+WEEK_MINUTES = 7 * DAY_MINUTES
+WEEKDAYS = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+
+# устройства, работу которых ограничивают вентиляционные окна расписания;
+# остальные актуаторы (нагрев, полив, досветка) управляются круглосуточно
+VENTILATION_DEVICES = frozenset({"fan", "vent", "window"})
+
+# 1970-01-01 — четверг: сдвиг, чтобы минута недели 0 была понедельником 00:00
+_EPOCH_WEEKDAY_SHIFT = 3 * DAY_MINUTES
+
+
+def hhmm_to_minute(hhmm: str) -> int:
+    h, m = hhmm.split(":")
+    return int(h) * 60 + int(m)
+
+
+def minute_to_hhmm(minute: int) -> str:
+    return f"{minute // 60:02d}:{minute % 60:02d}"
+
+
+def minute_of_week(ts: Union[str, int, datetime]) -> int:
+    """Минута недели (0 — понедельник 00:00) для строки времени, datetime или epoch-секунд."""
+    return (to_epoch(ts) // 60 + _EPOCH_WEEKDAY_SHIFT) % WEEK_MINUTES
+
+
+def _merge(intervals: Iterable[tuple[int, int]]) -> list[tuple[int, int]]:
+    merged: list[list[int]] = []
+    for a, b in sorted(intervals):
+        if a >= b:
+            continue
+        if merged and a <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], b)
+        else:
+            merged.append([a, b])
+    return [(a, b) for a, b in merged]
+
+
+def day_minutes(intervals: Iterable) -> list[tuple[int, int]]:
+    """
+    Интервалы дня [["08:00", "09:30"], ...] → полуоткрытые минутные отрезки [480, 571).
+    Конец включительный, как в expand_schedule. Некорректные и обратные интервалы пропускаются.
+    """
+    result = []
+    for interval in intervals:
+        if len(interval) != 2:
+            continue
+        a, b = hhmm_to_minute(interval[0]), hhmm_to_minute(interval[1])
+        if a <= b:
+            result.append((a, b + 1))
+    return _merge(result)
+
+
+class WeeklySchedule:
+    """
+    Скомпилированное недельное расписание: отсортированные непересекающиеся
+    полуоткрытые интервалы в минутах недели. Проверка активности и поиск
+    следующего переключения — бинарный поиск, O(log n).
+    """
+
+    __slots__ = ("intervals", "_starts")
+
+    def __init__(self, intervals: Iterable[tuple[int, int]] = ()):
+        self.intervals = tuple(_merge(intervals))
+        self._starts = [a for a, _ in self.intervals]
+
+    # --- построение ---
+    @classmethod
+    def from_mapping(cls, schedule: Optional[Mapping[str, Iterable]]) -> "WeeklySchedule":
+        """Из словаря {'monday': [['08:00', '09:00'], ...], ...} (формат PlantProfile.schedule)."""
+        intervals = []
+        for day, day_intervals in (schedule or {}).items():
+            offset = WEEKDAYS.index(day.lower()) * DAY_MINUTES
+            intervals.extend((offset + a, offset + b) for a, b in day_minutes(day_intervals))
+        return cls(intervals)
+
+    @classmethod
+    def daily(cls, day_intervals: Iterable) -> "WeeklySchedule":
+        """Одни и те же интервалы на каждый день недели (формат Mode.schedule)."""
+        minutes = day_minutes(day_intervals)
+        return cls((d * DAY_MINUTES + a, d * DAY_MINUTES + b) for d in range(7) for a, b in minutes)
+
+    @classmethod
+    def from_profile(cls, profile) -> "WeeklySchedule":
+        return cls.from_mapping(profile.schedule)
+
+    @classmethod
+    def from_mode(cls, mode) -> "WeeklySchedule":
+        return cls.daily(mode.schedule)
+
+    # --- запросы ---
+    def __bool__(self) -> bool:
+        return bool(self.intervals)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, WeeklySchedule) and self.intervals == other.intervals
+
+    def __repr__(self) -> str:
+        return f"WeeklySchedule({list(self.intervals)!r})"
+
+    def _find(self, minute: int) -> int:
+        return bisect_right(self._starts, minute) - 1
+
+    def is_active_minute(self, minute: int) -> bool:
+        i = self._find(minute % WEEK_MINUTES)
+        return i >= 0 and minute % WEEK_MINUTES < self.intervals[i][1]
+
+    def is_active(self, ts) -> bool:
+        """Активно ли расписание в момент ts."""
+        return self.is_active_minute(minute_of_week(ts))
+
+    def active_mask(self, epoch_seconds: np.ndarray) -> np.ndarray:
+        """Векторная is_active для массива epoch-секунд."""
+        minutes = (np.asarray(epoch_seconds, dtype=np.int64) // 60 + _EPOCH_WEEKDAY_SHIFT) % WEEK_MINUTES
+        if not self.intervals:
+            return np.zeros(minutes.shape, dtype=bool)
+        starts = np.asarray(self._starts, dtype=np.int64)
+        ends = np.asarray([b for _, b in self.intervals], dtype=np.int64)
+        i = np.searchsorted(starts, minutes, side="right") - 1
+        return (i >= 0) & (minutes < ends[np.maximum(i, 0)])
+
+    def next_transition(self, ts) -> Optional[tuple[datetime, bool]]:
+        """
+        Ближайшее переключение после ts: (момент, новое состояние).
+        None — расписание пустое или активно всю неделю.
+        """
+        if not self.intervals or self.intervals == ((0, WEEK_MINUTES),):
+            return None
+        sec = to_epoch(ts)
+        now = minute_of_week(sec)
+        i = self._find(now)
+        if i >= 0 and now < self.intervals[i][1]:
+            target, state = self.intervals[i][1], False
+            if target == WEEK_MINUTES and self.intervals[0][0] == 0:
+                target = WEEK_MINUTES + self.intervals[0][1]  # интервал продолжается через полночь воскресенья
+        elif i + 1 < len(self.intervals):
+            target, state = self.intervals[i + 1][0], True
+        else:
+            target, state = WEEK_MINUTES + self.intervals[0][0], True
+        base = datetime(1970, 1, 1) + timedelta(seconds=sec - sec % 60)
+        return base + timedelta(minutes=target - now), state
+
+    def intervals_for(self, weekday: str) -> list[tuple[str, str]]:
+        """Интервалы одного дня в исходном виде ('08:00', '09:00') — конец включительно."""
+        offset = WEEKDAYS.index(weekday.lower()) * DAY_MINUTES
+        result = []
+        for a, b in self.intervals:
+            a, b = max(a, offset), min(b, offset + DAY_MINUTES)
+            if a < b:
+                result.append((minute_to_hhmm(a - offset), minute_to_hhmm(b - 1 - offset)))
+        return result
+
+    # --- операции над расписаниями ---
+    def union(self, other: "WeeklySchedule") -> "WeeklySchedule":
+        return WeeklySchedule(self.intervals + other.intervals)
+
+    def intersection(self, other: "WeeklySchedule") -> "WeeklySchedule":
+        """Пересечение двух расписаний слиянием отсортированных списков, O(n + m)."""
+        result = []
+        i = j = 0
+        a, b = self.intervals, other.intervals
+        while i < len(a) and j < len(b):
+            lo, hi = max(a[i][0], b[j][0]), min(a[i][1], b[j][1])
+            if lo < hi:
+                result.append((lo, hi))
+            if a[i][1] < b[j][1]:
+                i += 1
+            else:
+                j += 1
+        return WeeklySchedule(result)
+
+    def overlaps(self, other: "WeeklySchedule") -> bool:
+        return bool(self.intersection(other))
+
+    __or__ = union
+    __and__ = intersection
@@ -0,0 +1,203 @@
+"""
+Бинарный кэш датасета рядом с исходным JSON (seed.json → seed.json.bin).
+
+Формат файла:
+    заголовок  — магия, размер и mtime исходника, SHA-256 содержимого, размеры секций;
+    каталог    — компактный JSON (зоны, профили, сенсоры, актуаторы, правила, id сенсоров);
+    показания  — выровненные массивы sensor_idx:int32, ts:int64, value:float32, id:S<n>.
+Массивы показаний отображаются в память (mmap), поэтому повторная загрузка
+не зависит от числа показаний.
+"""
+import hashlib
+import json
+import mmap
+import os
+import struct
+from dataclasses import asdict
+
+import numpy as np
+
+from core.domain import Sensor
+from core.loader import SeedStream, CATALOG_SECTIONS, SECTION_TYPES
+from core.store import ReadingStore, SENSOR_DTYPE, TS_DTYPE, VALUE_DTYPE, epochs
+
+MAGIC = b"GHSEED01"
+CACHE_SUFFIX = ".bin"
+_HEADER = struct.Struct("<8sqq32sqqq")  # magic, size, mtime_ns, sha256, n, catalog_len, id_width
+_ALIGN = 8
+_BUILD_CHUNK = 100_000
+
+
+def cache_path(path: str) -> str:
+    return path + CACHE_SUFFIX
+
+
+def file_digest(path: str) -> bytes:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.digest()
+
+
+def _pad(n: int) -> int:
+    return (-n) % _ALIGN
+
+
+def _read_header(path: str):
+    with open(path, "rb") as f:
+        raw = f.read(_HEADER.size)
+    if len(raw) != _HEADER.size:
+        return None
+    header = _HEADER.unpack(raw)
+    return header if header[0] == MAGIC else None
+
+
+def is_fresh(path: str) -> bool:
+    """
+    Кэш актуален, если совпадают размер и mtime исходника. При расхождении mtime
+    сверяется хэш содержимого: если данные те же, заголовок кэша обновляется.
+    """
+    cpath = cache_path(path)
+    if not os.path.exists(cpath):
+        return False
+    header = _read_header(cpath)
+    if header is None:
+        return False
+    _, size, mtime_ns, digest = header[:4]
+    st = os.stat(path)
+    if st.st_size != size:
+        return False
+    if st.st_mtime_ns == mtime_ns:
+        return True
+    if file_digest(path) != digest:
+        return False
+    with open(cpath, "r+b") as f:
+        f.write(_HEADER.pack(MAGIC, st.st_size, st.st_mtime_ns, *header[3:]))
+    return True
+
+
+def _build_columns(stream: SeedStream, sensors: tuple[Sensor, ...]):
+    """Собирает колонки показаний из потока чанков, не создавая лишних копий."""
+    sensor_ids = [s.id for s in sensors]
+    pos = {sid: i for i, sid in enumerate(sensor_ids)}
+    parts = ([], [], [], [])
+    for chunk in stream.chunks():
+        idx = np.empty(len(chunk), dtype=SENSOR_DTYPE)
+        for i, r in enumerate(chunk):
+            j = pos.get(r.sensor_id)
+            if j is None:
+                j = pos[r.sensor_id] = len(sensor_ids)
+                sensor_ids.append(r.sensor_id)
+            idx[i] = j
+        parts[0].append(idx)
+        parts[1].append(epochs([r.ts for r in chunk]))
+        parts[2].append(np.fromiter((r.value for r in chunk), dtype=VALUE_DTYPE, count=len(chunk)))
+        parts[3].append(np.array([r.id.encode() for r in chunk], dtype=bytes))
+    dtypes = (SENSOR_DTYPE, TS_DTYPE, VALUE_DTYPE, "S1")
+    cols = [np.concatenate(p) if p else np.empty(0, dtype=dt) for p, dt in zip(parts, dtypes)]
+    return sensor_ids, cols
+
+
+class CacheWriter:
+    """
+    Запись кэша по частям, когда число показаний n известно заранее: файл
+    размечается сразу, колонки отображаются в память, а write() копирует
+    очередной чанк на его место. finish() пишет заголовок с размером, mtime
+    и хэшем исходника и атомарно переименовывает tmp-файл.
+    """
+
+    def __init__(self, path: str, sections: dict, sensor_ids, n: int, id_width: int):
+        self.path = path
+        self.cpath = cache_path(path)
+        self.tmp = self.cpath + ".tmp"
+        self.n = n
+        self.id_width = id_width
+        catalog = {name: [asdict(x) for x in sections.get(name, ())] for name in CATALOG_SECTIONS}
+        catalog["sensor_ids"] = list(sensor_ids)
+        blob = json.dumps(catalog, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        self.catalog_len = len(blob)
+
+        offset = _HEADER.size + len(blob)
+        offset += _pad(offset)
+        layout = []
+        for dtype in (SENSOR_DTYPE, TS_DTYPE, VALUE_DTYPE, np.dtype(f"S{id_width}")):
+            nbytes = np.dtype(dtype).itemsize * n
+            layout.append((dtype, offset))
+            offset += nbytes + _pad(nbytes)
+        with open(self.tmp, "wb") as f:
+            f.write(b"\0" * _HEADER.size)
+            f.write(blob)
+            f.truncate(offset)
+        self.columns = [np.memmap(self.tmp, dtype=dtype, mode="r+", offset=start, shape=(n,))
+                        for dtype, start in layout] if n else []
+
+    def write(self, start: int, idx, ts, value, ids) -> None:
+        """Колонки чанка для показаний [start, start + len(idx))."""
+        stop = start + len(idx)
+        for col, part in zip(self.columns, (idx, ts, value, ids)):
+            col[start:stop] = part
+
+    def finish(self, size: int, mtime_ns: int, digest: bytes) -> str:
+        for col in self.columns:
+            col.flush()
+        self.columns = []
+        with open(self.tmp, "r+b") as f:
+            f.write(_HEADER.pack(MAGIC, size, mtime_ns, digest, self.n, self.catalog_len, self.id_width))
+        os.replace(self.tmp, self.cpath)
+        return self.cpath
+
+
+def write_cache(path: str, chunk_size: int = _BUILD_CHUNK) -> str:
+    """Компилирует JSON в бинарный кэш (запись атомарная: tmp-файл + rename)."""
+    st = os.stat(path)
+    digest = file_digest(path)
+    stream = SeedStream(path, chunk_size=chunk_size)
+    sensor_ids, (idx, ts, value, ids) = _build_columns(stream, stream.sensors)
+
+    writer = CacheWriter(path, stream.sections, sensor_ids, len(idx), ids.itemsize)
+    writer.write(0, idx, ts, value, ids)
+    return writer.finish(st.st_size, st.st_mtime_ns, digest)
+
+
+def read_cache(path: str) -> tuple:
+    """Открывает кэш через mmap; возвращает кортеж в формате load_seed с ReadingStore вместо показаний."""
+    cpath = cache_path(path)
+    with open(cpath, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    _, _, _, _, n, catalog_len, id_width = _HEADER.unpack_from(mm, 0)
+    offset = _HEADER.size
+    catalog = json.loads(mm[offset:offset + catalog_len].decode("utf-8"))
+    offset += catalog_len
+    offset += _pad(offset)
+
+    cols = []
+    for dtype in (SENSOR_DTYPE, TS_DTYPE, VALUE_DTYPE, np.dtype(f"S{id_width}")):
+        arr = np.frombuffer(mm, dtype=dtype, count=n, offset=offset)
+        cols.append(arr)
+        nbytes = arr.nbytes
+        offset += nbytes + _pad(nbytes)
+
+    sections = {name: tuple(SECTION_TYPES[name](**item) for item in catalog[name])
+                for name in CATALOG_SECTIONS}
+    kinds = {s.id: s.kind for s in sections["sensors"]}
+    store = ReadingStore(catalog["sensor_ids"], *cols,
+                         sensor_kinds=[kinds.get(sid) for sid in catalog["sensor_ids"]])
+    zones, profiles, sensors, actuators, rules = (sections[name] for name in CATALOG_SECTIONS)
+    return zones, profiles, sensors, actuators, store, rules
+
+
+def load_cached(path: str) -> tuple:
+    """load_seed через кэш: при устаревшем или отсутствующем кэше пересобирает его."""
+    if not is_fresh(path):
+        try:
+            write_cache(path)
+        except OSError:
+            # каталог только для чтения — собираем в памяти без сайдкара
+            stream = SeedStream(path, chunk_size=_BUILD_CHUNK)
+            sensor_ids, cols = _build_columns(stream, stream.sensors)
+            kinds = {s.id: s.kind for s in stream.sensors}
+            store = ReadingStore(sensor_ids, *cols, sensor_kinds=[kinds.get(sid) for sid in sensor_ids])
+            zones, profiles, sensors, actuators, rules = stream.catalog
+            return zones, profiles, sensors, actuators, store, rules
+    return read_cache(path)
@@ -1,16 +1,19 @@
 from core.ftypes import Maybe, Either
+from core.catalog import lookup_sensor
+from core.metrics import instrument
 
 def safe_sensor(sensors, sid):
-    sensor = next((s for s in sensors if s.id == sid), None)
+    sensor = lookup_sensor(sensors, sid)
     return Maybe.some(sensor) if sensor else Maybe.nothing()
 
 
+@instrument("validate_reading")
 def validate_reading(r, sensors, profile) -> Either:
     """Проверка показания на соответствие диапазонам профиля."""
     if getattr(r, "value", None) is None:
         return Either.left({"error": "no_value", "sensor_id": getattr(r, "sensor_id", None)})
 
-    sensor = next((s for s in sensors if s.id == r.sensor_id), None)
+    sensor = lookup_sensor(sensors, r.sensor_id)
     if not sensor:
         return Either.left({"error": "sensor_not_found", "sensor_id": r.sensor_id})
 
@@ -78,10 +81,11 @@ def issue_alert_if_needed(snapshot: dict, profile) -> Maybe:
     return Maybe.nothing()
 # core/service.py
 
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from typing import Callable, Dict, Tuple
 from core.domain import Command, Alert
-from typing import Callable, Dict, Tuple
+from typing import Callable, Dict, Optional, Sequence, Tuple
+from core.alerts import AlertEngine
 
 class ControlService:
     def __init__(self, selectors: Dict[str, Callable], calculators: Dict[str, Callable], deciders: Dict[str, Callable]):
@@ -89,6 +93,7 @@ class ControlService:
         self.calculators = calculators
         self.deciders = deciders
 
+    @instrument("control_tick")
     def control_tick(self, store, zone_id: str, now: str) -> Tuple[Command, ...]:
         snapshot = self.selectors["snapshot"](store, zone_id)
         enriched = self.calculators["regime"](snapshot)
@@ -96,25 +101,59 @@ class ControlService:
         return tuple(cmds)
 
 class AlertService:
-    def __init__(self, rules: Tuple[Callable, ...], raiser: Callable, clearer: Callable):
+    """
+    Выдаёт только переходы: "raise" от правила поднимает алерт, если он ещё не
+    поднят для зоны, "clear" снимает поднятый. Как у AlertEngine, id несёт номер
+    эпизода пары (зона, правило): "<id raiser>_<n>" и "<id raiser>_<n>_cleared".
+    Пороговые правила с гистерезисом и таймерами удержания — через engine
+    (core.alerts.AlertEngine).
+    """
+    def __init__(self, rules: Tuple[Callable, ...], raiser: Callable, clearer: Callable,
+                 engine: Optional[AlertEngine] = None):
         self.rules = rules
         self.raiser = raiser
         self.clearer = clearer
+        self.engine = engine
+        self.active: dict = {}  # (зона, номер правила) → id поднятого алерта
+        self.episodes: dict = {}  # (зона, номер правила) → число подъёмов
 
-    def evaluate_alerts(self, snapshot: dict) -> Tuple[Alert, ...]:
+    def _transitions(self, snapshot: dict) -> list:
         results = []
-        for rule in self.rules:
+        zone = snapshot.get("zone")
+        for i, rule in enumerate(self.rules):
             status = rule(snapshot)
-            if status == "raise":
-                results.append(self.raiser(snapshot))
-            elif status == "clear":
-                results.append(self.clearer(snapshot))
+            key = (zone, i)
+            if status == "raise" and key not in self.active:
+                episode = self.episodes[key] = self.episodes.get(key, 0) + 1
+                alert = self.raiser(snapshot)
+                alert = replace(alert, id=f"{alert.id}_{episode}")
+                self.active[key] = alert.id
+                results.append(alert)
+            elif status == "clear" and key in self.active:
+                raised = self.active.pop(key)
+                results.append(replace(self.clearer(snapshot), id=f"{raised}_cleared"))
+        return results
+
+    @instrument("evaluate_alerts")
+    def evaluate_alerts(self, snapshot: dict) -> Tuple[Alert, ...]:
+        results = self._transitions(snapshot)
+        if self.engine is not None:
+            results.extend(self.engine.evaluate(snapshot))
+        return tuple(results)
+
+    @instrument("evaluate_alerts_batch", items=lambda result, args: len(args["snapshots"]))
+    def evaluate_batch(self, snapshots: Sequence[dict], now=None) -> Tuple[Alert, ...]:
+        """Такт по многим зонам: правила-функции по снимкам, затем движок — одним вызовом."""
+        results = [alert for snapshot in snapshots for alert in self._transitions(snapshot)]
+        if self.engine is not None:
+            results.extend(self.engine.evaluate_batch(snapshots, now))
         return tuple(results)
 
 class ReportService:
     def __init__(self, aggregators: Dict[str, Callable]):
         self.aggregators = aggregators
 
+    @instrument("daily_report")
     def daily_report(self, date: str) -> dict:
         return {
             "out_of_range_percent": self.aggregators["oor"](date),
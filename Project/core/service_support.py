@@ -25,7 +25,7 @@ def rule_temp_high(snapshot):
     return None
 def raise_alert(snapshot):
     return Alert(
-        id="alert1",
+        id=f"temp_high_{snapshot['zone']}",
         zone_id=snapshot["zone"],
         sensor_id="temp",  # обязательно
         ts=snapshot["ts"],
@@ -36,7 +36,7 @@ def raise_alert(snapshot):
 
 def clear_alert(snapshot):
     return Alert(
-        id="alert1_cleared",
+        id=f"temp_high_{snapshot['zone']}_cleared",
         zone_id=snapshot["zone"],
         sensor_id="temp",  # обязательно
         ts=snapshot["ts"],
@@ -0,0 +1,203 @@
+from datetime import datetime, timedelta
+from typing import Iterable, Iterator, Optional, Union
+
+import numpy as np
+
+from core.domain import Reading, Sensor
+from core.catalog import Catalog
+
+TS_FORMAT = "%Y-%m-%d %H:%M"
+SENSOR_DTYPE = np.int32
+TS_DTYPE = np.int64
+VALUE_DTYPE = np.float32
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def to_epoch(ts: Union[str, int, datetime]) -> int:
+    """Переводит метку времени ('2025-09-01 00:00' или ISO) в секунды от эпохи."""
+    if isinstance(ts, (int, np.integer)):
+        return int(ts)
+    if isinstance(ts, str):
+        try:
+            ts = datetime.strptime(ts, TS_FORMAT)
+        except ValueError:
+            ts = datetime.fromisoformat(ts)
+    return int((ts - _EPOCH).total_seconds())
+
+
+def from_epoch(sec: int) -> str:
+    """Обратное преобразование: секунды от эпохи → строка в формате показаний."""
+    dt = _EPOCH + timedelta(seconds=int(sec))
+    if dt.second:
+        return dt.strftime("%Y-%m-%d %H:%M:%S")
+    return dt.strftime(TS_FORMAT)
+
+
+def epochs(ts_list: Iterable[str]) -> np.ndarray:
+    """Векторный разбор строк времени в массив int64 (секунды от эпохи)."""
+    arr = ts_list if isinstance(ts_list, np.ndarray) else np.asarray(list(ts_list))
+    if arr.size == 0:
+        return np.empty(0, dtype=TS_DTYPE)
+    return arr.astype("datetime64[s]").astype(TS_DTYPE)
+
+
+def py_value(v) -> float:
+    # float32 → кратчайшее десятичное представление, чтобы 27.3 осталось 27.3
+    return float(str(v))
+
+
+class ReadingStore:
+    """
+    Колоночное хранилище показаний: параллельные массивы
+    индекса сенсора (int32), времени в секундах (int64) и значения (float32).
+    При итерации лениво отдаёт обычные объекты Reading.
+    """
+
+    __slots__ = ("sensor_ids", "sensor_kinds", "sensor_idx", "ts", "value", "ids", "_pos")
+
+    def __init__(self, sensor_ids, sensor_idx, ts, value, ids=None, sensor_kinds=None):
+        self.sensor_ids = tuple(sensor_ids)
+        self.sensor_kinds = tuple(sensor_kinds) if sensor_kinds is not None else None
+        self.sensor_idx = np.asarray(sensor_idx, dtype=SENSOR_DTYPE)
+        self.ts = np.asarray(ts, dtype=TS_DTYPE)
+        self.value = np.asarray(value, dtype=VALUE_DTYPE)
+        self.ids = ids
+        self._pos = {sid: i for i, sid in enumerate(self.sensor_ids)}
+
+    # --- построение ---
+    @classmethod
+    def from_columns(cls, sensor_id_col, ts_col, value_col, ids=None,
+                     sensors: tuple[Sensor, ...] = ()) -> "ReadingStore":
+        """Строит хранилище из трёх колонок (id сенсора, время, значение)."""
+        sensor_ids = [s.id for s in sensors]
+        pos = {sid: i for i, sid in enumerate(sensor_ids)}
+        idx = np.empty(len(sensor_id_col), dtype=SENSOR_DTYPE)
+        for i, sid in enumerate(sensor_id_col):
+            j = pos.get(sid)
+            if j is None:
+                j = pos[sid] = len(sensor_ids)
+                sensor_ids.append(sid)
+            idx[i] = j
+        kinds_by_id = {s.id: s.kind for s in sensors}
+        kinds = [kinds_by_id.get(sid) for sid in sensor_ids] if sensors else None
+        if ids is not None:
+            ids = np.asarray(ids, dtype=object)
+        return cls(sensor_ids, idx, epochs(ts_col),
+                   np.asarray(value_col, dtype=VALUE_DTYPE), ids, kinds)
+
+    @classmethod
+    def from_readings(cls, readings: Iterable[Reading],
+                      sensors: tuple[Sensor, ...] = ()) -> "ReadingStore":
+        """Строит хранилище из кортежа Reading (например, результата load_seed)."""
+        readings = tuple(readings)
+        return cls.from_columns(
+            [r.sensor_id for r in readings],
+            [r.ts for r in readings],
+            [r.value for r in readings],
+            ids=[r.id for r in readings],
+            sensors=sensors,
+        )
+
+    def _derive(self, sensor_idx, ts, value, ids) -> "ReadingStore":
+        store = ReadingStore.__new__(ReadingStore)
+        store.sensor_ids = self.sensor_ids
+        store.sensor_kinds = self.sensor_kinds
+        store.sensor_idx = sensor_idx
+        store.ts = ts
+        store.value = value
+        store.ids = ids
+        store._pos = self._pos
+        return store
+
+    # --- ленивый адаптер к Reading ---
+    def __len__(self) -> int:
+        return int(self.sensor_idx.shape[0])
+
+    def reading(self, i: int) -> Reading:
+        rid = self.ids[i] if self.ids is not None else f"r{i + 1}"
+        if isinstance(rid, bytes):  # id из бинарного кэша (core.seedcache)
+            rid = rid.decode()
+        return Reading(
+            id=rid,
+            sensor_id=self.sensor_ids[self.sensor_idx[i]],
+            ts=from_epoch(self.ts[i]),
+            value=py_value(self.value[i]),
+        )
+
+    def __iter__(self) -> Iterator[Reading]:
+        for i in range(len(self)):
+            yield self.reading(i)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(len(self))
+            if step != 1:
+                return self.filter(mask=np.arange(len(self))[key])
+            return self.slice(start, stop)
+        if key < 0:
+            key += len(self)
+        if not 0 <= key < len(self):
+            raise IndexError("ReadingStore index out of range")
+        return self.reading(key)
+
+    # --- векторные операции ---
+    def sensor_index(self, sensor_id: str) -> Optional[int]:
+        return self._pos.get(sensor_id)
+
+    def kind_indices(self, kind: str, sensors: tuple[Sensor, ...] = ()) -> np.ndarray:
+        """Индексы сенсоров заданного типа (по собственной таблице или по sensors)."""
+        if isinstance(sensors, Catalog):
+            kinds = sensors.kind_by_sensor
+            wanted = [i for i, sid in enumerate(self.sensor_ids) if kinds.get(sid) == kind]
+        elif sensors:
+            kinds = {s.id: s.kind for s in sensors}
+            wanted = [i for i, sid in enumerate(self.sensor_ids) if kinds.get(sid) == kind]
+        elif self.sensor_kinds is not None:
+            wanted = [i for i, k in enumerate(self.sensor_kinds) if k == kind]
+        else:
+            raise ValueError("sensor kinds are unknown: pass sensors")
+        return np.asarray(wanted, dtype=SENSOR_DTYPE)
+
+    def mask(self, sensor_ids: Optional[Iterable[str]] = None, kind: Optional[str] = None,
+             start=None, end=None, sensors: tuple[Sensor, ...] = ()) -> np.ndarray:
+        """Булева маска строк по сенсорам, типу и интервалу времени (границы включительно)."""
+        m = np.ones(len(self), dtype=bool)
+        if sensor_ids is not None:
+            wanted = [self._pos[sid] for sid in sensor_ids if sid in self._pos]
+            m &= np.isin(self.sensor_idx, np.asarray(wanted, dtype=SENSOR_DTYPE))
+        if kind is not None:
+            m &= np.isin(self.sensor_idx, self.kind_indices(kind, sensors))
+        if start is not None:
+            m &= self.ts >= to_epoch(start)
+        if end is not None:
+            m &= self.ts <= to_epoch(end)
+        return m
+
+    def filter(self, sensor_ids: Optional[Iterable[str]] = None, kind: Optional[str] = None,
+               start=None, end=None, sensors: tuple[Sensor, ...] = (), mask=None) -> "ReadingStore":
+        """Возвращает новое хранилище с отобранными строками (порядок сохраняется)."""
+        if mask is None:
+            mask = self.mask(sensor_ids, kind, start, end, sensors)
+        ids = self.ids[mask] if self.ids is not None else None
+        return self._derive(self.sensor_idx[mask], self.ts[mask], self.value[mask], ids)
+
+    def slice(self, start: int, stop: Optional[int] = None) -> "ReadingStore":
+        """Позиционный срез без копирования данных (views NumPy)."""
+        sl = slice(start, stop)
+        ids = self.ids[sl] if self.ids is not None else None
+        return self._derive(self.sensor_idx[sl], self.ts[sl], self.value[sl], ids)
+
+    def stats(self, kind: Optional[str] = None, sensors: tuple[Sensor, ...] = ()) -> dict:
+        """Те же min/max/avg/count, что и reading_stats, но одним проходом NumPy."""
+        values = self.value
+        if kind is not None:
+            values = values[np.isin(self.sensor_idx, self.kind_indices(kind, sensors))]
+        if values.size == 0:
+            return {}
+        return {
+            "min": py_value(values.min()),
+            "max": py_value(values.max()),
+            "avg": float(values.sum(dtype=np.float64) / values.size),
+            "count": int(values.size),
+        }
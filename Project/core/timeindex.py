@@ -0,0 +1,110 @@
+from datetime import date
+from typing import Iterable, Optional, Union
+
+import numpy as np
+
+from core.domain import Reading
+from core.store import ReadingStore, to_epoch
+
+DAY = 86400
+
+
+def _day_start(d: Union[str, date]) -> int:
+    return to_epoch(f"{str(d)[:10]} 00:00")
+
+
+class TimeIndex:
+    """
+    Индекс показаний по времени: метки разобраны в int64 и отсортированы один раз
+    (глобально и по каждому сенсору). Запросы — бинарный поиск, O(log n + k).
+    Результат того же типа, что и исходные показания: кортеж Reading или ReadingStore.
+    """
+
+    def __init__(self, readings: Union[Iterable[Reading], ReadingStore]):
+        if isinstance(readings, ReadingStore):
+            self.readings = readings
+            store = readings
+        else:
+            self.readings = tuple(readings)
+            store = ReadingStore.from_readings(self.readings)
+        self.sensor_ids = store.sensor_ids
+
+        # глобальный порядок: по времени, при равенстве — по исходной позиции
+        self.order = np.argsort(store.ts, kind="stable")
+        self.ts_sorted = store.ts[self.order]
+
+        # порядок по сенсорам: (сенсор, время, позиция)
+        by_sensor = np.lexsort((store.ts, store.sensor_idx))
+        idx_sorted = store.sensor_idx[by_sensor]
+        bounds = np.searchsorted(idx_sorted, np.arange(len(self.sensor_ids) + 1))
+        self._sensor_rows = {}
+        for i, sid in enumerate(self.sensor_ids):
+            rows = by_sensor[bounds[i]:bounds[i + 1]]
+            self._sensor_rows[sid] = (store.ts[rows], rows)
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    def _take(self, rows: np.ndarray):
+        if isinstance(self.readings, ReadingStore):
+            return self.readings.filter(mask=rows)
+        return tuple(self.readings[i] for i in rows)
+
+    def sensor_span(self, sensor_id: str) -> Optional[tuple[int, int]]:
+        """Первая и последняя метки сенсора (секунды эпохи) или None, если показаний нет."""
+        ts, _ = self._sensor_rows.get(sensor_id, (None, None))
+        if ts is None or not len(ts):
+            return None
+        return int(ts[0]), int(ts[-1])
+
+    def sensor_values(self, sensor_id: str, lo: int, hi: int) -> np.ndarray:
+        """Значения сенсора с lo <= ts < hi (секунды эпохи) в порядке времени, float64."""
+        ts, rows = self._sensor_rows.get(sensor_id, (None, None))
+        if rows is None:
+            return np.empty(0)
+        a, b = np.searchsorted(ts, (lo, hi), side="left")
+        rows = rows[a:b]
+        if isinstance(self.readings, ReadingStore):
+            return self.readings.value[rows].astype(np.float64)
+        return np.fromiter((self.readings[i].value for i in rows), np.float64, len(rows))
+
+    def rows_between(self, start, end) -> np.ndarray:
+        """Позиции показаний с start <= ts <= end в порядке времени."""
+        lo = np.searchsorted(self.ts_sorted, to_epoch(start), side="left")
+        hi = np.searchsorted(self.ts_sorted, to_epoch(end), side="right")
+        return self.order[lo:hi]
+
+    def between(self, start, end):
+        """Показания в интервале [start, end] (включительно), упорядоченные по времени."""
+        return self._take(self.rows_between(start, end))
+
+    def days(self, first: Union[str, date], last: Union[str, date]):
+        """Показания за календарные дни с first по last включительно."""
+        lo = np.searchsorted(self.ts_sorted, _day_start(first), side="left")
+        hi = np.searchsorted(self.ts_sorted, _day_start(last) + DAY, side="left")
+        return self._take(self.order[lo:hi])
+
+    def day(self, d: Union[str, date]):
+        """Показания за один день ('2025-09-01'), упорядоченные по времени."""
+        return self.days(d, d)
+
+    def last_n(self, sensor: Union[str, Iterable[str]], n: int):
+        """
+        Последние n показаний сенсора (или группы сенсоров) по времени.
+        Для группы результат совпадает с sorted(..., key=ts)[-n:] по объединению.
+        """
+        if n <= 0:
+            return self._take(np.empty(0, dtype=np.int64))
+        sensor_ids = (sensor,) if isinstance(sensor, str) else tuple(sensor)
+        ts_parts, row_parts = [], []
+        for sid in sensor_ids:
+            ts, rows = self._sensor_rows.get(sid, (None, None))
+            if rows is not None:
+                ts_parts.append(ts[-n:])
+                row_parts.append(rows[-n:])
+        if not row_parts:
+            return self._take(np.empty(0, dtype=np.int64))
+        ts = np.concatenate(ts_parts)
+        rows = np.concatenate(row_parts)
+        picked = np.lexsort((rows, ts))[-n:]
+        return self._take(rows[picked])
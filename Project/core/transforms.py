@@ -1,7 +1,18 @@
 import json
 from functools import reduce
 from core.domain import Zone, PlantProfile, Sensor, Reading, Actuator,Rule # type: ignore
-def load_seed(path: str) -> tuple:
+from core.store import ReadingStore
+from core.catalog import Catalog
+from core.rollup import Rollup
+def load_seed(path: str, cache: bool = False) -> tuple:
+    """
+    Загружает датасет. С cache=True использует бинарный сайдкар (core.seedcache):
+    показания возвращаются как ReadingStore, отображённый в память.
+    """
+    if cache:
+        from core.seedcache import load_cached
+        return load_cached(path)
+
     with open(path, encoding="utf-8") as f:
         data = json.load(f)
     
@@ -16,7 +27,15 @@ def load_seed(path: str) -> tuple:
 def reading_stats(readings: tuple[Reading, ...],
                    sensors: tuple[Sensor, ...],
                    kind: str) -> dict:
-    sensor_kind = {s.id: s.kind for s in sensors}
+    if isinstance(readings, ReadingStore):
+        return readings.stats(kind, sensors)
+    if isinstance(readings, Rollup):
+        return readings.stats(kind=kind)
+
+    if isinstance(sensors, Catalog):
+        sensor_kind = sensors.kind_by_sensor
+    else:
+        sensor_kind = {s.id: s.kind for s in sensors}
 
     values = list(
         map(lambda r: r.value,filter(lambda r: sensor_kind[r.sensor_id] == kind, readings)))
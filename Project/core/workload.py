@@ -0,0 +1,304 @@
+"""
+Синтетическая нагрузка тепличного масштаба: каталог (теплицы, грядки, сенсоры,
+актуаторы, профили, правила) и поток показаний с суточным циклом, дрейфом,
+шумом и выбросами. Результат детерминирован для данного seed и не зависит
+от размера чанков; запись идёт на диск потоково, поэтому объём датасета
+ограничен только диском.
+
+    python -m core.workload data/big/seed.json --greenhouses 20 --beds 25 --days 30 --cadence 1 --sidecar
+    python -m core.workload data/big/readings.jsonl --days 30 --part-size 10000000
+"""
+import argparse
+import hashlib
+import json
+import math
+import os
+from dataclasses import asdict, dataclass, field
+from typing import Iterator, Mapping, Union
+
+import numpy as np
+
+from core.domain import Actuator, PlantProfile, Reading, Rule, Sensor, Zone
+from core.seedcache import CacheWriter
+from core.store import VALUE_DTYPE, to_epoch
+
+KINDS = ("temp", "hum_air", "hum_soil", "light", "co2")
+UNITS = {"temp": "°C", "hum_air": "%", "hum_soil": "%", "light": "lx", "co2": "ppm"}
+CENTER = {"temp": 21.5, "hum_air": 60, "hum_soil": 70, "light": 2250, "co2": 700}
+SPREAD = {"temp": 5, "hum_air": 14, "hum_soil": 14, "light": 1000, "co2": 400}
+# доля SPREAD в суточном цикле (максимум около 14:00); влажность воздуха и CO2 днём падают
+DIURNAL = {"temp": 0.6, "hum_air": -0.4, "hum_soil": 0.0, "light": 1.5, "co2": -0.3}
+# пределы физически возможных значений
+BOUNDS = {"temp": (-40, 60), "hum_air": (0, 100), "hum_soil": (0, 100), "light": (0, 100000), "co2": (0, 5000)}
+ACTUATOR_KINDS = ("pump", "fan", "heater", "lamp")
+
+DEFAULT_PROFILES = (
+    PlantProfile("p1", "Томат", (18, 25), (50, 70), (60, 80), (400, 1000), 2000),
+    PlantProfile("p2", "Салат", (15, 22), (60, 80), (65, 85), (350, 900), 1500),
+)
+# ~64K показаний на блок генерации; блок — единица детерминизма
+BLOCK_READINGS = 1 << 16
+
+
+@dataclass(frozen=True)
+class WorkloadSpec:
+    """
+    greenhouses теплиц по beds грядок; на каждой грядке sensors_per_kind сенсоров
+    каждого вида (число или {вид: число}). Показания — каждые cadence минут
+    (целое: метки в seed.json с точностью до минуты) в течение days дней от start.
+    noise, drift, diurnal — множители шума, дрейфа (долей SPREAD в сутки)
+    и суточного цикла; spike_rate — доля выбросов.
+    """
+    greenhouses: int = 2
+    beds: int = 4
+    sensors_per_kind: Union[int, Mapping[str, int]] = 1
+    kinds: tuple = KINDS
+    cadence: int = 10
+    days: float = 7.0
+    start: str = "2025-09-01 00:00"
+    noise: float = 1.0
+    drift: float = 0.05
+    diurnal: float = 1.0
+    spike_rate: float = 0.0
+    seed: int = 42
+    profiles: tuple = field(default=DEFAULT_PROFILES, repr=False)
+
+    def __post_init__(self):
+        if int(self.cadence) != self.cadence or self.cadence < 1 or self.days < 0 \
+                or self.greenhouses < 1 or self.beds < 0:
+            raise ValueError("cadence — целое число минут >= 1; days >= 0, greenhouses >= 1, beds >= 0")
+
+    def per_kind(self, kind: str) -> int:
+        if isinstance(self.sensors_per_kind, Mapping):
+            return self.sensors_per_kind.get(kind, 0)
+        return self.sensors_per_kind
+
+    @property
+    def steps(self) -> int:
+        return int(self.days * 1440 // self.cadence)
+
+    @property
+    def n_sensors(self) -> int:
+        return max(self.beds, 1) * self.greenhouses * sum(self.per_kind(k) for k in self.kinds)
+
+    @property
+    def n_readings(self) -> int:
+        return self.steps * self.n_sensors
+
+    @property
+    def block_steps(self) -> int:
+        return max(1, BLOCK_READINGS // max(self.n_sensors, 1))
+
+
+def build_catalog(spec: WorkloadSpec) -> tuple:
+    """(zones, profiles, sensors, actuators, rules) в порядке load_seed без показаний."""
+    zones, sensors, actuators = [], [], []
+    for g in range(spec.greenhouses):
+        house = Zone(f"z{g + 1}", f"Теплица {g + 1}")
+        zones.append(house)
+        beds = [Zone(f"z{g + 1}_{b + 1}", f"Грядка {b + 1} (Теплица {g + 1})", house.id) for b in range(spec.beds)]
+        zones.extend(beds)
+        for zone in beds or [house]:
+            d = 0
+            for kind in spec.kinds:
+                for _ in range(spec.per_kind(kind)):
+                    d += 1
+                    sensors.append(Sensor(f"s{len(sensors) + 1}", f"{zone.id}_d{d}", kind, UNITS.get(kind, ""),
+                                          zone.id))
+            for kind in ACTUATOR_KINDS:
+                d += 1
+                actuators.append(Actuator(f"a{len(actuators) + 1}", f"{zone.id}_d{d}", kind))
+
+    p = spec.profiles[0]
+    rules = [Rule(f"r{i + 1}", "range", {"param": kind, "min": lo, "max": hi})
+             for i, (kind, (lo, hi)) in enumerate((("temp", p.temp_range), ("hum_air", p.hum_air_range),
+                                                   ("hum_soil", p.hum_soil_range), ("co2", p.co2_range),
+                                                   ("light", (p.light_min, p.light_min * 1.5))))]
+    rules += [
+        Rule(f"r{len(rules) + 1}", "delta", {"param": "temp", "max_delta": 3}),
+        Rule(f"r{len(rules) + 2}", "stale", {"max_minutes": max(30, 3 * spec.cadence)}),
+        Rule(f"r{len(rules) + 3}", "priority", {"first": "temp", "second": "light"}),
+    ]
+    return tuple(zones), tuple(spec.profiles), tuple(sensors), tuple(actuators), tuple(rules)
+
+
+class _Model:
+    """Параметры сенсоров, разложенные по массивам (порядок — как в каталоге)."""
+
+    def __init__(self, spec: WorkloadSpec, sensors: tuple[Sensor, ...]):
+        rng = np.random.default_rng([spec.seed, 0])
+        n = len(sensors)
+        kinds = [s.kind for s in sensors]
+        spread = np.array([SPREAD.get(k, 1.0) for k in kinds])
+        self.base = np.array([CENTER.get(k, 0.0) for k in kinds]) + rng.normal(0, 0.1, n) * spread
+        self.amp = np.array([DIURNAL.get(k, 0.0) for k in kinds]) * spread * spec.diurnal
+        self.phase = rng.normal(0, 0.2, n)
+        self.drift = rng.normal(0, 1, n) * spread * spec.drift  # в сутки
+        self.sigma = spread * 0.1 * spec.noise
+        self.spike = spread * 3
+        self.lo = np.array([BOUNDS.get(k, (-np.inf, np.inf))[0] for k in kinds], dtype=np.float64)
+        self.hi = np.array([BOUNDS.get(k, (-np.inf, np.inf))[1] for k in kinds], dtype=np.float64)
+
+
+def column_chunks(spec: WorkloadSpec, sensors=None) -> Iterator[tuple[int, np.ndarray, np.ndarray, np.ndarray]]:
+    """
+    Показания блоками колонок (номер первого показания, sensor_idx, ts в секундах,
+    value с одним знаком после запятой). Порядок — по времени, внутри шага — по сенсорам.
+    """
+    if sensors is None:
+        sensors = build_catalog(spec)[2]
+    model = _Model(spec, sensors)
+    n = len(sensors)
+    t0 = to_epoch(spec.start)
+    step_s = int(spec.cadence) * 60
+    for block, first_step in enumerate(range(0, spec.steps, spec.block_steps)):
+        rng = np.random.default_rng([spec.seed, 1, block])
+        steps = np.arange(first_step, min(first_step + spec.block_steps, spec.steps))
+        seconds = t0 + steps.astype(np.int64) * step_s
+        days = (seconds - t0)[:, None] / 86400.0
+        day_frac = ((seconds % 86400) / 86400.0)[:, None]
+        value = (model.base
+                 + model.amp * np.sin(2 * math.pi * (day_frac - 0.333) + model.phase)
+                 + model.drift * days
+                 + rng.standard_normal((len(steps), n)) * model.sigma)
+        if spec.spike_rate:
+            spikes = rng.random((len(steps), n)) < spec.spike_rate
+            value += spikes * rng.choice((-1.0, 1.0), (len(steps), n)) * model.spike
+        value = np.round(np.clip(value, model.lo, model.hi), 1)
+        idx = np.broadcast_to(np.arange(n, dtype=np.int32), (len(steps), n))
+        ts = np.broadcast_to(seconds[:, None], (len(steps), n))
+        yield first_step * n, idx.ravel(), ts.ravel(), value.ravel()
+
+
+def _stamps(ts: np.ndarray) -> dict:
+    """{секунды: '2025-09-01 00:10'} для всех моментов блока."""
+    moments = np.unique(ts)
+    iso = np.datetime_as_string(moments.astype("datetime64[s]").astype("datetime64[m]"))
+    return dict(zip(moments.tolist(), (s.replace("T", " ") for s in iso.tolist())))
+
+
+def reading_chunks(spec: WorkloadSpec, sensors=None) -> Iterator[tuple[Reading, ...]]:
+    """Те же показания кортежами Reading (совместимо с core.lazy.iter_chunks)."""
+    if sensors is None:
+        sensors = build_catalog(spec)[2]
+    ids = [s.id for s in sensors]
+    for start, idx, ts, value in column_chunks(spec, sensors):
+        stamps = _stamps(ts)
+        yield tuple(Reading(f"r{start + i + 1}", ids[j], stamps[t], v)
+                    for i, (j, t, v) in enumerate(zip(idx.tolist(), ts.tolist(), value.tolist())))
+
+
+def _lines(sensors, start, idx, ts, value) -> list[str]:
+    ids = [json.dumps(s.id, ensure_ascii=False) for s in sensors]
+    stamps = {t: json.dumps(s) for t, s in _stamps(ts).items()}
+    return [f'{{"id":"r{start + i + 1}","sensor_id":{ids[j]},"ts":{stamps[t]},"value":{v!r}}}'
+            for i, (j, t, v) in enumerate(zip(idx.tolist(), ts.tolist(), value.tolist()))]
+
+
+def write_seed(path: str, spec: WorkloadSpec, sidecar: bool = False) -> str:
+    """
+    Пишет seed.json в формате load_seed: каталог, затем массив показаний (SeedStream
+    читает такой файл за один проход). sidecar=True заодно пишет бинарный кэш
+    core.seedcache, так что load_seed(path, cache=True) сразу открывает его через mmap.
+    """
+    zones, profiles, sensors, actuators, rules = catalog = build_catalog(spec)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    n = spec.n_readings
+    writer = None
+    if sidecar:
+        sections = dict(zip(("zones", "profiles", "sensors", "actuators", "rules"), catalog))
+        writer = CacheWriter(path, sections, [s.id for s in sensors], n, len(f"r{n}"))
+    digest = hashlib.sha256()
+
+    with open(path, "wb") as f:
+        def put(text: str) -> None:
+            data = text.encode("utf-8")
+            digest.update(data)
+            f.write(data)
+
+        head = {name: [asdict(x) for x in items] for name, items in
+                zip(("zones", "profiles", "sensors", "actuators", "rules"), catalog)}
+        put(json.dumps(head, ensure_ascii=False, separators=(",", ":"))[:-1] + ',"readings":[')
+        for start, idx, ts, value in column_chunks(spec, sensors):
+            rows = _lines(sensors, start, idx, ts, value)
+            put(("," if start else "") + ",".join(rows))
+            if writer is not None:
+                ids = np.array([f"r{start + i + 1}".encode() for i in range(len(idx))], dtype=f"S{writer.id_width}")
+                writer.write(start, idx, ts, value.astype(VALUE_DTYPE), ids)
+        put("]}")
+
+    if writer is not None:
+        st = os.stat(path)
+        writer.finish(st.st_size, st.st_mtime_ns, digest.digest())
+    return path
+
+
+def write_jsonl(path: str, spec: WorkloadSpec, part_size: int = 0) -> list[str]:
+    """
+    Показания в JSON Lines (core.loader.iter_jsonl_chunks), каталог — в <path>.catalog.json.
+    part_size > 0 — файлы-части name-00000.jsonl по part_size строк. Возвращает пути частей.
+    """
+    zones, profiles, sensors, actuators, rules = catalog = build_catalog(spec)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    root, ext = os.path.splitext(path)
+    with open(root + ".catalog.json", "w", encoding="utf-8") as f:
+        json.dump({name: [asdict(x) for x in items] for name, items in
+                   zip(("zones", "profiles", "sensors", "actuators", "rules"), catalog)}, f, ensure_ascii=False)
+
+    paths = []
+    f = None
+    written = 0
+    try:
+        for start, idx, ts, value in column_chunks(spec, sensors):
+            rows = _lines(sensors, start, idx, ts, value)
+            while rows:
+                if f is None or (part_size and written >= part_size):
+                    if f is not None:
+                        f.close()
+                    paths.append(f"{root}-{len(paths):05d}{ext}" if part_size else path)
+                    f = open(paths[-1], "w", encoding="utf-8")
+                    written = 0
+                take = len(rows) if not part_size else part_size - written
+                f.write("\n".join(rows[:take]) + "\n")
+                written += len(rows[:take])
+                rows = rows[take:]
+    finally:
+        if f is not None:
+            f.close()
+    if not paths:
+        open(path, "w").close()
+        paths.append(path)
+    return paths
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", help="seed.json (формат load_seed) или *.jsonl")
+    parser.add_argument("--greenhouses", type=int, default=2)
+    parser.add_argument("--beds", type=int, default=4)
+    parser.add_argument("--sensors-per-kind", type=int, default=1)
+    parser.add_argument("--cadence", type=int, default=10, help="минут между показаниями")
+    parser.add_argument("--days", type=float, default=7.0)
+    parser.add_argument("--start", default="2025-09-01 00:00")
+    parser.add_argument("--noise", type=float, default=1.0)
+    parser.add_argument("--drift", type=float, default=0.05)
+    parser.add_argument("--diurnal", type=float, default=1.0)
+    parser.add_argument("--spike-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--sidecar", action="store_true", help="сразу записать бинарный кэш seed.json.bin")
+    parser.add_argument("--part-size", type=int, default=0, help="строк в части .jsonl (0 — один файл)")
+    args = parser.parse_args(argv)
+
+    spec = WorkloadSpec(args.greenhouses, args.beds, args.sensors_per_kind, KINDS, args.cadence, args.days,
+                        args.start, args.noise, args.drift, args.diurnal, args.spike_rate, args.seed)
+    print(f"сенсоров {spec.n_sensors}, шагов {spec.steps}, показаний {spec.n_readings:,}")
+    if args.path.endswith((".jsonl", ".ndjson")):
+        paths = write_jsonl(args.path, spec, args.part_size)
+    else:
+        paths = [write_seed(args.path, spec, args.sidecar)]
+    for p in paths:
+        print(p)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+from typing import Iterable, Optional
+
+from core.domain import Zone, Sensor
+
+
+class ZoneTree:
+    """
+    Иерархия зон (теплица → грядки → ...), построенная один раз.
+    Итеративный обход в глубину даёт интервалы Эйлерова обхода [tin, tout):
+    поддерево зоны — непрерывный срез order, проверка вложенности — O(1).
+    Рекурсии нет, поэтому глубина иерархии не ограничена.
+    """
+
+    def __init__(self, zones: Iterable[Zone]):
+        self.zones = tuple(zones)
+        self.zone_by_id = {z.id: z for z in self.zones}
+        self.parent = {z.id: z.parent_id for z in self.zones}
+        self.children: dict[Optional[str], list[str]] = {}
+        for z in self.zones:
+            self.children.setdefault(z.parent_id, []).append(z.id)
+
+        # корни: без родителя или с родителем, которого нет в списке зон
+        self.roots = tuple(z.id for z in self.zones
+                           if z.parent_id is None or z.parent_id not in self.zone_by_id)
+        self.order: list[str] = []
+        self.tin: dict[str, int] = {}
+        self.tout: dict[str, int] = {}
+        for root in self.roots:
+            self._tour(root)
+
+    def _tour(self, root: str) -> None:
+        stack = [(root, False)]
+        while stack:
+            zid, done = stack.pop()
+            if done:
+                self.tout[zid] = len(self.order)
+                continue
+            if zid in self.tin:  # защита от циклов в данных
+                continue
+            self.tin[zid] = len(self.order)
+            self.order.append(zid)
+            stack.append((zid, True))
+            for child in reversed(self.children.get(zid, ())):
+                stack.append((child, False))
+
+    def descendants(self, zone_id: str) -> tuple[str, ...]:
+        """Зона и все её потомки в порядке обхода в глубину — O(k)."""
+        if zone_id in self.tin:
+            return tuple(self.order[self.tin[zone_id]:self.tout[zone_id]])
+        # неизвестный id, на который ссылаются зоны как на родителя
+        result = [zone_id]
+        for child in self.children.get(zone_id, ()):
+            if child in self.tin:
+                result.extend(self.order[self.tin[child]:self.tout[child]])
+        return tuple(result)
+
+    def is_descendant(self, zone_id: str, ancestor_id: str) -> bool:
+        """True, если zone_id лежит в поддереве ancestor_id (включая саму зону) — O(1)."""
+        if zone_id not in self.tin or ancestor_id not in self.tin:
+            return zone_id == ancestor_id
+        return self.tin[ancestor_id] <= self.tin[zone_id] < self.tout[ancestor_id]
+
+    def ancestors(self, zone_id: str) -> tuple[str, ...]:
+        """Цепочка от зоны до корня: ('z1_2', 'z1') — O(глубины)."""
+        chain = []
+        zid: Optional[str] = zone_id
+        while zid is not None and zid not in chain:
+            chain.append(zid)
+            zid = self.parent.get(zid)
+        return tuple(chain)
+
+    def sensors_under(self, zone_id: str, sensors) -> tuple[Sensor, ...]:
+        """Сенсоры с zone_id внутри поддерева (индекс Catalog.sensors_by_zone используется, если есть)."""
+        by_zone = getattr(sensors, "sensors_by_zone", None)
+        if by_zone is None:
+            by_zone = {}
+            for s in sensors:
+                by_zone.setdefault(s.zone_id, []).append(s)
+        result = []
+        for zid in self.descendants(zone_id):
+            result.extend(by_zone.get(zid, ()))
+        return tuple(result)
@@ -0,0 +1,88 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import pytest
+from core.alerts import AlertEngine, AlertRule, profile_rules
+from core.domain import PlantProfile
+from core.service import AlertService
+from core.service_support import clear_alert, raise_alert, rule_temp_high, select_snapshot
+
+TEMP_HIGH = AlertRule("TEMP_HIGH", "temp", raise_at=25, clear_at=20, raise_after=600, clear_after=300,
+                      clear_code="TEMP_CLEAR")
+
+
+def snap(zone, minute, temp):
+    return {"zone": zone, "ts": f"2025-09-01 10:{minute:02d}", "temp": temp}
+
+
+def test_hysteresis_and_hold_off():
+    engine = AlertEngine([TEMP_HIGH])
+    codes = []
+    for minute, temp in [(0, 28), (5, 29), (9, 27), (10, 26), (11, 30), (12, 22), (13, 19), (15, 26), (17, 18),
+                         (22, 18), (30, 18)]:
+        codes.append([(a.code, a.ts) for a in engine.evaluate(snap("z1", minute, temp))])
+    # подъём через 10 минут непрерывного превышения, снятие — через 5 минут ниже 20,
+    # возврат в полосу гистерезиса или выше порога сбрасывает ожидание снятия
+    assert [c for c in codes if c] == [[("TEMP_HIGH", "2025-09-01 10:10")], [("TEMP_CLEAR", "2025-09-01 10:22")]]
+    assert len(engine) == 0
+
+
+def test_batch_emits_transitions_only():
+    rule = AlertRule("TEMP_HIGH", "temp", 25, 20)
+    engine = AlertEngine([rule, AlertRule("HUM_LOW", "hum_air", 40, 45, above=False)], capacity=2)
+    zones = [f"z{i}" for i in range(1000)]
+    batch = [{"zone": z, "temp": 30 if i % 3 == 0 else 22, "hum_air": 35 if i % 5 == 0 else None}
+             for i, z in enumerate(zones)]
+    first = engine.evaluate_batch(batch, now="2025-09-01 10:00")
+    assert len(first) == 334 + 200 and len(engine) == 534
+    assert first[0].id == "temp_high_z0_1" and first[1].code == "HUM_LOW"
+    assert engine.evaluate_batch(batch, now="2025-09-01 10:01") == ()
+
+    cooled = [{**s, "temp": 19} for s in batch]
+    cleared = engine.evaluate_batch(cooled, now="2025-09-01 10:02")
+    assert len(cleared) == 334 and {a.code for a in cleared} == {"TEMP_HIGH_CLEAR"}
+    assert cleared[0].id == "temp_high_z0_1_cleared"
+    assert ("z5", "HUM_LOW") in engine.active_alerts() and len(engine.active_alerts()) == 200
+
+
+def test_profile_rules_and_validation():
+    profile = PlantProfile(id="p1", name="Томат", temp_range=(20, 30), hum_air_range=(50, 70),
+                           hum_soil_range=(30, 60), light_min=1000, co2_range=(400, 800))
+    rules = {r.code: r for r in profile_rules(profile, band=0.1)}
+    assert len(rules) == 9 and (rules["TEMP_HIGH"].raise_at, rules["TEMP_HIGH"].clear_at) == (30, 29)
+    assert not rules["LIGHT_LOW"].above and rules["LIGHT_LOW"].clear_at == pytest.approx(1100)
+    with pytest.raises(ValueError):
+        AlertRule("BAD", "temp", raise_at=20, clear_at=25)
+
+
+def test_alert_service_deduplicates():
+    service = AlertService(rules=(rule_temp_high,), raiser=raise_alert, clearer=clear_alert,
+                           engine=AlertEngine([AlertRule("HUM_HIGH", "hum_air", 50, 45)]))
+    snapshot = select_snapshot({}, "zone1")
+    first = service.evaluate_alerts(snapshot)
+    assert [a.code for a in first] == ["TEMP_HIGH", "HUM_HIGH"] and first[0].id == "temp_high_zone1_1"
+    assert service.evaluate_alerts(snapshot) == ()
+    batch = service.evaluate_batch([select_snapshot({}, z) for z in ("zone1", "zone2")])
+    assert [(a.zone_id, a.code) for a in batch] == [("zone2", "TEMP_HIGH"), ("zone2", "HUM_HIGH")]
+    cleared = service.evaluate_alerts({**snapshot, "temp": 15, "hum_air": 40})
+    assert [a.code for a in cleared] == ["TEMP_CLEAR", "HUM_HIGH_CLEAR"]
+    assert cleared[0].id == "temp_high_zone1_1_cleared"
+    again = service.evaluate_alerts(snapshot)  # повторный подъём — новый эпизод, как у движка
+    assert [a.id for a in again] == ["temp_high_zone1_2", "hum_high_zone1_2"]
+
+
+def test_duplicate_zones_fold_in_order():
+    engine = AlertEngine([AlertRule("TEMP_HIGH", "temp", 25, 20)])
+    batch = [snap("z1", 0, 30), snap("z2", 0, 30), snap("z1", 1, 31), snap("z1", 2, 18), snap("z1", 3, 29)]
+    alerts = engine.evaluate_batch(batch)
+    assert [(a.zone_id, a.code, a.ts) for a in alerts] == [
+        ("z1", "TEMP_HIGH", "2025-09-01 10:00"), ("z2", "TEMP_HIGH", "2025-09-01 10:00"),
+        ("z1", "TEMP_HIGH_CLEAR", "2025-09-01 10:02"), ("z1", "TEMP_HIGH", "2025-09-01 10:03")]
+    assert engine.active_alerts() == (("z1", "TEMP_HIGH"), ("z2", "TEMP_HIGH"))
+    assert [a.id for a in alerts if a.zone_id == "z1"] == ["temp_high_z1_1", "temp_high_z1_1_cleared",
+                                                           "temp_high_z1_2"]
+    # подъём, снятие и повторный подъём в одну и ту же секунду — всё равно разные id
+    burst = engine.evaluate_batch([{"zone": "z3", "temp": t} for t in (30, 18, 30, 18)], now="2025-09-01 11:00")
+    assert len({a.id for a in burst}) == 4
+    single = AlertEngine([AlertRule("TEMP_HIGH", "temp", 25, 20)])
+    assert [a.code for s in batch for a in single.evaluate(s)] == [a.code for a in alerts]
@@ -0,0 +1,117 @@
+import sys
+import os
+import asyncio
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import pytest
+from core.asyncbus import AsyncEventBus, QueueFull, TopicConfig
+from core.frp import EventBus, handle_reading, handle_actuate
+
+
+def test_sync_bus_ids_are_unique():
+    bus = EventBus()
+    ids = {bus.publish("READING", {"sensor": "s1", "value": i}).id for i in range(50)}
+    assert len(ids) == 50 and bus.seq == 50
+
+
+def test_batches_and_legacy_adapter():
+    async def run():
+        bus = AsyncEventBus(batch_size=8)
+        sizes = []
+        bus.subscribe("READING", lambda events, store: sizes.append(len(events)))
+        bus.subscribe_each("READING", handle_reading)
+        bus.subscribe_each("ACTUATE", handle_actuate)
+        events = [bus.publish_nowait("READING", {"sensor": "s1", "value": i}) for i in range(20)]
+        await bus.publish("ACTUATE", {"device": "lamp", "action": "ON"})
+        async with bus:
+            pass
+        return bus, events, sizes
+
+    bus, events, sizes = asyncio.run(run())
+    seqs = [int(e.id.rsplit("_", 1)[1]) for e in events]
+    assert seqs == sorted(seqs) and len(set(seqs)) == 20
+    assert sizes == [8, 8, 4]
+    assert [r["value"] for r in bus.store["readings"]] == list(range(20))
+    assert bus.store["commands"][0]["device"] == "lamp"
+    m = bus.metrics()["READING"]
+    assert m["delivered"] == 20 and m["depth"] == 0 and m["batches"] == 3 and m["last_seq"] == seqs[-1]
+
+
+@pytest.mark.parametrize("policy, kept, dropped", [("drop_newest", [0, 1, 2], 2), ("drop_oldest", [2, 3, 4], 2)])
+def test_drop_policies(policy, kept, dropped):
+    async def run():
+        bus = AsyncEventBus()
+        bus.configure("READING", maxsize=3, policy=policy)
+        bus.subscribe_each("READING", handle_reading)
+        for i in range(5):
+            bus.publish_nowait("READING", {"sensor": "s1", "value": i})
+        async with bus:
+            pass
+        return bus
+
+    bus = asyncio.run(run())
+    assert [r["value"] for r in bus.store["readings"]] == kept
+    assert bus.metrics()["READING"]["dropped"] == dropped
+
+
+def test_block_policy_applies_backpressure():
+    async def run():
+        bus = AsyncEventBus(maxsize=2, batch_size=1)
+        seen = []
+
+        async def slow(events, store):
+            await asyncio.sleep(0)
+            seen.extend(e.payload["i"] for e in events)
+
+        bus.subscribe("T", slow)
+        with pytest.raises(QueueFull):
+            for i in range(3):
+                bus.publish_nowait("T", {"i": i})
+        async with bus:
+            for i in range(2, 10):
+                await bus.publish("T", {"i": i})
+                assert bus.metrics()["T"]["depth"] <= 2
+        return seen
+
+    assert asyncio.run(run()) == list(range(10))
+
+
+def test_handler_errors_are_counted():
+    async def run():
+        bus = AsyncEventBus()
+
+        def broken(events, store):
+            raise RuntimeError("boom")
+
+        bus.subscribe("T", broken)
+        bus.subscribe_each("T", lambda e, store: {**store, "n": store.get("n", 0) + 1})
+        async with bus:
+            await bus.publish("T", {})
+        return bus
+
+    bus = asyncio.run(run())
+    assert bus.metrics()["T"]["errors"] == 1 and bus.store["n"] == 1
+    with pytest.raises(ValueError):
+        TopicConfig(policy="unknown")
+
+
+def test_blocked_publisher_keeps_sequence_order():
+    async def run():
+        bus = AsyncEventBus(maxsize=1, batch_size=1)
+        seen = []
+        bus.subscribe("T", lambda events, store: seen.extend(e.payload["i"] for e in events))
+        await bus.publish("T", {"i": 1})
+        blocked = asyncio.create_task(bus.publish("T", {"i": 2}))
+        await asyncio.sleep(0)
+        with pytest.raises(QueueFull):  # ждущую публикацию не обгоняют
+            bus.publish_nowait("T", {"i": 0})
+        await bus.start()
+        await asyncio.sleep(0)  # потребитель освободил место, ждущий ещё не проснулся
+        third = await bus.publish("T", {"i": 3})
+        second = await blocked
+        await bus.stop()
+        return bus, seen, second, third
+
+    bus, seen, second, third = asyncio.run(run())
+    assert seen == [1, 2, 3]
+    assert second.id == "t_2" and third.id == "t_3"
+    assert bus.metrics()["T"]["last_seq"] == 3
@@ -0,0 +1,32 @@
+import sys
+import os
+import asyncio
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core.catalog import Catalog
+from core.pipeline import process_reading
+from core.report import simulate_day
+from core.transforms import load_seed, reading_stats
+
+SEED = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "seed.json")
+
+
+def test_indexes():
+    seed = load_seed(SEED)
+    catalog = Catalog.from_seed(seed)
+    assert catalog.sensor("s3").kind == "hum_soil"
+    assert catalog.sensor("nope") is None
+    assert [s.id for s in catalog.sensors_by_kind["temp"]] == ["s1", "s6", "s11"]
+    assert [a.id for a in catalog.actuators_by_kind["pump"]] == ["a1", "a5"]
+    assert tuple(catalog) == seed[2]
+
+
+def test_catalog_in_place_of_sensors():
+    seed = load_seed(SEED)
+    zones, profiles, sensors, actuators, readings, rules = seed
+    catalog = Catalog.from_seed(seed)
+    assert reading_stats(readings, catalog, "co2") == reading_stats(readings, sensors, "co2")
+    for r in readings[:40]:
+        assert process_reading(r, catalog, rules, {}, profiles[0]) == process_reading(r, sensors, rules, {}, profiles[0])
+    fast = asyncio.run(simulate_day("2025-09-01", readings[:200], zones, catalog, profiles, rules))
+    slow = asyncio.run(simulate_day("2025-09-01", readings[:200], zones, sensors, profiles, rules))
+    assert fast == slow
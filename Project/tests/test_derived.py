@@ -0,0 +1,61 @@
+import sys
+import os
+import shutil
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from datetime import datetime
+from core.derived import DerivedData, dataset_version
+from core.rules import RuleEngine
+from core.transforms import load_seed
+from core.workload import WorkloadSpec, write_seed
+
+SEED = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "seed.json")
+
+
+def test_derived_matches_seed(tmp_path):
+    path = str(tmp_path / "seed.json")
+    shutil.copy(SEED, path)
+    derived = DerivedData.load(path)
+    zones, profiles, sensors, actuators, readings, rules = load_seed(path)
+    assert derived.version == dataset_version(path)
+    assert derived.sensor_ids == tuple(s.id for s in sensors)
+    assert derived.sensor_kinds == tuple(sorted({s.kind for s in sensors}))
+    assert derived.sensors_of_kind("hum_soil") == tuple(s for s in sensors if s.kind == "hum_soil")
+
+    kind = {s.id: s.kind for s in sensors}
+    for i in (0, 7, len(readings) - 1):
+        r, c = readings[i], derived.control_reading(i)
+        assert (c.id, c.sensor_id, c.kind, c.value) == (r.id, r.sensor_id, kind[r.sensor_id], r.value)
+        assert c.ts == datetime.strptime(r.ts, "%Y-%m-%d %H:%M")
+
+    # движок правил получает то же, что из прежних объектов type("R", ...)
+    a, b = RuleEngine(rules, sensors), RuleEngine(rules, derived.catalog)
+    for i in range(200):
+        assert a.feed(readings[i]) == b.feed(derived.control_reading(i))
+
+
+def test_zone_sets_and_version(tmp_path):
+    spec = WorkloadSpec(greenhouses=2, beds=2, sensors_per_kind={"temp": 1, "hum_soil": 1}, days=1, cadence=60)
+    path = write_seed(str(tmp_path / "seed.json"), spec)
+    derived = DerivedData.load(path)
+    for root in derived.zone_tree.roots:
+        ids = derived.zone_sensor_ids(root)
+        assert ids == {s.id for s in derived.zone_tree.sensors_under(root, derived.catalog)} and len(ids) == 4
+        assert derived.zone_sensor_ids(root) is ids  # построено один раз
+
+    version = derived.version
+    write_seed(path, WorkloadSpec(**{**vars(spec), "days": 2}))
+    assert dataset_version(path) != version
+
+
+def test_soil_forecaster_built_once_per_dataset(tmp_path):
+    from core.forecast import SoilForecaster
+    path = str(tmp_path / "seed.json")
+    shutil.copy(SEED, path)
+    derived = DerivedData.load(path)
+    forecaster = derived.soil_forecaster
+    assert derived.soil_forecaster is forecaster
+    readings = sorted(load_seed(SEED)[4], key=lambda r: r.ts)
+    soil = {s.id for s in derived.sensors_of_kind("hum_soil")}
+    expected = SoilForecaster().extend(r for r in readings if r.sensor_id in soil)
+    for sid in soil:
+        assert forecaster.forecast(sid) == expected.forecast(sid)
@@ -0,0 +1,87 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import pytest
+from core.eventlog import EventLog, LoggedEventBus
+from core.frp import handle_reading, handle_mode_tick
+
+
+def _bus(directory, **options):
+    log = EventLog(str(directory), fsync=False, **{k: v for k, v in options.items() if k != "snapshot_every"})
+    bus = LoggedEventBus(log, snapshot_every=options.get("snapshot_every", 0))
+    bus.subscribe("READING", handle_reading)
+    bus.subscribe("MODE_TICK", handle_mode_tick)
+    bus.recover()
+    return bus
+
+
+def test_replay_restores_store(tmp_path):
+    bus = _bus(tmp_path, group_size=7, segment_bytes=600)
+    for i in range(50):
+        bus.publish("READING", {"sensor": f"s{i % 3}", "value": i})
+    bus.publish("MODE_TICK", {"mode": "AUTO"})
+    bus.log.close()
+    assert len(bus.log.segments()) > 1
+
+    again = _bus(tmp_path)
+    assert again.seq == 51
+    assert [r["value"] for r in again.store["readings"]] == list(range(50))
+    assert again.store["mode"]["mode"] == "AUTO"
+    event = again.publish("READING", {"sensor": "s1", "value": 99})
+    assert event.id.endswith("_52")
+
+
+def test_snapshot_and_compaction(tmp_path):
+    bus = _bus(tmp_path, group_size=5, segment_bytes=300, snapshot_every=20)
+    for i in range(65):
+        bus.publish("READING", {"sensor": "s1", "value": i})
+    bus.log.close()
+    assert len(bus.log.snapshots()) == 1
+    first_kept = bus.log.segments()[0][0]
+    assert first_kept > 1  # старые сегменты удалены
+
+    again = _bus(tmp_path)
+    assert again.seq == 65
+    assert [r["value"] for r in again.store["readings"]] == list(range(65))
+    assert again.store["readings_by_sensor"].get("s1").total == 65
+
+
+def test_torn_tail_is_dropped(tmp_path):
+    bus = _bus(tmp_path, group_size=1)
+    for i in range(3):
+        bus.publish("READING", {"sensor": "s1", "value": i})
+    bus.log.close()
+    path = bus.log.segments()[-1][1]
+    with open(path, "ab") as f:
+        f.write(b'{"seq":4,"id":"reading_')
+    again = _bus(tmp_path)
+    assert again.seq == 3
+    assert [r["value"] for r in again.store["readings"]] == [0, 1, 2]
+
+
+def test_sequence_must_grow(tmp_path):
+    bus = _bus(tmp_path, group_size=1)
+    bus.publish("READING", {"sensor": "s1", "value": 1})
+    bus.log.close()
+    log = EventLog(str(tmp_path), fsync=False)
+    with pytest.raises(ValueError):
+        log.append(1, bus.make_event("READING", {}))
+
+
+def test_single_writer_per_directory(tmp_path):
+    bus = _bus(tmp_path, group_size=1)
+    with pytest.raises(RuntimeError):
+        EventLog(str(tmp_path), fsync=False)
+    bus.log.close()
+    EventLog(str(tmp_path), fsync=False).close()  # после close каталог свободен
+
+
+def test_threads_share_one_bus(tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+    bus = _bus(tmp_path, group_size=3, snapshot_every=25)
+    with ThreadPoolExecutor(4) as pool:
+        list(pool.map(lambda i: bus.publish("READING", {"sensor": f"s{i % 4}", "value": i}), range(200)))
+    bus.log.close()
+    with EventLog(str(tmp_path), fsync=False) as log:
+        seqs = [seq for seq, _ in log.replay()]
+    assert seqs == sorted(set(seqs)) and bus.seq == 200
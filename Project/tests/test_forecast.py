@@ -0,0 +1,113 @@
+import sys
+import os
+import random
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import numpy as np
+import pytest
+from core.domain import Reading
+from core.forecast import (ForecastCache, SoilForecaster, TrendState, soil_humidity_forecast, FORECAST_CACHE,
+                           forecast_batch, forecast_series)
+from core.report import make_daily_readings
+from core.store import from_epoch, to_epoch
+
+
+def reference(readings, window=24, fit_window=None):
+    """Прежняя реализация: полный пересчёт EWMA в цикле и np.polyfit (по последним fit_window точкам)."""
+    readings = sorted(readings, key=lambda r: r.ts)
+    y = [r.value for r in readings]
+    smoothed = [y[0]]
+    for v in y[1:]:
+        smoothed.append(0.8 * v + 0.2 * smoothed[-1])
+    smoothed = smoothed[-fit_window:] if fit_window else smoothed
+    trend = np.poly1d(np.polyfit(np.arange(len(smoothed)), smoothed, 1))
+    forecast = trend(np.arange(len(smoothed), len(smoothed) + window))
+    forecast = forecast + 2 * np.sin(2 * np.pi * np.arange(window) / 24)
+    return tuple(np.round(np.clip(forecast, 0, 100), 2))
+
+
+def _series(n, seed, sensor="s3"):
+    rnd = random.Random(seed)
+    t0 = to_epoch("2025-09-01 00:00")
+    return [Reading(f"r{i}", sensor, from_epoch(t0 + 600 * i), round(rnd.uniform(40, 90), 1)) for i in range(n)]
+
+
+@pytest.mark.parametrize("n", [2, 5, 24, 60])
+def test_matches_reference(n):
+    for seed in range(10):
+        rs = _series(n, seed)
+        got = soil_humidity_forecast(f"test|{n}|{seed}", tuple(rs), 24)
+        assert np.max(np.abs(np.array(got) - np.array(reference(rs)))) <= 0.01 + 1e-9
+
+
+def test_sliding_state_matches_window_refit():
+    rs = _series(500, 1)
+    state = TrendState(fit_window=24)
+    for i, r in enumerate(rs):
+        state.update(r.ts, r.value)
+        if i >= 23 and i % 37 == 0:
+            # EWMA идёт по всему ряду, тренд — по последним 24 сглаженным точкам
+            assert np.allclose(state.forecast(24), reference(rs[:i + 1], fit_window=24), atol=0.01 + 1e-9)
+
+
+def test_forecaster_cache_hits_and_bound():
+    fc = SoilForecaster(cache_size=2).extend(_series(30, 2, "s3") + _series(30, 3, "s8"))
+    first = fc.forecast("s3")
+    assert fc.forecast("s3") == first
+    assert fc.cache.info()["hits"] == 1 and fc.cache.info()["misses"] == 1
+    fc.forecast("s8")
+    fc.forecast("s3", window=12)
+    assert len(fc.cache) == 2
+    fc.update("s3", "2025-09-02 00:00", 50.0)
+    assert fc.forecast("s3") != first
+    with pytest.raises(ValueError):
+        fc.update("s3", "2025-09-01 00:00", 50.0)
+
+
+def test_function_cache_hits():
+    rs = tuple(_series(24, 404))  # ряд, которого нет в других тестах: кэш адресуется содержимым
+    before = FORECAST_CACHE.info()["hits"]
+    soil_humidity_forecast("hit|z1", rs)
+    soil_humidity_forecast("hit|z1", make_daily_readings("2025-09-01", rs))
+    assert FORECAST_CACHE.info()["hits"] == before + 1
+    assert ForecastCache(1).get("missing") is None
+
+
+def test_function_cache_is_content_addressed():
+    rising = tuple(_series(24, 8))
+    falling = tuple(r.__class__(r.id, r.sensor_id, r.ts, 130 - r.value) for r in rising)
+    up = soil_humidity_forecast("same|key", rising)
+    down = soil_humidity_forecast("same|key", falling)
+    assert up != down and down == reference(falling)
+    assert soil_humidity_forecast("same|key", rising[1:]) == reference(rising[1:])
+
+
+def test_make_daily_readings_returns_readings():
+    rs = _series(200, 5)
+    daily = make_daily_readings("2025-09-01", rs)
+    assert daily and all(type(r) is Reading for r in daily)
+    assert make_daily_readings("2025-09-01", [r.__dict__ for r in rs]) == daily
+
+
+def test_batch_matches_single_series():
+    series = [_series(n, 10 + n) for n in (0, 1, 2, 7, 24, 40)]
+    got = forecast_series(series)
+    assert got[0] == ()
+    for s, f in zip(series[1:], got[1:]):
+        last = s[-24:]
+        assert f == soil_humidity_forecast(f"batch|{len(s)}", tuple(last))
+    raw = forecast_batch(np.array([[50.0, 52.0, 54.0], [60.0, 0.0, 0.0]]), np.array([3, 1]), window=4)
+    assert raw.shape == (2, 4)
+
+
+def test_report_uses_batched_forecasts():
+    from core.catalog import Catalog
+    from core.domain import PlantProfile, Sensor
+    from core.report import partition_readings, report_days, zone_report
+    sensors = Catalog(sensors=(Sensor("s3", "d3", "hum_soil", "%", "z1"), Sensor("s8", "d8", "hum_soil", "%", "z2")))
+    profile = PlantProfile("p1", "Томат", (18, 25), (50, 70), (60, 80), (400, 1000), 1500)
+    readings = _series(60, 6, "s3") + _series(30, 7, "s8")
+    parts = partition_readings(readings, sensors)
+    (day_report,) = report_days(["2025-09-01"], parts, sensors, (profile,), ())
+    for zone_id, data in day_report["zones"].items():
+        single = zone_report("2025-09-01", zone_id, parts["2025-09-01"][zone_id], sensors, (profile,), ())
+        assert data["forecast"] == single["forecast"]
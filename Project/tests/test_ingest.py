@@ -0,0 +1,97 @@
+import sys
+import os
+import asyncio
+import json
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core.asyncbus import AsyncEventBus
+from core.domain import PlantProfile, Sensor
+from core.frp import EventBus, handle_reading
+from core.ingest import IngestServer, Ingestor, load_tcp, load_udp, make_batches
+from core.pipeline import process_reading
+
+SENSORS = (Sensor("s1", "d1", "temp", "C", "z1"), Sensor("s2", "d2", "hum_soil", "%", "z1"))
+PROFILE = PlantProfile("p1", "Томат", (18, 26), (50, 70), (60, 80), (400, 800), 200)
+
+
+def test_handle_follows_process_reading():
+    bus = EventBus()
+    bus.subscribe("READING", handle_reading)
+    ingestor = Ingestor(bus, SENSORS, PROFILE)
+    readings = [
+        {"sensor_id": "s1", "value": 22, "ts": "2025-09-01 10:00"},
+        {"sensor_id": "s1", "value": 40.5, "ts": "2025-09-01 10:01"},
+        {"sensor_id": "nope", "value": 1, "ts": "2025-09-01 10:02"},
+        {"sensor_id": "s2", "value": "сыро", "ts": "2025-09-01 10:03"},
+        "мусор",
+    ]
+    ack, payloads = ingestor.handle(json.dumps({"batch": 7, "readings": readings}).encode())
+    assert ack == {"batch": 7, "accepted": 2, "rejected": 3}
+    expected = [process_reading(r, SENSORS, (), {}, PROFILE)["status"] for r in readings[:2]]
+    assert [p["status"] for p in payloads] == expected == ["ok", "warning"]
+    assert payloads[0] == {"sensor": "s1", "value": 22, "ts": "2025-09-01 10:00", "zone": "z1", "status": "ok"}
+
+    asyncio.run(ingestor.publish(payloads))
+    assert [r["value"] for r in bus.store["readings"]] == [22, 40.5]
+    assert bus.store["readings_by_zone"].latest("z1")[-1]["sensor"] == "s1"
+
+    ack, _ = ingestor.handle(b"{not json")
+    assert ack["accepted"] == 0 and "error" in ack
+    m = ingestor.metrics()
+    assert m["batches"] == 2 and m["readings"] == 5 and m["malformed"] == 3
+    assert m["statuses"] == {"ok": 1, "warning": 1, "error": 1}
+
+
+def test_wrong_shapes_get_error_ack():
+    ingestor = Ingestor(EventBus(), SENSORS, PROFILE)
+    ack, payloads = ingestor.handle(b'{"readings":5}')
+    assert "error" in ack and payloads == []
+    ack, payloads = ingestor.handle(json.dumps([
+        {"sensor_id": ["s1"], "value": 1, "ts": "2025-09-01 10:00"},
+        {"sensor_id": "s1", "value": 1, "ts": [1]},
+        {"sensor_id": "s1", "value": 20, "ts": "2025-09-01 10:00"},
+    ]).encode())
+    assert ack == {"batch": None, "accepted": 1, "rejected": 2}
+    assert ingestor.metrics()["malformed"] == 3
+
+    async def run():
+        async with IngestServer(ingestor) as server:
+            reader, writer = await asyncio.open_connection(server.host, server.port)
+            acks = []
+            for line in (b'{"readings":5}\n', b'{"sensor_id":"s1","value":21,"ts":"2025-09-01 10:00"}\n'):
+                writer.write(line)
+                acks.append(json.loads(await reader.readline()))
+            writer.close()
+            return acks
+
+    bad, good = asyncio.run(run())  # соединение переживает битый пакет
+    assert "error" in bad and good["accepted"] == 1
+
+
+def _run_load(protocol):
+    async def run():
+        bus = AsyncEventBus(maxsize=64, batch_size=16)
+        bus.subscribe_each("READING", handle_reading)
+        ingestor = Ingestor(bus, SENSORS, PROFILE)
+        batches = make_batches(["s1", "s2", "s3"], 300, 25)
+        async with bus, IngestServer(ingestor, udp_port=0) as server:
+            if protocol == "tcp":
+                report = await load_tcp(server.host, server.port, batches, 300, window=4)
+            else:
+                report = await load_udp(server.host, server.udp_port, batches, 300, window=4)
+        return bus, report
+
+    return asyncio.run(run())
+
+
+def test_tcp_roundtrip():
+    bus, report = _run_load("tcp")
+    # s3 нет в справочнике — каждое третье показание отклонено
+    assert report.acked == 12 and report.accepted == 200 and report.rejected == 100
+    assert len(report.latencies) == 12 and report.percentiles()[50] > 0
+    assert bus.metrics()["READING"]["delivered"] == 200
+
+
+def test_udp_roundtrip():
+    bus, report = _run_load("udp")
+    assert report.acked == 12 and report.accepted == 200
+    assert bus.metrics()["READING"]["delivered"] == 200
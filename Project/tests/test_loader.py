@@ -0,0 +1,42 @@
+import sys
+import os
+import json
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core.loader import SeedStream, iter_reading_chunks
+from core.lazy import iter_chunks, with_kind, lazy_hysteresis_control
+from core.transforms import load_seed
+
+SEED = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "seed.json")
+
+
+def test_stream_matches_load_seed():
+    zones, profiles, sensors, actuators, readings, rules = load_seed(SEED)
+    # маленький блок, чтобы значения регулярно попадали на границу буфера
+    stream = SeedStream(SEED, chunk_size=100, block=97)
+    assert stream.catalog == (zones, profiles, sensors, actuators, rules)
+    chunks = list(stream.chunks())
+    assert max(len(c) for c in chunks) == 100
+    assert tuple(iter_chunks(chunks)) == readings
+
+
+def test_catalog_after_readings(tmp_path):
+    path = tmp_path / "seed.json"
+    path.write_text(json.dumps({
+        "readings": [{"id": "r1", "sensor_id": "s1", "ts": "2025-09-01 00:00", "value": 12}],
+        "sensors": [{"id": "s1", "device_id": "d1", "kind": "temp", "unit": "C"}],
+    }))
+    stream = SeedStream(str(path))
+    assert stream.sensors[0].id == "s1"
+    assert stream.rules == ()
+    assert [r.value for r in stream.readings()] == [12]
+
+
+def test_jsonl_chunks_feed_controller(tmp_path):
+    zones, profiles, sensors, actuators, readings, rules = load_seed(SEED)
+    path = tmp_path / "readings.jsonl"
+    path.write_text("\n".join(json.dumps(r.__dict__) for r in readings[:50]))
+    chunks = iter_reading_chunks(str(path), chunk_size=8)
+    stream = with_kind(iter_chunks(chunks), sensors)
+    streamed = list(lazy_hysteresis_control(stream, profiles[0], rules))
+    eager = list(lazy_hysteresis_control(with_kind(readings[:50], sensors), profiles[0], rules))
+    assert streamed == eager
@@ -0,0 +1,106 @@
+import sys
+import os
+import asyncio
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import pytest
+from core import metrics
+from core.catalog import Catalog
+from core.frp import EventBus, handle_reading
+from core.metrics import BOUNDS_NS, Registry, Stage, instrument
+from core.pipeline import ProfileTable, process_reading, process_readings
+from core.report import simulate_day
+from core.transforms import load_seed
+
+SEED = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "seed.json")
+
+
+def test_stage_buckets_and_quantiles():
+    stage = Stage("x")
+    for ns in (500, 1_000, 2_000, 40_000, 20 * 10 ** 9):
+        stage.observe(ns, items=3)
+    s = stage.snapshot()
+    assert s["count"] == 5 and s["items"] == 15 and s["max"] == 20.0
+    assert s["buckets"][0] == (1e-06, 2)  # граница включается
+    assert s["buckets"][-1] == (float("inf"), 5)
+    assert s["p50"] == 2.5e-06 and s["p99"] == 20.0
+    stage.reset()
+    assert stage.snapshot()["count"] == 0 and stage.quantile(0.5) is None
+
+
+def test_instrument_respects_switch_and_counts_errors():
+    registry = Registry()
+
+    @instrument("f", items=lambda result, args: len(args["xs"]), registry=registry)
+    def f(xs):
+        if not xs:
+            raise ValueError
+        return sum(xs)
+
+    assert f([1, 2]) == 3
+    assert registry.snapshot()["f"]["count"] == 0
+    registry.enabled = True
+    f([1, 2, 3])
+    with pytest.raises(ValueError):
+        f([])
+    s = registry.snapshot()["f"]
+    assert (s["count"], s["items"], s["errors"]) == (2, 4, 1)
+
+    text = registry.to_prometheus()
+    assert "# TYPE greenhouse_stage_seconds histogram" in text
+    assert 'greenhouse_stage_seconds_bucket{stage="f",le="+Inf"} 2' in text
+    assert 'greenhouse_stage_seconds_count{stage="f"} 2' in text
+    assert 'greenhouse_stage_errors_total{stage="f"} 1' in text
+    assert text.count('greenhouse_stage_seconds_bucket{stage="f"') == len(BOUNDS_NS) + 1
+
+
+def test_pipeline_stages(tmp_path):
+    seed = load_seed(SEED)
+    zones, profiles, sensors, actuators, readings, rules = seed
+    catalog = Catalog.from_seed(seed)
+    metrics.REGISTRY.reset()
+    metrics.enable()
+    try:
+        for r in readings[:10]:
+            process_reading(r, catalog, rules, {}, profiles[0])
+        process_readings(readings[:100], catalog, ProfileTable.from_profile(profiles[0]))
+        bus = EventBus()
+        bus.subscribe("READING", handle_reading)
+        bus.publish("READING", {"sensor": "s1", "value": 1})
+        asyncio.run(simulate_day("2025-09-01", readings[:50], zones, catalog, profiles, rules))
+    finally:
+        metrics.disable()
+    snap = metrics.REGISTRY.snapshot()
+    assert snap["process_reading"]["count"] == 10
+    assert snap["validate_reading"]["count"] == 10
+    assert snap["process_readings"]["items"] == 100 + 50  # и внутри отчёта зоны
+    assert snap["bus.publish"]["count"] == 1
+    assert snap["simulate_day"]["count"] == 1 and snap["simulate_day"]["items"] == 50
+    path = metrics.REGISTRY.write_prometheus(str(tmp_path / "m.prom"))
+    with open(path, encoding="utf-8") as f:
+        assert 'stage="simulate_day"' in f.read()
+    metrics.REGISTRY.reset()
+
+
+def test_keyword_calls_and_broken_items_callback():
+    zones, profiles, sensors, actuators, readings, rules = load_seed(SEED)
+    catalog = Catalog.from_seed((zones, profiles, sensors, actuators, readings, rules))
+    registry = Registry(enabled=True)
+
+    @instrument("g", items=lambda result, args: args["missing"], registry=registry)
+    def g(x):
+        return x
+
+    assert g(x=5) == 5
+    assert registry.snapshot()["g"]["metrics_errors"] == 1
+
+    metrics.REGISTRY.reset()
+    metrics.enable()
+    try:
+        report = asyncio.run(simulate_day(day="2025-09-01", readings=readings[:50], zones=zones, sensors=catalog,
+                                          profiles=profiles, rules=rules))
+    finally:
+        metrics.disable()
+    assert report
+    s = metrics.REGISTRY.snapshot()["simulate_day"]
+    assert (s["count"], s["items"], s["metrics_errors"]) == (1, 50, 0)
+    metrics.REGISTRY.reset()
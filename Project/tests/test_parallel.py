@@ -0,0 +1,72 @@
+import sys
+import os
+import asyncio
+import pickle
+import shutil
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core.catalog import Catalog
+from core.parallel import SharedReadings, attach, _materialize
+from core.report import partition_readings, simulate_day, simulate_week
+from core.transforms import load_seed
+
+SEED = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "seed.json")
+DAYS = ["2025-09-01", "2025-09-02", "2025-09-03"]
+
+
+def _seed():
+    zones, profiles, sensors, actuators, readings, rules = load_seed(SEED)
+    return readings, zones, Catalog(zones, profiles, sensors, actuators, rules), profiles, rules
+
+
+def test_catalog_pickles():
+    catalog = _seed()[2]
+    copy = pickle.loads(pickle.dumps(catalog))
+    assert copy.sensors == catalog.sensors
+    assert copy.sensor_by_id.keys() == catalog.sensor_by_id.keys()
+
+
+def test_shared_readings_roundtrip():
+    readings, _, catalog, _, _ = _seed()
+    parts = partition_readings(readings, catalog)
+    days = list(parts)
+    with SharedReadings(days, parts) as shared:
+        shm, columns = attach(shared.shm.name, shared.layout)
+        for day, zone_id, slices in shared.units:
+            for kind, (a, b) in slices.items():
+                got = _materialize(columns, shared.sensor_ids, a, b)
+                expected = parts[day][zone_id][kind]
+                assert got == expected
+                assert [type(r.value) for r in got] == [type(r.value) for r in expected]
+        del columns
+        shm.close()
+
+
+def test_parallel_week_matches_serial():
+    readings, zones, catalog, profiles, rules = _seed()
+    serial = asyncio.run(simulate_week(DAYS, readings, zones, catalog, profiles, rules))
+    progress = []
+    parallel = asyncio.run(simulate_week(DAYS, readings, zones, catalog, profiles, rules, workers=2,
+                                         progress=lambda done, total: progress.append((done, total))))
+    assert repr(parallel) == repr(serial)
+    assert progress and progress[-1][0] == progress[-1][1]
+
+
+def test_parallel_day_from_store(tmp_path):
+    path = str(tmp_path / "seed.json")
+    shutil.copy(SEED, path)  # бинарный кэш пишется рядом с копией, а не в data/
+    zones, profiles, sensors, actuators, store, rules = load_seed(path, cache=True)
+    serial = asyncio.run(simulate_day(DAYS[0], store, zones, sensors, profiles, rules))
+    parallel = asyncio.run(simulate_day(DAYS[0], store, zones, sensors, profiles, rules, workers=2))
+    assert repr(parallel) == repr(serial)
+
+
+def test_partition_single_pass_matches_per_day():
+    readings, zones, catalog, profiles, rules = _seed()
+    parts = partition_readings(readings, catalog, DAYS)
+    assert set(parts) <= set(DAYS)
+    assert sum(len(rs) for day in parts.values() for z in day.values() for rs in z.values()) == \
+        sum(1 for r in readings if r.ts[:10] in DAYS)
+    week = asyncio.run(simulate_week(DAYS, readings, zones, catalog, profiles, rules))
+    for day, report in zip(DAYS, week["per_day"]):
+        daily = [r for r in readings if r.ts.startswith(day)]
+        assert report == asyncio.run(simulate_day(day, daily, zones, catalog, profiles, rules))
@@ -0,0 +1,68 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import pytest
+from core.catalog import Catalog
+from core.domain import Reading, Sensor
+from core.pipeline import ALERT, ERROR, OK, WARNING, ProfileTable, process_reading, process_readings
+from core.transforms import load_seed
+
+SEED = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "seed.json")
+
+
+def _check_same(batch, sensors, profile, snapshot=None):
+    result = process_readings(batch, sensors, ProfileTable.from_profile(profile), snapshot)
+    expected = [process_reading(r, sensors, (), snapshot or {}, profile) for r in batch]
+    assert result.results() == expected
+    return result
+
+
+def test_seed_matches_single_path():
+    seed = load_seed(SEED)
+    zones, profiles, sensors, actuators, readings, rules = seed
+    catalog = Catalog.from_seed(seed)
+    for profile in profiles:
+        result = _check_same(readings, catalog, profile)
+        assert sum(result.counts().values()) == len(readings)
+    # кортеж сенсоров вместо Catalog и сам профиль вместо таблицы
+    assert process_readings(readings[:50], sensors, profiles[0]).results() == \
+        [process_reading(r, sensors, rules, {}, profiles[0]) for r in readings[:50]]
+
+
+def test_edge_cases():
+    seed = load_seed(SEED)
+    profile = seed[1][0]
+    catalog = Catalog(sensors=(Sensor("t", "d", "temp", "C"), Sensor("l", "d", "light", "lux"),
+                               Sensor("p", "d", "ph", "")))
+    lo, hi = profile.temp_range
+    batch = [
+        Reading("r1", "t", "2025-09-01 00:00", lo),
+        Reading("r2", "t", "2025-09-01 00:00", hi + 0.1),
+        {"sensor_id": "t", "value": None, "ts": "x"},
+        {"sensor_id": "t", "value": float("nan")},
+        {"sensor_id": "l", "value": float("nan")},
+        {"sensor_id": "l", "value": profile.light_min - 1},
+        {"sensor_id": "l", "value": True},
+        {"sensor_id": "p", "value": "кисло"},
+        {"sensor_id": "p", "value": None},
+        {"sensor_id": "nope", "value": 1},
+        {"value": 1},
+        object(),
+    ]
+    result = _check_same(batch, catalog, profile)
+    assert result.status.tolist() == [OK, WARNING, WARNING, WARNING, OK, WARNING, WARNING, OK, WARNING,
+                                      ERROR, ERROR, ERROR]
+    assert result.params() == ["temp", "temp", "temp", "light", "light", "ph"]
+
+    with pytest.raises(TypeError):
+        process_readings([{"sensor_id": "t", "value": "жарко"}], catalog, profile)
+
+
+def test_snapshot_alert():
+    seed = load_seed(SEED)
+    profile, readings = seed[1][0], seed[4][:100]
+    catalog = Catalog.from_seed(seed)
+    result = _check_same(readings, catalog, profile, snapshot={"co2": profile.co2_range[1] + 1})
+    assert result.alert["param"] == "co2"
+    assert result.counts()["alert"] == len(result.indices(ALERT)) > 0
+    assert result.counts()["ok"] == 0
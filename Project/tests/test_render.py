@@ -0,0 +1,49 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import numpy as np
+import pytest
+from core.render import downsample, lttb_indices, minmax_indices, page_bounds, page_count, series_points
+from core.ringbuffer import RingBuffer
+
+
+def test_lttb_keeps_ends_and_peaks():
+    x = np.arange(10_000, dtype=float)
+    y = np.sin(x / 500)
+    y[4321] = 50.0
+    idx = lttb_indices(x, y, 200)
+    assert len(idx) == 200 and idx[0] == 0 and idx[-1] == len(y) - 1
+    assert np.all(np.diff(idx) > 0) and 4321 in idx
+    assert lttb_indices(x[:50], y[:50], 200).tolist() == list(range(50))
+
+
+def test_minmax_keeps_extremes_per_bucket():
+    rng = np.random.default_rng(1)
+    y = rng.normal(size=5_000)
+    idx = minmax_indices(y, 100)
+    assert len(idx) <= 202 and np.all(np.diff(idx) > 0)
+    for b in range(100):
+        chunk = np.arange(len(y))[np.arange(len(y)) * 100 // len(y) == b]
+        assert chunk[np.argmin(y[chunk])] in idx and chunk[np.argmax(y[chunk])] in idx
+
+
+def test_downsample_drops_nan_and_validates():
+    xs, ys = downsample([1.0, np.nan, 3.0, 4.0], points=10)
+    assert xs.tolist() == [0.0, 2.0, 3.0] and ys.tolist() == [1.0, 3.0, 4.0]
+    assert series_points(range(5000), points=100)[0][-1] == 4999.0
+    with pytest.raises(ValueError):
+        downsample([1.0], method="spline")
+
+
+def test_pages_and_ring_window():
+    assert page_count(0) == 1 and page_count(101, 50) == 3
+    assert page_bounds(101, 0, 50) == (51, 101) and page_bounds(101, 2, 50) == (0, 1)
+    assert page_bounds(101, 2, 50, newest_first=False) == (100, 101)
+    assert page_bounds(101, 9, 50, newest_first=False) == (100, 101)
+
+    buf = RingBuffer(5, {"v": np.int64})
+    for i in range(12):
+        buf.append({"v": i})
+    assert buf.window_columns(0, 5)["v"].tolist() == [7, 8, 9, 10, 11]
+    assert buf.window_columns(*page_bounds(len(buf), 1, 2))["v"].tolist() == [8, 9]
+    assert buf.window_columns(4, 99)["v"].tolist() == [11] and buf.window_columns(3, 1)["v"].tolist() == []
@@ -0,0 +1,54 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import numpy as np
+import pytest
+from core.frp import EventBus, configure_views, handle_actuate, handle_reading
+from core.ringbuffer import KeyedRings, RingBuffer
+
+FIELDS = {"sensor": object, "value": np.float64}
+
+
+def test_ring_keeps_latest_in_order():
+    buf = RingBuffer(4, FIELDS)
+    assert not buf and buf.latest() == []
+    for i in range(10):
+        buf.append({"sensor": f"s{i % 2}", "value": i})
+    assert len(buf) == 4 and buf.total == 10
+    assert [r["value"] for r in buf.latest()] == [6, 7, 8, 9]
+    assert [r["value"] for r in buf.latest(2)] == [8, 9]
+    assert buf.latest_columns(3)["value"].tolist() == [7.0, 8.0, 9.0]
+    assert buf[0]["value"] == 6 and buf[-1] == {"sensor": "s1", "value": 9.0}
+    assert buf.columns["value"].dtype == np.float64
+    with pytest.raises(IndexError):
+        buf[4]
+
+
+def test_missing_numeric_is_nan():
+    buf = RingBuffer(2, FIELDS)
+    buf.append({"sensor": "s1"})
+    assert np.isnan(buf[0]["value"])
+
+
+def test_keyed_capacities():
+    rings = KeyedRings(2, FIELDS, capacities={"s1": 5})
+    for i in range(6):
+        rings.append("s1", {"sensor": "s1", "value": i})
+        rings.append("s2", {"sensor": "s2", "value": i})
+    assert len(rings.latest("s1")) == 5 and len(rings.latest("s2")) == 2
+    assert rings.latest("missing") == []
+
+
+def test_frp_views_are_bounded():
+    bus = EventBus()
+    bus.subscribe("READING", handle_reading)
+    bus.subscribe("ACTUATE", handle_actuate)
+    configure_views(bus.store, readings=10, readings_by_sensor=3)
+    for i in range(100):
+        bus.publish("READING", {"sensor": f"s{i % 2}", "value": i, "zone": "z1"})
+    bus.publish("ACTUATE", {"device": "lamp", "action": "ON"})
+    store = bus.store
+    assert len(store["readings"]) == 10 and store["readings"][-1]["value"] == 99
+    assert [r["value"] for r in store["readings_by_sensor"].latest("s0")] == [94, 96, 98]
+    assert len(store["readings_by_zone"].get("z1")) == 100
+    assert store["commands"][-1]["device"] == "lamp"
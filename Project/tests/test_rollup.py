@@ -0,0 +1,91 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import pytest
+from core.filters import by_time_range
+from core.rollup import Rollup
+from core.store import ReadingStore
+from core.transforms import load_seed, reading_stats
+
+SEED = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "seed.json")
+
+
+def _same(got, expected):
+    assert got.keys() == expected.keys()
+    for key in expected:
+        assert got[key] == pytest.approx(expected[key])
+
+
+@pytest.mark.parametrize("build", [
+    lambda r, s: Rollup.from_readings(r, s),
+    lambda r, s: Rollup.from_readings(ReadingStore.from_readings(r, s), s),
+])
+def test_rollup_matches_raw_stats(build):
+    _, _, sensors, _, readings, _ = load_seed(SEED)
+    rollup = build(readings, sensors)
+    for kind in ("temp", "hum_air", "hum_soil", "light", "co2"):
+        _same(reading_stats(rollup, sensors, kind), reading_stats(readings, sensors, kind))
+        # края не по границе часа — добираются из сырых показаний
+        start, end = "2025-09-01 03:20", "2025-09-01 17:40"
+        _same(rollup.stats(kind, start=start, end=end),
+              reading_stats(by_time_range(readings, start, end), sensors, kind))
+    _same(rollup.stats_days("2025-09-01", "2025-09-01", "temp", sensor_ids=["s1"]),
+          reading_stats([r for r in readings if r.sensor_id == "s1"], sensors, "temp"))
+    assert rollup.stats_days("2025-09-02", "2025-09-03", "temp") == {}
+
+
+def test_incremental_add():
+    _, _, sensors, _, readings, _ = load_seed(SEED)
+    rollup = Rollup(sensors)
+    for r in reversed(readings):  # опоздавшие показания тоже попадают на место
+        rollup.add(r.sensor_id, r.ts, r.value)
+    _same(rollup.stats("co2", start="2025-09-01 00:05", end="2025-09-01 09:55"),
+          reading_stats(by_time_range(readings, "2025-09-01 00:05", "2025-09-01 09:55"), sensors, "co2"))
+
+
+def test_edges_come_from_index_and_bus():
+    from core.frp import EventBus, handle_reading
+    from core.timeindex import TimeIndex
+    _, _, sensors, _, readings, _ = load_seed(SEED)
+    head = [r for r in readings if r.ts < "2025-09-01 12:00"]
+    index = TimeIndex(head)
+    rollup = Rollup.from_readings(head, sensors, index)
+    assert rollup.index is index and not rollup._live_ts  # копии показаний не держит
+
+    bus = EventBus()
+    bus.subscribe("READING", handle_reading)
+    rollup.follow(bus)
+    cancel = rollup.follow(bus)
+    for r in (r for r in readings if r.ts >= "2025-09-01 12:00"):
+        bus.publish("READING", {"sensor": r.sensor_id, "value": r.value, "ts": r.ts})
+    assert len(bus.subscribers["READING"]) == 2
+    start, end = "2025-09-01 11:20", "2025-09-01 13:40"
+    for kind in ("temp", "co2"):
+        _same(rollup.stats(kind, start=start, end=end),
+              reading_stats(by_time_range(readings, start, end), sensors, kind))
+        _same(rollup.stats(kind), reading_stats(readings, sensors, kind))
+    cancel()
+    assert bus.subscribers["READING"] == [handle_reading]
+    before = rollup.stats("temp")
+    bus.publish("READING", {"sensor": "s1", "value": 1000.0, "ts": "2025-09-01 23:00"})
+    assert rollup.stats("temp") == before
+
+
+def test_writes_while_pages_read():
+    from concurrent.futures import ThreadPoolExecutor
+    _, _, sensors, _, readings, _ = load_seed(SEED)
+    rollup = Rollup.from_readings(readings, sensors)
+
+    def write(i):
+        # новые сенсоры и часы: словари корзин растут во время чтения
+        rollup.add(f"n{i}", f"2025-09-{2 + i % 20:02d} 01:00", float(i))
+
+    def read(_):
+        return rollup.stats(start="2025-09-01 00:00", end="2025-09-30 00:00")["count"] >= len(readings)
+
+    with ThreadPoolExecutor(4) as pool:
+        writes = pool.map(write, range(1000))
+        reads = list(pool.map(read, range(50)))
+        list(writes)
+    assert all(reads)
+    assert rollup.stats()["count"] == len(readings) + 1000
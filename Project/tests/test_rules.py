@@ -0,0 +1,90 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core.domain import Rule, Sensor, Command, Alert
+from core.lazy import KindReading, lazy_hysteresis_control
+from core.rules import RuleEngine, compile_rules
+
+RULES = (
+    Rule("r1", "range", {"param": "temp", "min": 18, "max": 25}),
+    Rule("r5", "range", {"param": "light", "min": 1500, "max": 3000, "device": "heater"}),
+    Rule("r6", "delta", {"param": "temp", "max_delta": 3}),
+    Rule("r7", "stale", {"max_minutes": 30}),
+    Rule("r8", "priority", {"first": "temp", "second": "light"}),
+)
+
+
+def R(i, sid, kind, value, ts):
+    return KindReading(f"r{i}", sid, kind, value, ts)
+
+
+def test_compile_dispatch_tables():
+    table = compile_rules(RULES)
+    assert set(table.controls) == {"temp", "light"}
+    assert table.controls["light"][0].device == "heater"
+    assert [r.rule_id for r in table.deltas["temp"]] == ["r6"]
+    assert [r.rule_id for r in table.stale_for("co2")] == ["r7"]
+    assert table.priority("temp") < table.priority("light") < table.priority("co2")
+
+
+def test_engine_control_matches_generator():
+    stream = [R(i, "s1", "temp", v, f"2025-09-01 00:{i * 5:02d}")
+              for i, v in enumerate([17, 17, 26, 20, 15, 30, 31, 16])]
+    expected = tuple(lazy_hysteresis_control(stream, None, RULES[:1]))
+    engine = RuleEngine(RULES[:1])
+    got = tuple(c for r in stream for c in engine.feed(r))
+    assert [(c.id, c.actuator_id, c.action) for c in got] == [(c.id, c.actuator_id, c.action) for c in expected]
+
+
+def test_delta_and_stale_alerts():
+    sensors = (Sensor("s1", "d1", "temp", "C", "z1"),)
+    engine = RuleEngine(RULES, sensors)
+    stream = [
+        R(0, "s1", None, 20.0, "2025-09-01 00:00"),
+        R(1, "s1", None, 21.0, "2025-09-01 00:10"),
+        R(2, "s1", None, 24.5, "2025-09-01 00:20"),
+        R(3, "s1", None, 24.0, "2025-09-01 01:20"),
+    ]
+    alerts = [a for r in stream for a in engine.feed(r) if isinstance(a, Alert)]
+    assert [(a.code, a.ts) for a in alerts] == [
+        ("DELTA_EXCEEDED", "2025-09-01 00:20"),
+        ("STALE_DATA", "2025-09-01 01:20"),
+    ]
+    assert engine.stale_sensors("2025-09-01 02:00") == ("s1",)
+
+
+def test_priority_resolves_conflict_and_restores_state():
+    engine = RuleEngine(RULES)
+    tick = [R(0, "s2", "light", 4000, "2025-09-01 00:00"), R(1, "s1", "temp", 10, "2025-09-01 00:00")]
+    out = [c for c in engine.run(tick) if isinstance(c, Command)]
+    assert [(c.actuator_id, c.action, c.payload["param"]) for c in out] == [("heater", "ON", "temp")]
+    # команда light отброшена — её состояние не должно блокировать следующую
+    later = engine.feed(R(2, "s2", "light", 4000, "2025-09-01 00:01"))
+    assert [c.action for c in later if isinstance(c, Command)] == ["OFF"]
+
+
+def test_global_stale_rule_fires_once_for_unknown_kind():
+    table = compile_rules(RULES)
+    assert [r.rule_id for r in table.stale_for(None)] == ["r7"]
+    engine = RuleEngine(RULES)
+    engine.feed(R(0, "x1", None, 1.0, "2025-09-01 00:00"))
+    alerts = engine.feed(R(1, "x1", None, 1.0, "2025-09-01 01:00"))
+    assert [a.code for a in alerts] == ["STALE_DATA"]
+
+
+def test_schedule_gates_only_commands():
+    from core.domain import PlantProfile
+    from core.schedule import WeeklySchedule
+    profile = PlantProfile("p1", "Томат", (18, 25), (50, 70), (60, 80), (400, 1000), 2000,
+                           schedule={"monday": [["08:00", "09:00"]]})
+    fan = Rule("r9", "range", {"param": "hum_air", "min": 50, "max": 70, "device": "fan"})
+    engine = RuleEngine(RULES + (fan,), schedule=WeeklySchedule.from_profile(profile))
+    # 2025-09-01 — понедельник, 07:00 вне окна: вентиляция молчит, нагрев и проверки работают
+    assert engine.feed(R(0, "s2", "hum_air", 90, "2025-09-01 07:00")) == ()
+    heat = engine.feed(R(1, "s1", "temp", 10, "2025-09-01 07:00"))
+    assert [(c.actuator_id, c.action) for c in heat] == [("heater", "ON")]
+    off = engine.feed(R(2, "s1", "temp", 20, "2025-09-01 07:50"))
+    assert [(a.code, a.ts) for a in off] == [("DELTA_EXCEEDED", "2025-09-01 07:50"), ("STALE_DATA", "2025-09-01 07:50")]
+    vent = engine.feed(R(3, "s2", "hum_air", 90, "2025-09-01 08:10"))
+    assert [(c.actuator_id, c.action) for c in vent if isinstance(c, Command)] == [("fan", "OFF")]
+    assert engine.last_seen["s1"] == engine.last_value["s1"][0]
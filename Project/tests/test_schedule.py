@@ -0,0 +1,37 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from datetime import datetime
+from core.domain import Mode, PlantProfile
+from core.recursion import expand_schedule
+from core.schedule import WeeklySchedule
+
+PROFILE = PlantProfile("p1", "Томат", (18, 25), (50, 70), (60, 80), (400, 1000), 2000,
+                       schedule={"monday": [["08:00", "09:00"], ["08:30", "10:00"]],
+                                 "sunday": [["23:00", "23:59"]]})
+
+
+def test_expand_schedule_merges_overlaps():
+    slots = expand_schedule([["08:00", "08:02"], ["08:01", "08:03"], ["09:00"], ["10:00", "09:00"]], "2025-09-01")
+    assert slots == ("08:00", "08:01", "08:02", "08:03")
+    assert len(expand_schedule([["00:00", "23:59"]], "2025-09-01")) == 1440
+
+
+def test_is_active_and_next_transition():
+    week = WeeklySchedule.from_profile(PROFILE)
+    assert week.intervals_for("monday") == [("08:00", "10:00")]
+    # 2025-09-01 — понедельник
+    assert week.is_active("2025-09-01 09:15")
+    assert not week.is_active("2025-09-01 10:01")
+    assert week.next_transition("2025-09-01 09:15") == (datetime(2025, 9, 1, 10, 1), False)
+    assert week.next_transition("2025-09-01 12:00") == (datetime(2025, 9, 7, 23, 0), True)
+    assert week.next_transition("2025-09-07 23:30") == (datetime(2025, 9, 8, 0, 0), False)
+
+
+def test_union_and_overlap_with_mode():
+    week = WeeklySchedule.from_profile(PROFILE)
+    mode = WeeklySchedule.from_mode(Mode("m1", "z1", "p1", (("09:30", "11:00"),)))
+    both = week & mode
+    assert both.intervals_for("monday") == [("09:30", "10:00")]
+    assert (week | mode).intervals_for("monday") == [("08:00", "11:00")]
+    assert not (WeeklySchedule.from_mapping({"tuesday": [["01:00", "02:00"]]}) & week)
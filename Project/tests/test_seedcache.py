@@ -0,0 +1,48 @@
+import sys
+import os
+import json
+import shutil
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core.store import ReadingStore
+from core.seedcache import cache_path, is_fresh
+from core.transforms import load_seed
+
+SEED = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "seed.json")
+
+
+def test_cached_load_matches_json(tmp_path):
+    path = str(tmp_path / "seed.json")
+    shutil.copy(SEED, path)
+    plain = load_seed(path)
+
+    cold = load_seed(path, cache=True)
+    assert os.path.exists(cache_path(path))
+    warm = load_seed(path, cache=True)
+
+    for loaded in (cold, warm):
+        assert isinstance(loaded[4], ReadingStore)
+        assert loaded[:4] == plain[:4]
+        assert loaded[5] == plain[5]
+        assert tuple(loaded[4]) == plain[4]
+
+
+def test_cache_invalidated_on_change(tmp_path):
+    path = tmp_path / "seed.json"
+    data = json.loads(open(SEED, encoding="utf-8").read())
+    path.write_text(json.dumps(data), encoding="utf-8")
+    load_seed(str(path), cache=True)
+    assert is_fresh(str(path))
+
+    data["readings"] = data["readings"][:10]
+    path.write_text(json.dumps(data), encoding="utf-8")
+    assert not is_fresh(str(path))
+    assert len(load_seed(str(path), cache=True)[4]) == 10
+
+
+def test_touch_without_change_keeps_cache(tmp_path):
+    path = str(tmp_path / "seed.json")
+    shutil.copy(SEED, path)
+    load_seed(path, cache=True)
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    assert is_fresh(path)
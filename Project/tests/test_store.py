@@ -0,0 +1,49 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import pytest
+from core.domain import Reading, Sensor
+from core.store import ReadingStore, to_epoch, from_epoch
+from core.transforms import reading_stats
+from core.filters import by_sensor_kind, by_time_range
+
+
+SENSORS = (
+    Sensor(id="s1", device_id="d1", kind="temp", unit="°C"),
+    Sensor(id="s2", device_id="d2", kind="hum_air", unit="%"),
+)
+READINGS = (
+    Reading(id="r1", sensor_id="s1", ts="2025-09-16 10:00", value=20.5),
+    Reading(id="r2", sensor_id="s2", ts="2025-09-16 10:00", value=55),
+    Reading(id="r3", sensor_id="s1", ts="2025-09-16 11:00", value=27.3),
+    Reading(id="r4", sensor_id="s2", ts="2025-09-16 12:00", value=61),
+)
+
+
+def test_epoch_roundtrip():
+    assert from_epoch(to_epoch("2025-09-16 10:00")) == "2025-09-16 10:00"
+
+
+def test_lazy_adapter_returns_readings():
+    store = ReadingStore.from_readings(READINGS, SENSORS)
+    assert len(store) == 4
+    assert tuple(store) == READINGS
+    assert store[-1] == READINGS[-1]
+    assert tuple(store[1:3]) == READINGS[1:3]
+
+
+def test_stats_matches_tuple_path():
+    store = ReadingStore.from_readings(READINGS, SENSORS)
+    for kind in ("temp", "hum_air", "co2"):
+        expected = reading_stats(READINGS, SENSORS, kind)
+        got = reading_stats(store, SENSORS, kind)
+        assert got.keys() == expected.keys()
+        for key in expected:
+            assert got[key] == pytest.approx(expected[key])
+
+
+def test_filters_accept_store():
+    store = ReadingStore.from_readings(READINGS, SENSORS)
+    assert tuple(by_sensor_kind(store, SENSORS, "temp")) == by_sensor_kind(READINGS, SENSORS, "temp")
+    start, end = "2025-09-16 10:30", "2025-09-16 12:00"
+    assert tuple(by_time_range(store, start, end)) == by_time_range(READINGS, start, end)
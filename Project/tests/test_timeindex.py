@@ -0,0 +1,36 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core.filters import by_time_range
+from core.report import make_daily_readings
+from core.store import ReadingStore
+from core.timeindex import TimeIndex
+from core.transforms import load_seed
+
+SEED = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "seed.json")
+
+
+def test_between_matches_filter():
+    readings = load_seed(SEED)[4]
+    index = TimeIndex(readings)
+    start, end = "2025-09-01 03:00", "2025-09-01 05:30"
+    expected = sorted(by_time_range(readings, start, end), key=lambda r: r.ts)
+    assert list(by_time_range(index, start, end)) == expected
+
+
+def test_day_matches_make_daily_readings():
+    readings = load_seed(SEED)[4]
+    index = TimeIndex(ReadingStore.from_readings(readings))
+    old = make_daily_readings("2025-09-01", readings)
+    new = make_daily_readings("2025-09-01", index)
+    assert [(r.id, r.ts, r.value) for r in new] == [(r.id, r.ts, r.value) for r in old]
+    assert list(index.day("2025-09-02")) == []
+
+
+def test_last_n_for_sensor_group():
+    readings = load_seed(SEED)[4]
+    index = TimeIndex(readings)
+    soil = {"s3", "s8"}
+    expected = [r for r in sorted(readings, key=lambda r: r.ts) if r.sensor_id in soil][-24:]
+    assert list(index.last_n(sorted(soil), 24)) == expected
+    assert list(index.last_n("s1", 3)) == [r for r in readings if r.sensor_id == "s1"][-3:]
@@ -0,0 +1,60 @@
+import sys
+import os
+import json
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import pytest
+from core.lazy import iter_chunks
+from core.loader import iter_reading_chunks
+from core.seedcache import is_fresh, write_cache
+from core.transforms import load_seed
+from core.workload import WorkloadSpec, build_catalog, reading_chunks, write_jsonl, write_seed
+
+SPEC = WorkloadSpec(greenhouses=2, beds=3, sensors_per_kind={"temp": 2, "hum_soil": 1, "light": 1},
+                    days=1, cadence=15, spike_rate=0.01, seed=7)
+
+
+def test_seed_roundtrip_and_determinism(tmp_path):
+    path = write_seed(str(tmp_path / "a" / "seed.json"), SPEC)
+    again = write_seed(str(tmp_path / "b" / "seed.json"), SPEC)
+    with open(path, "rb") as f, open(again, "rb") as g:
+        assert f.read() == g.read()
+
+    zones, profiles, sensors, actuators, readings, rules = load_seed(path)
+    catalog = build_catalog(SPEC)
+    # диапазоны профилей после JSON — списки, а не кортежи
+    assert (zones, sensors, actuators, rules) == catalog[:1] + catalog[2:]
+    assert [(p.id, tuple(p.temp_range)) for p in profiles] == [(p.id, p.temp_range) for p in catalog[1]]
+    assert len(sensors) == SPEC.n_sensors == 24 and len(readings) == SPEC.n_readings == 96 * 24
+    assert readings == tuple(iter_chunks(reading_chunks(SPEC)))
+    assert readings[-1].ts == "2025-09-01 23:45"
+    assert {s.zone_id for s in sensors} == {z.id for z in zones if z.parent_id}
+
+    other = write_seed(str(tmp_path / "c" / "seed.json"), WorkloadSpec(**{**vars(SPEC), "seed": 8}))
+    assert load_seed(other)[4] != readings
+
+
+def test_sidecar_matches_cache_build(tmp_path, monkeypatch):
+    monkeypatch.setattr("core.workload.BLOCK_READINGS", 100)  # несколько блоков записи
+    path = write_seed(str(tmp_path / "seed.json"), SPEC, sidecar=True)
+    assert is_fresh(path)
+    with open(path + ".bin", "rb") as f:
+        streamed = f.read()
+    write_cache(path)
+    with open(path + ".bin", "rb") as f:
+        assert f.read() == streamed
+    assert tuple(load_seed(path, cache=True)[4]) == load_seed(path)[4]
+
+
+def test_jsonl_parts(tmp_path):
+    paths = write_jsonl(str(tmp_path / "readings.jsonl"), SPEC, part_size=1000)
+    assert [os.path.basename(p) for p in paths] == ["readings-00000.jsonl", "readings-00001.jsonl",
+                                                    "readings-00002.jsonl"]
+    streamed = tuple(r for p in paths for r in iter_chunks(iter_reading_chunks(p, chunk_size=256)))
+    assert streamed == tuple(iter_chunks(reading_chunks(SPEC)))
+    with open(tmp_path / "readings.catalog.json", encoding="utf-8") as f:
+        assert len(json.load(f)["sensors"]) == SPEC.n_sensors
+
+
+def test_rejects_fractional_cadence():
+    with pytest.raises(ValueError):
+        WorkloadSpec(cadence=0.5)
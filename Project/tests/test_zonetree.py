@@ -0,0 +1,38 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core.domain import Zone, Sensor
+from core.recursion import collect_descendant_zones, find_sensors_in_zone
+from core.zonetree import ZoneTree
+
+ZONES = (
+    Zone("z1", "Теплица 1"),
+    Zone("z2", "Теплица 2"),
+    Zone("z1_1", "Грядка 1", "z1"),
+    Zone("z1_2", "Грядка 2", "z1"),
+    Zone("z1_1_a", "Ряд A", "z1_1"),
+)
+
+
+def test_descendants_preorder():
+    tree = ZoneTree(ZONES)
+    assert collect_descendant_zones(ZONES, "z1") == ("z1", "z1_1", "z1_1_a", "z1_2")
+    assert collect_descendant_zones(ZONES, "z2") == ("z2",)
+    assert collect_descendant_zones(ZONES, "missing") == ("missing",)
+    assert tree.is_descendant("z1_1_a", "z1") and not tree.is_descendant("z1_2", "z1_1")
+    assert tree.ancestors("z1_1_a") == ("z1_1_a", "z1_1", "z1")
+
+
+def test_deep_hierarchy_has_no_recursion_limit():
+    zones = [Zone("z0", "root")] + [Zone(f"z{i}", "bed", f"z{i - 1}") for i in range(1, 5000)]
+    tree = ZoneTree(zones)
+    assert len(tree.descendants("z0")) == 5000
+    assert len(tree.ancestors("z4999")) == 5000
+    sensors = tuple(Sensor(f"s{i}", f"d_z{i}", "temp", "C") for i in range(3000))
+    assert len(find_sensors_in_zone(tuple(zones), sensors, "z4990")) == 0
+    assert len(find_sensors_in_zone(tuple(zones), sensors, "z0")) == 3000
+
+
+def test_sensors_under_zone():
+    sensors = (Sensor("s1", "d1", "temp", "C", "z1_1_a"), Sensor("s2", "d2", "temp", "C", "z2"))
+    assert ZoneTree(ZONES).sensors_under("z1", sensors) == sensors[:1]